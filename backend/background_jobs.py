@@ -0,0 +1,118 @@
+"""
+Background Jobs - progress tracking for long-running maintenance work
+
+Maintenance endpoints hand work to FastAPI BackgroundTasks and return a
+task_id immediately. Each task records its status and progress in the
+`background_tasks` collection so admins can poll it.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_COMPLETED = "completed"
+TASK_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def ensure_background_task_indexes(db):
+    """Indexes for the background_tasks collection"""
+    await db.background_tasks.create_index("task_id", unique=True)
+    await db.background_tasks.create_index([("task_type", 1), ("created_at", -1)])
+
+
+async def create_task(db, task_type: str, created_by: str, params: Optional[dict] = None) -> dict:
+    """Register a new background task and return its record"""
+    task_doc = {
+        "task_id": f"task_{uuid.uuid4().hex[:12]}",
+        "task_type": task_type,
+        "status": TASK_PENDING,
+        "params": params or {},
+        "processed": 0,
+        "total": None,
+        "result": None,
+        "error": None,
+        "created_by": created_by,
+        "created_at": _now(),
+        "updated_at": _now(),
+        "completed_at": None
+    }
+    await db.background_tasks.insert_one(dict(task_doc))
+    return task_doc
+
+
+async def mark_running(db, task_id: str, total: Optional[int] = None):
+    await db.background_tasks.update_one(
+        {"task_id": task_id},
+        {"$set": {"status": TASK_RUNNING, "total": total, "updated_at": _now()}}
+    )
+
+
+async def update_progress(db, task_id: str, processed: int, total: Optional[int] = None, **extra):
+    """Record how many items have been processed so far"""
+    update = {"processed": processed, "updated_at": _now(), **extra}
+    if total is not None:
+        update["total"] = total
+    await db.background_tasks.update_one({"task_id": task_id}, {"$set": update})
+
+
+async def complete_task(db, task_id: str, result: Optional[dict] = None):
+    await db.background_tasks.update_one(
+        {"task_id": task_id},
+        {"$set": {
+            "status": TASK_COMPLETED,
+            "result": result or {},
+            "updated_at": _now(),
+            "completed_at": _now()
+        }}
+    )
+
+
+async def fail_task(db, task_id: str, error: str):
+    logger.error(f"Background task {task_id} failed: {error}")
+    await db.background_tasks.update_one(
+        {"task_id": task_id},
+        {"$set": {
+            "status": TASK_FAILED,
+            "error": error,
+            "updated_at": _now(),
+            "completed_at": _now()
+        }}
+    )
+
+
+async def get_task(db, task_id: str) -> Optional[dict]:
+    return await db.background_tasks.find_one({"task_id": task_id}, {"_id": 0})
+
+
+async def get_latest_task(db, task_type: str, params: Optional[dict] = None) -> Optional[dict]:
+    """Most recent task of a type, optionally matching params (e.g. a job_id)"""
+    query = {"task_type": task_type}
+    for key, value in (params or {}).items():
+        query[f"params.{key}"] = value
+    return await db.background_tasks.find_one(query, {"_id": 0}, sort=[("created_at", -1)])
+
+
+async def run_task(db, task_id: str, func, *args, **kwargs):
+    """
+    Run `func(*args, progress=callback, **kwargs)` as a tracked task.
+
+    `func` receives an async `progress(processed, total=None)` callback and
+    returns a result dict that is stored on completion.
+    """
+    async def progress(processed: int, total: Optional[int] = None, **extra):
+        await update_progress(db, task_id, processed, total, **extra)
+
+    await mark_running(db, task_id)
+    try:
+        result = await func(*args, progress=progress, **kwargs)
+        await complete_task(db, task_id, result)
+    except Exception as e:
+        await fail_task(db, task_id, str(e))
@@ -0,0 +1,80 @@
+"""
+Background Leader - periodic loops run on one worker at a time
+
+Every worker process runs the same startup hooks, so periodic loops
+(digests, reminders, no-show risk refresh, analytics sync, CV storage GC)
+would otherwise run once per worker. Workers compete for a lease document
+in `background_leases`: the holder runs the loops and renews the lease,
+and when it stops renewing (crash, shutdown) another worker takes over
+after BACKGROUND_LEASE_SECONDS. RUN_BACKGROUND_LOOPS=false keeps a process
+out of the election entirely, e.g. for API-only replicas.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_LOOPS_ENABLED = os.environ.get("RUN_BACKGROUND_LOOPS", "true").strip().lower() not in ("false", "0", "no")
+LEASE_SECONDS = int(os.environ.get("BACKGROUND_LEASE_SECONDS", "60"))
+
+LEASE_ID = "background_loops"
+
+
+def is_enabled() -> bool:
+    return BACKGROUND_LOOPS_ENABLED
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+async def acquire_lease(db, holder: str, seconds: float = LEASE_SECONDS, lease_id: str = LEASE_ID) -> bool:
+    """Take or renew the lease; False while another worker holds an unexpired one"""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.background_leases.update_one(
+            {"_id": lease_id, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=seconds), "renewed_at": now}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The lease exists and belongs to a live worker, so the upsert tried to insert a second one
+        return False
+    return True
+
+
+def _cancel(tasks: list):
+    for task in tasks:
+        task.cancel()
+
+
+async def run_as_leader(db, loops: List[Callable], holder: str = None, seconds: float = LEASE_SECONDS):
+    """Run `loops` (each called with db) only while this worker holds the lease"""
+    holder = holder or worker_id()
+    tasks = []
+    try:
+        while True:
+            try:
+                held = await acquire_lease(db, holder, seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background lease renewal failed: {str(e)}")
+                held = False
+            if held and not tasks:
+                logger.info(f"Worker {holder} took the background lease; starting {len(loops)} loop(s)")
+                tasks = [asyncio.create_task(loop(db)) for loop in loops]
+            elif not held and tasks:
+                logger.info(f"Worker {holder} lost the background lease; stopping its loops")
+                _cancel(tasks)
+                tasks = []
+            await asyncio.sleep(seconds / 3)
+    finally:
+        _cancel(tasks)
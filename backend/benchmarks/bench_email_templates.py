@@ -0,0 +1,67 @@
+"""
+Email template rendering benchmark
+
+Compares rendering through the compiled template cache with parsing and
+compiling the template on every send, and rendering an event's shared
+body once versus once per recipient.
+
+Usage: python benchmarks/bench_email_templates.py [iterations]
+"""
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from email_renderer import TEMPLATE_DIR, _environment, get_template, render_template  # noqa: E402
+
+JOB = {
+    "job_id": "job_bench",
+    "title": "Senior Backend Engineer",
+    "location": "Bengaluru",
+    "work_model": "Hybrid",
+    "experience_range": {"min_years": 4, "max_years": 8},
+    "employment_type": "Full-time",
+    "required_skills": ["Python", "FastAPI", "MongoDB", "AWS", "Docker"]
+}
+CLIENT = {"company_name": "Acme & Sons"}
+CONTEXT = {"job": JOB, "client": CLIENT, "submitted_by": "client@acme.test", "now": datetime(2026, 1, 15, 10, 30)}
+RECIPIENTS = 25
+
+
+def render_uncached():
+    source = (TEMPLATE_DIR / "new_job.html").read_text()
+    return _environment.from_string(source).render(**CONTEXT)
+
+
+def render_cached():
+    return render_template("new_job.html", **CONTEXT)
+
+
+def render_per_recipient():
+    return [render_template("new_job.html", **CONTEXT) for _ in range(RECIPIENTS)]
+
+
+def render_shared():
+    body = render_template("new_job.html", **CONTEXT)
+    return [body for _ in range(RECIPIENTS)]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    get_template("new_job.html")
+
+    print(f"new_job.html, {iterations} iterations")
+    for label, func, n in [
+        ("compile + render per email", render_uncached, iterations // 10),
+        ("cached compiled template", render_cached, iterations),
+        (f"render per recipient (x{RECIPIENTS})", render_per_recipient, iterations // RECIPIENTS),
+        (f"render once, shared (x{RECIPIENTS})", render_shared, iterations // RECIPIENTS),
+    ]:
+        seconds = timeit.timeit(func, number=max(n, 1))
+        print(f"  {label:<36} {seconds / max(n, 1) * 1e6:10.1f} us/op")
+
+
+if __name__ == "__main__":
+    main()
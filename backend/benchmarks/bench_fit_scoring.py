@@ -0,0 +1,75 @@
+"""
+Fit scoring benchmark: scalar loop vs batch scorer
+
+Builds a synthetic job with N applicants and times scoring them one by one
+with calculate_fit_score against rank_candidates.
+
+Usage: python benchmarks/bench_fit_scoring.py [candidates]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fit_scoring import calculate_fit_score, rank_candidates, score_candidates  # noqa: E402
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "react native", "node.js", "node",
+    "sql", "mysql", "postgresql", "mongodb", "aws", "azure", "gcp", "docker", "kubernetes",
+    "terraform", "go", "rust", "c++", "machine learning", "pandas", "numpy", "fastapi",
+    "django", "flask", "spring boot", "kafka", "redis", "graphql", "html", "css", "figma"
+]
+ROLES = [
+    "Senior Software Engineer", "Backend Developer", "Full Stack Developer", "Data Analyst",
+    "Engineering Manager", "DevOps Engineer", "Tech Lead", "Consultant", "QA Engineer", "Architect"
+]
+
+
+def make_candidates(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(n):
+        start = rng.randint(2005, 2020)
+        experience = []
+        for _ in range(rng.randint(1, 5)):
+            end = start + rng.randint(1, 4)
+            experience.append({"duration": f"{start} - {end}"})
+            start = end
+        experience[-1]["duration"] = f"{start} - Present"
+        candidates.append({
+            "candidate_id": f"cand_{i}",
+            "skills": rng.sample(SKILLS, rng.randint(4, 15)),
+            "experience": experience,
+            "current_role": rng.choice(ROLES)
+        })
+    return candidates
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    job = {
+        "title": "Senior Backend Engineer",
+        "required_skills": ["Python", "FastAPI", "MongoDB", "AWS", "Docker", "Kafka", "SQL", "React"],
+        "experience_range": {"min_years": 5, "max_years": 10}
+    }
+    candidates = make_candidates(n)
+
+    start = time.perf_counter()
+    scalar = [calculate_fit_score(c, job) for c in candidates]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ranked = rank_candidates(job, candidates)
+    batch_seconds = time.perf_counter() - start
+
+    assert list(score_candidates(job, candidates)) == scalar
+    print(f"{n} candidates")
+    print(f"  scalar calculate_fit_score loop  {scalar_seconds * 1000:8.1f} ms")
+    print(f"  rank_candidates (batch + sort)   {batch_seconds * 1000:8.1f} ms")
+    print(f"  top score {ranked[0][1]}, scores identical: True")
+
+
+if __name__ == "__main__":
+    main()
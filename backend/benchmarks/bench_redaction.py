@@ -0,0 +1,87 @@
+"""
+Redaction benchmark: five re.sub passes vs the single-pass engine
+
+Generates CV-like text of the requested size with emails, phone numbers and
+URLs sprinkled in, and times the previous five-pass redact_text against
+redaction.redact (which also returns spans).
+
+Usage: python benchmarks/bench_redaction.py [kilobytes] [repeats]
+"""
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from redaction import apply_spans, redact  # noqa: E402
+
+WORDS = (
+    "experienced engineer python java cloud team delivered platform services design api scalable "
+    "data pipeline led migration improved latency customers stakeholders agile reporting analytics "
+    "managed budget mentored developers built tested deployed production monitoring 2019 2021 2023"
+).split()
+
+CONTACTS = [
+    "jane.doe@example.com",
+    "+91 98765 43210",
+    "(555) 123-4567",
+    "555-1234",
+    "https://www.linkedin.com/in/jane-doe",
+    "https://github.com/janedoe",
+    "j.smith+cv@mail.co.uk",
+]
+
+
+def five_pass_redact(text: str) -> str:
+    """The redact_text implementation this engine replaced"""
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL REDACTED]', text)
+    text = re.sub(r'\b(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3,4}[-.\s]?\d{4}\b', '[PHONE REDACTED]', text)
+    text = re.sub(r'\b\d{3}-\d{4}\b', '[PHONE REDACTED]', text)
+    text = re.sub(r'https?://(www\.)?linkedin\.com/[^\s]+', '[LINKEDIN REDACTED]', text)
+    text = re.sub(r'https?://[^\s]+', '[URL REDACTED]', text)
+    return text
+
+
+def make_cv(kilobytes: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < kilobytes * 1024:
+        word = rng.choice(CONTACTS) if rng.random() < 0.01 else rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+        if rng.random() < 0.08:
+            words.append("\n")
+    return " ".join(words)
+
+
+def best_of(repeats: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    kilobytes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    cv = make_cv(kilobytes)
+
+    redacted, spans = redact(cv)
+    identical = redacted == five_pass_redact(cv)  # Can differ only where contact details touch
+    assert apply_spans(cv, spans) == redacted
+
+    five_pass = best_of(repeats, five_pass_redact, cv)
+    single_pass = best_of(repeats, redact, cv)
+    print(f"{len(cv) / 1024:.0f} KB CV, {len(spans)} redactions (best of {repeats})")
+    print(f"  five re.sub passes        {five_pass * 1000:7.2f} ms")
+    print(f"  single pass + spans       {single_pass * 1000:7.2f} ms")
+    print(f"  outputs identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
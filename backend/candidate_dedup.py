@@ -0,0 +1,157 @@
+"""
+Candidate Dedup - near-duplicate CV detection with MinHash and LSH
+
+The same person is often uploaded several times across jobs and
+recruiters. Each candidate stores a MinHash signature of its CV text
+(word 3-shingles, 128 hash functions) and the LSH band keys derived from
+it (16 bands x 8 rows, multikey-indexed). At upload the new CV's bands are
+looked up with one indexed query, and only colliding candidates have their
+signatures compared - before any storage or AI parsing is spent.
+"""
+import hashlib
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "candidate_minhash_backfill"
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Estimated Jaccard similarity at which a CV is reported as a likely duplicate
+DUPLICATE_THRESHOLD = 0.8
+MAX_MATCHES = 5
+
+# CVs with fewer shingles than this are too short to compare meaningfully
+MIN_SHINGLES = 20
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+BACKFILL_BATCH_SIZE = 500
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=1)
+def permutations():
+    """Fixed (a, b) coefficients of the hash functions, identical in every process"""
+    coefficients = [
+        int.from_bytes(hashlib.blake2b(f"minhash:{i}".encode(), digest_size=8).digest(), "big")
+        for i in range(2 * NUM_PERM)
+    ]
+    coefficients = np.array(coefficients, dtype=np.uint64) % MERSENNE_PRIME
+    a, b = coefficients[:NUM_PERM], coefficients[NUM_PERM:]
+    return np.maximum(a, np.uint64(1)), b
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """32-bit hashes of the distinct word shingles of a text"""
+    words = WORD_PATTERN.findall((text or "").lower())
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of a text, or None if it is too short"""
+    hashes = shingle_hashes(text)
+    if hashes.size < MIN_SHINGLES:
+        return None
+    a, b = permutations()
+    # (a * x + b) mod p for every shingle and hash function; uint64 arithmetic wraps like datasketch
+    permuted = (np.outer(hashes, a) + b) % MERSENNE_PRIME & MAX_HASH
+    return permuted.min(axis=0)
+
+
+def band_keys(signature: np.ndarray) -> List[int]:
+    """One LSH key per band; the band number is part of the hash"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS].astype("<u4").tobytes()
+        digest = hashlib.blake2b(bytes([band]) + rows, digest_size=7).digest()
+        keys.append(int.from_bytes(digest, "big"))
+    return keys
+
+
+def estimated_similarity(signature: np.ndarray, other) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(signature == np.asarray(other, dtype=np.uint64)))
+
+
+def dedup_fields(text: str) -> dict:
+    """Fields stored on a candidate for duplicate detection"""
+    signature = minhash_signature(text)
+    if signature is None:
+        return {"minhash_signature": None, "minhash_bands": []}
+    return {"minhash_signature": signature.tolist(), "minhash_bands": band_keys(signature)}
+
+
+# ============ PERSISTENCE ============
+
+async def ensure_dedup_indexes(db):
+    await db.candidates.create_index("minhash_bands")
+
+
+async def find_duplicates(db, text: str, exclude_candidate_id: Optional[str] = None,
+                          threshold: float = DUPLICATE_THRESHOLD, limit: int = MAX_MATCHES) -> List[dict]:
+    """Existing candidates whose CV is a near-duplicate of `text`, most similar first"""
+    signature = minhash_signature(text)
+    if signature is None:
+        return []
+
+    query = {"minhash_bands": {"$in": band_keys(signature)}}
+    if exclude_candidate_id:
+        query["candidate_id"] = {"$ne": exclude_candidate_id}
+    projection = {"_id": 0, "candidate_id": 1, "job_id": 1, "name": 1, "created_by": 1, "minhash_signature": 1}
+
+    matches = []
+    async for candidate in db.candidates.find(query, projection):
+        similarity = estimated_similarity(signature, candidate["minhash_signature"])
+        if similarity >= threshold:
+            candidate.pop("minhash_signature")
+            candidate["similarity"] = round(similarity, 3)
+            matches.append(candidate)
+
+    matches.sort(key=lambda m: m["similarity"], reverse=True)
+    return matches[:limit]
+
+
+async def backfill_signatures(db, progress=None, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """Compute MinHash signatures for candidates that do not have one yet"""
+    query = {"minhash_bands": {"$exists": False}, "cv_text_original": {"$exists": True}}
+    total = await db.candidates.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    processed = 0
+    operations = []
+    cursor = db.candidates.find(query, {"_id": 0, "candidate_id": 1, "cv_text_original": 1})
+    async for candidate in cursor.batch_size(batch_size):
+        operations.append(UpdateOne(
+            {"candidate_id": candidate["candidate_id"]},
+            {"$set": dedup_fields(candidate.get("cv_text_original") or "")}
+        ))
+        processed += 1
+        if len(operations) >= batch_size:
+            await db.candidates.bulk_write(operations, ordered=False)
+            operations = []
+            if progress:
+                await progress(processed, total)
+
+    if operations:
+        await db.candidates.bulk_write(operations, ordered=False)
+    if progress:
+        await progress(processed, total)
+    return {"candidates": processed}
@@ -0,0 +1,304 @@
+"""
+Candidate Identity - normalized contact keys and identity resolution
+
+Candidates and candidate portal users store `email_key` (trimmed,
+lowercased email) and `phone_key` (last 10 digits of the phone number)
+next to the raw values. Both are indexed, so finding "every candidate
+record of this person" is an indexed lookup instead of an unindexed,
+case-sensitive match on `email`. Keys are computed on every write that sets
+email or phone.
+
+Documents written before the keys existed are migrated once, in the
+background at startup. The migration backfills the keys, makes `email_key`
+unique on `candidate_portal_users` and records itself as done in
+`migrations`, so later boots skip the scan. Until it has finished, lookups
+also match the raw `email`, so older accounts and records are still found.
+
+Portal accounts whose emails differ only in case are never merged
+automatically. They are recorded in `portal_email_conflicts` and the
+unique index waits until an admin has merged each of them.
+"""
+import logging
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "identity_keys_backfill"
+
+PHONE_KEY_DIGITS = 10
+MIN_PHONE_DIGITS = 7
+
+BACKFILL_BATCH_SIZE = 500
+
+MIGRATION_ID = "identity_keys"
+PORTAL_EMAIL_INDEX = "email_key_1"
+
+# Attempts at the unique index when registrations keep racing its build
+UNIQUE_INDEX_ATTEMPTS = 3
+
+# Set once every document is known to carry its keys; until then lookups also match raw emails
+_keys_complete = False
+
+NON_DIGITS = re.compile(r"\D")
+
+
+def email_key(email: Optional[str]) -> Optional[str]:
+    if not email or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+def phone_key(phone: Optional[str]) -> Optional[str]:
+    """Last 10 digits, so "+91 98765-43210" and "9876543210" share a key"""
+    if not phone:
+        return None
+    digits = NON_DIGITS.sub("", phone)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def identity_keys(email: Optional[str] = None, phone: Optional[str] = None) -> dict:
+    """Key fields to store alongside a document's email and phone"""
+    return {"email_key": email_key(email), "phone_key": phone_key(phone)}
+
+
+def contact_key_updates(update: dict) -> dict:
+    """Key fields for an update that sets email and/or phone"""
+    keys = {}
+    if "email" in update:
+        keys["email_key"] = email_key(update["email"])
+    if "phone" in update:
+        keys["phone_key"] = phone_key(update["phone"])
+    return keys
+
+
+async def ensure_identity_indexes(db):
+    await db.candidates.create_index("email_key", sparse=True)
+    await db.candidates.create_index("phone_key", sparse=True)
+    await db.candidates.create_index("candidate_portal_id", sparse=True)
+    await db.candidate_portal_users.create_index("candidate_portal_id")
+    # The migration makes this unique once no conflicts remain; until then keep lookups indexed
+    if PORTAL_EMAIL_INDEX not in await db.candidate_portal_users.index_information():
+        await db.candidate_portal_users.create_index("email_key", name=PORTAL_EMAIL_INDEX, sparse=True)
+
+
+def keys_complete() -> bool:
+    return _keys_complete
+
+
+def _email_clauses(email: Optional[str]) -> List[dict]:
+    key = email_key(email)
+    if not key:
+        return []
+    if _keys_complete:
+        return [{"email_key": key}]
+    return [{"email_key": key}, {"email": email}]
+
+
+def email_query(email: Optional[str]) -> Optional[dict]:
+    """Query matching documents by email, case-insensitively once keys are complete"""
+    clauses = _email_clauses(email)
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+async def find_portal_user(db, email: str, projection: Optional[dict] = None) -> Optional[dict]:
+    """Candidate portal user by email, case-insensitively"""
+    query = email_query(email)
+    if query is None:
+        return None
+    # Until conflicts are merged two accounts can share a key; the one registered with this exact email wins
+    matches = await db.candidate_portal_users.find(query, projection).limit(2).to_list(2)
+    if not matches:
+        return None
+    return next((user for user in matches if user.get("email") == email.strip()), matches[0])
+
+
+def candidate_records_query(portal_user: Optional[dict] = None, email: Optional[str] = None,
+                            phone: Optional[str] = None) -> Optional[dict]:
+    """Query for every candidate record of one person; each branch is an indexed point lookup"""
+    clauses = []
+    if portal_user and portal_user.get("candidate_portal_id"):
+        clauses.append({"candidate_portal_id": portal_user["candidate_portal_id"]})
+    clauses.extend(_email_clauses(email or (portal_user or {}).get("email")))
+    key = phone_key(phone)
+    if key:
+        clauses.append({"phone_key": key})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+async def find_candidate_records(db, portal_user: Optional[dict] = None, email: Optional[str] = None,
+                                 phone: Optional[str] = None, projection: Optional[dict] = None,
+                                 limit: int = 100) -> List[dict]:
+    """Candidate records belonging to a portal user and/or contact details"""
+    query = candidate_records_query(portal_user, email, phone)
+    if query is None:
+        return []
+    return await db.candidates.find(query, projection or {"_id": 0}).to_list(limit)
+
+
+async def candidate_ids_for(db, portal_user: dict) -> List[str]:
+    """IDs of a portal user's candidate records (linked by portal ID or email)"""
+    records = await find_candidate_records(db, portal_user, projection={"_id": 0, "candidate_id": 1})
+    return [r["candidate_id"] for r in records]
+
+
+async def _backfill_collection(db, collection: str, id_field: str, progress=None, offset: int = 0,
+                               total: int = 0, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    processed = 0
+    operations = []
+    query = {"email_key": {"$exists": False}}
+    cursor = db[collection].find(query, {"_id": 0, id_field: 1, "email": 1, "phone": 1})
+    async for doc in cursor.batch_size(batch_size):
+        operations.append(UpdateOne(
+            {id_field: doc[id_field]},
+            {"$set": identity_keys(doc.get("email"), doc.get("phone"))}
+        ))
+        processed += 1
+        if len(operations) >= batch_size:
+            await db[collection].bulk_write(operations, ordered=False)
+            operations = []
+            if progress:
+                await progress(offset + processed, total)
+    if operations:
+        await db[collection].bulk_write(operations, ordered=False)
+    return processed
+
+
+async def backfill_identity_keys(db, progress=None) -> dict:
+    """Compute contact keys for documents written before they existed (safe to re-run)"""
+    query = {"email_key": {"$exists": False}}
+    total = await db.candidates.count_documents(query) + await db.candidate_portal_users.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    candidates = await _backfill_collection(db, "candidates", "candidate_id", progress, 0, total)
+    portal_users = await _backfill_collection(
+        db, "candidate_portal_users", "candidate_portal_id", progress, candidates, total
+    )
+    if progress:
+        await progress(candidates + portal_users, total)
+    if candidates or portal_users:
+        logger.info(f"Backfilled identity keys: {candidates} candidates, {portal_users} portal users")
+    return {"candidates": candidates, "portal_users": portal_users}
+
+
+async def find_portal_email_conflicts(db) -> List[dict]:
+    """Groups of portal accounts sharing an email_key, oldest account first"""
+    groups = await db.candidate_portal_users.aggregate([
+        {"$match": {"email_key": {"$type": "string"}}},
+        {"$sort": {"created_at": 1}},
+        {"$group": {"_id": "$email_key", "ids": {"$push": "$candidate_portal_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]).to_list(None)
+    return [{"email_key": group["_id"], "candidate_portal_ids": group["ids"]} for group in groups]
+
+
+async def record_portal_email_conflicts(db, conflicts: List[dict]):
+    """Replace the stored conflict list that admins resolve with merge_portal_users"""
+    now = datetime.now(timezone.utc).isoformat()
+    for conflict in conflicts:
+        await db.portal_email_conflicts.update_one(
+            {"_id": conflict["email_key"]},
+            {"$set": {**conflict, "detected_at": now}},
+            upsert=True
+        )
+    await db.portal_email_conflicts.delete_many({"_id": {"$nin": [c["email_key"] for c in conflicts]}})
+    if conflicts:
+        logger.warning(
+            f"{len(conflicts)} portal emails are shared by several accounts; "
+            f"merge them to make email_key unique"
+        )
+
+
+async def ensure_unique_portal_email(db) -> bool:
+    """
+    Make the portal email_key index unique. Returns False, with the conflicts
+    recorded and a non-unique index in place, while accounts still share a key.
+    """
+    for _ in range(UNIQUE_INDEX_ATTEMPTS):
+        indexes = await db.candidate_portal_users.index_information()
+        existing = indexes.get(PORTAL_EMAIL_INDEX)
+        if existing and existing.get("unique"):
+            return True
+        conflicts = await find_portal_email_conflicts(db)
+        await record_portal_email_conflicts(db, conflicts)
+        if conflicts:
+            break
+        if existing:
+            await db.candidate_portal_users.drop_index(PORTAL_EMAIL_INDEX)
+        try:
+            await db.candidate_portal_users.create_index(
+                "email_key", name=PORTAL_EMAIL_INDEX, unique=True,
+                partialFilterExpression={"email_key": {"$type": "string"}}
+            )
+            return True
+        except DuplicateKeyError:
+            # A registration raced the build; look for conflicts again and retry
+            logger.warning("Duplicate portal email appeared while building the unique index")
+    if PORTAL_EMAIL_INDEX not in await db.candidate_portal_users.index_information():
+        await db.candidate_portal_users.create_index("email_key", name=PORTAL_EMAIL_INDEX, sparse=True)
+    return False
+
+
+async def merge_portal_users(db, email: str, keep_id: Optional[str] = None, merged_by: str = "system") -> dict:
+    """
+    Admin merge of the portal accounts sharing an email into one (the oldest
+    unless `keep_id` is given). Candidate records are relinked, the other
+    accounts are deactivated and the unique index is retried.
+    """
+    key = email_key(email)
+    accounts = await db.candidate_portal_users.find(
+        {"email_key": key}, {"_id": 0, "candidate_portal_id": 1, "created_at": 1}
+    ).to_list(None)
+    ids = [a["candidate_portal_id"] for a in sorted(accounts, key=lambda a: a.get("created_at") or "")]
+    if len(ids) < 2:
+        raise ValueError("No conflicting accounts for this email")
+    keep = keep_id or ids[0]
+    if keep not in ids:
+        raise ValueError("The account to keep does not use this email")
+    duplicates = [i for i in ids if i != keep]
+
+    await db.candidates.update_many(
+        {"candidate_portal_id": {"$in": duplicates}},
+        {"$set": {"candidate_portal_id": keep}}
+    )
+    # Kept for the record, but no longer found by email and unable to log in
+    await db.candidate_portal_users.update_many(
+        {"candidate_portal_id": {"$in": duplicates}},
+        {"$unset": {"email_key": ""}, "$set": {
+            "merged_into": keep, "is_active": False, "merged_by": merged_by,
+            "merged_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    await db.portal_email_conflicts.delete_many({"_id": key})
+    logger.info(f"{merged_by} merged portal accounts {duplicates} into {keep}")
+    return {"kept": keep, "merged": duplicates, "unique_index": await ensure_unique_portal_email(db)}
+
+
+async def migrate_identity_keys(db, progress=None, force: bool = False) -> dict:
+    """One-off migration to key-only lookups; skipped once recorded as done unless `force`"""
+    global _keys_complete
+    if not force and await db.migrations.find_one({"_id": MIGRATION_ID}):
+        _keys_complete = True
+        return {"already_done": True}
+
+    counts = await backfill_identity_keys(db, progress)
+    counts["unique_portal_email"] = await ensure_unique_portal_email(db)
+    counts["portal_email_conflicts"] = await db.portal_email_conflicts.count_documents({})
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"completed_at": datetime.now(timezone.utc).isoformat(), **counts}},
+        upsert=True
+    )
+    _keys_complete = True
+    return counts
@@ -0,0 +1,179 @@
+"""
+CV Storage - listing and deleting stored CV files
+
+CV files are uploaded to Cloudinary by `save_cv_file` under
+`resumes/<candidate_id>`. Candidates and CV versions only keep the delivery
+URL (`cv_file_url` / `file_url`), so deleting a file starts from that URL.
+`parse_cloudinary_url` recovers the resource type and public id from it.
+Image and video assets (PDFs are uploaded as images) have public ids
+without the file extension; raw assets (DOCX, text) keep it.
+
+A backend identifies each stored file by a key. `key_for_url` maps a
+stored URL to its key, `list_files` yields the keys (with creation time)
+of everything stored under the CV prefix, and `delete_keys` deletes by
+key. Several URLs can share a key: re-uploads overwrite the same public
+id and only the version segment of the URL changes.
+
+Deletes are batched per resource type, at most DELETE_BATCH_SIZE public ids
+per Admin API call, and run in a worker thread because the Cloudinary SDK
+is synchronous. Deleting an asset that is already gone succeeds, so callers
+can retry a deletion that was interrupted. `LocalCVStorage` keeps files in
+a directory instead and is used by the tests.
+"""
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Cloudinary Admin API limit for delete_resources
+DELETE_BATCH_SIZE = 100
+LIST_PAGE_SIZE = 500
+
+CV_PREFIX = "resumes/"
+# save_cv_file uploads with resource_type="auto": PDFs become images, DOCX and text raw files
+RESOURCE_TYPES = ("image", "raw")
+
+_VERSION_SEGMENT = re.compile(r"^v\d+$")
+
+
+def parse_cloudinary_url(url: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(resource_type, public_id) of a Cloudinary delivery URL, or None for other URLs"""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if not parsed.netloc.endswith("cloudinary.com"):
+        return None
+    parts = [unquote(p) for p in parsed.path.split("/") if p]
+    # /<cloud_name>/<resource_type>/upload/[<transformations>/][v<version>/]<public_id>
+    try:
+        upload_at = parts.index("upload")
+    except ValueError:
+        return None
+    if upload_at < 1:
+        return None
+    resource_type = parts[upload_at - 1]
+    rest = parts[upload_at + 1:]
+    for i, part in enumerate(rest):
+        if _VERSION_SEGMENT.match(part):
+            rest = rest[i + 1:]
+            break
+    if not rest:
+        return None
+    public_id = "/".join(rest)
+    if resource_type != "raw":
+        public_id = public_id.rsplit(".", 1)[0]
+    return resource_type, public_id
+
+
+class CloudinaryCVStorage:
+    """CV files stored as Cloudinary assets, keyed `<resource_type>/<public_id>`"""
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        parsed = parse_cloudinary_url(url)
+        return f"{parsed[0]}/{parsed[1]}" if parsed else None
+
+    def _list_page(self, resource_type: str, next_cursor: Optional[str]) -> dict:
+        import cloudinary.api
+        options = {"type": "upload", "prefix": CV_PREFIX, "max_results": LIST_PAGE_SIZE}
+        if next_cursor:
+            options["next_cursor"] = next_cursor
+        return cloudinary.api.resources(resource_type=resource_type, **options)
+
+    async def list_files(self) -> AsyncIterator[Tuple[str, datetime]]:
+        """Yield (key, created_at) for every stored CV file"""
+        for resource_type in RESOURCE_TYPES:
+            next_cursor = None
+            while True:
+                page = await asyncio.to_thread(self._list_page, resource_type, next_cursor)
+                for resource in page.get("resources") or []:
+                    created_at = datetime.fromisoformat(resource["created_at"].replace("Z", "+00:00"))
+                    yield f"{resource_type}/{resource['public_id']}", created_at
+                next_cursor = page.get("next_cursor")
+                if not next_cursor:
+                    break
+
+    def _delete_resources(self, resource_type: str, public_ids: List[str]) -> int:
+        import cloudinary.api
+        result = cloudinary.api.delete_resources(public_ids, resource_type=resource_type, type="upload")
+        return sum(1 for status in (result.get("deleted") or {}).values() if status == "deleted")
+
+    async def delete_keys(self, keys: Iterable[str]) -> int:
+        """Delete files by key; returns how many existed and were deleted"""
+        by_type: Dict[str, set] = {}
+        for key in keys:
+            resource_type, public_id = key.split("/", 1)
+            by_type.setdefault(resource_type, set()).add(public_id)
+        deleted = 0
+        for resource_type, public_ids in by_type.items():
+            public_ids = sorted(public_ids)
+            for i in range(0, len(public_ids), DELETE_BATCH_SIZE):
+                deleted += await asyncio.to_thread(
+                    self._delete_resources, resource_type, public_ids[i:i + DELETE_BATCH_SIZE]
+                )
+        return deleted
+
+    async def delete_files(self, urls: Iterable[str]) -> int:
+        """Delete the files behind `urls`; returns how many existed and were deleted"""
+        return await self.delete_keys({key for key in map(self.key_for_url, urls) if key})
+
+
+class LocalCVStorage:
+    """CV files in a local directory, served under `base_url`, keyed by relative path"""
+
+    def __init__(self, root, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/") + "/"
+
+    def url_for(self, key: str) -> str:
+        return self.base_url + key
+
+    def save_file(self, key: str, data: bytes) -> str:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return self.url_for(key)
+
+    def key_for_url(self, url: Optional[str]) -> Optional[str]:
+        if not url or not url.startswith(self.base_url):
+            return None
+        return unquote(url[len(self.base_url):].split("?", 1)[0]) or None
+
+    async def list_files(self) -> AsyncIterator[Tuple[str, datetime]]:
+        prefix_dir = self.root / CV_PREFIX
+        if not prefix_dir.is_dir():
+            return
+        for dirpath, _, filenames in os.walk(prefix_dir):
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                yield (path.relative_to(self.root).as_posix(),
+                       datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc))
+
+    async def delete_keys(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        root = self.root.resolve()
+        for key in set(keys):
+            path = (self.root / key).resolve()
+            if root in path.parents and path.is_file():
+                path.unlink()
+                deleted += 1
+        return deleted
+
+    async def delete_files(self, urls: Iterable[str]) -> int:
+        return await self.delete_keys({key for key in map(self.key_for_url, urls) if key})
+
+
+_storage = None
+
+
+def get_storage():
+    """The configured CV storage backend"""
+    global _storage
+    if _storage is None:
+        _storage = CloudinaryCVStorage()
+    return _storage
@@ -0,0 +1,40 @@
+"""
+Email Renderer - compiled Jinja2 templates for notification emails
+
+Templates live in backend/email_templates/. Each one is parsed and
+compiled to Python bytecode the first time it is used and kept for the
+life of the process, so a render only evaluates the per-email variables.
+Values are HTML-escaped on output.
+"""
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).parent / "email_templates"
+
+_environment = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html"]),
+    undefined=StrictUndefined,
+    # Templates ship with the code; never stat the files again after compiling
+    auto_reload=False,
+    keep_trailing_newline=True
+)
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str):
+    """Compiled template by file name, compiled once per process"""
+    return _environment.get_template(name)
+
+
+def render_template(template_name: str, /, **context) -> str:
+    """Render an email body"""
+    return get_template(template_name).render(**context)
+
+
+def precompile_templates():
+    """Compile every template up front (e.g. at startup) instead of on first send"""
+    for path in sorted(TEMPLATE_DIR.glob("*.html")):
+        get_template(path.name)
@@ -0,0 +1,124 @@
+"""
+Fit Rescoring - keep stored fit scores in line with job requirements
+
+When a job's title, required skills or experience range change, the
+`ai_story.fit_score` stored on its candidates is recomputed in the
+background with the deterministic batch scorer. Each candidate stores a
+`fit_score_signature` (a hash of the job and candidate scoring inputs), so
+a rerun only rewrites candidates whose inputs changed since they were last
+scored.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from fit_scoring import SCORING_VERSION, score_candidates
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "job_fit_rescore"
+
+# Job fields that feed the fit score; changing any of them triggers a rescore
+JOB_SCORING_FIELDS = ("title", "required_skills", "experience_range")
+CANDIDATE_SCORING_FIELDS = ("skills", "skill_ids", "experience", "current_role")
+
+RESCORE_BATCH_SIZE = 500
+
+
+async def ensure_rescoring_indexes(db):
+    await db.candidates.create_index("job_id")
+
+
+def scoring_inputs_changed(job: dict, update_data: dict) -> bool:
+    """Whether a job update touches any field the fit score depends on"""
+    return any(
+        field in update_data and update_data[field] != job.get(field)
+        for field in JOB_SCORING_FIELDS
+    )
+
+
+def _digest(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def job_signature(job: dict) -> str:
+    inputs = {field: job.get(field) for field in JOB_SCORING_FIELDS}
+    inputs["scoring_version"] = SCORING_VERSION
+    return _digest(inputs)
+
+
+def fit_score_signature(job_sig: str, candidate: dict) -> str:
+    """Hash of everything the deterministic fit score depends on"""
+    return _digest([job_sig, {field: candidate.get(field) for field in CANDIDATE_SCORING_FIELDS}])
+
+
+async def _rescore_batch(db, job: dict, job_sig: str, batch: list, force: bool) -> int:
+    signatures = [fit_score_signature(job_sig, candidate) for candidate in batch]
+    stale = [
+        (candidate, signature)
+        for candidate, signature in zip(batch, signatures)
+        if force or candidate.get("fit_score_signature") != signature
+    ]
+    if not stale:
+        return 0
+
+    scores = score_candidates(job, [candidate for candidate, _ in stale])
+    now = datetime.now(timezone.utc).isoformat()
+    operations = [
+        UpdateOne(
+            {"candidate_id": candidate["candidate_id"], "ai_story": {"$type": "object"}},
+            {"$set": {
+                "ai_story.fit_score": int(score),
+                "fit_score_signature": signature,
+                "fit_score_updated_at": now
+            }}
+        )
+        for (candidate, signature), score in zip(stale, scores)
+    ]
+    await db.candidates.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def rescore_job_candidates(db, job_id: str, force: bool = False, progress=None,
+                                 batch_size: int = RESCORE_BATCH_SIZE) -> dict:
+    """
+    Recompute stored fit scores for every candidate of a job that has an AI story.
+    Candidates whose signature is unchanged are skipped unless `force` is set.
+    """
+    job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if not job:
+        raise ValueError(f"Job {job_id} not found")
+
+    job_sig = job_signature(job)
+    query = {"job_id": job_id, "ai_story": {"$type": "object"}}
+    projection = {"_id": 0, "candidate_id": 1, "fit_score_signature": 1}
+    projection.update({field: 1 for field in CANDIDATE_SCORING_FIELDS})
+
+    total = await db.candidates.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    processed = 0
+    rescored = 0
+    batch = []
+    async for candidate in db.candidates.find(query, projection).batch_size(batch_size):
+        batch.append(candidate)
+        if len(batch) >= batch_size:
+            rescored += await _rescore_batch(db, job, job_sig, batch, force)
+            processed += len(batch)
+            batch = []
+            if progress:
+                await progress(processed, total, rescored=rescored)
+
+    if batch:
+        rescored += await _rescore_batch(db, job, job_sig, batch, force)
+        processed += len(batch)
+    if progress:
+        await progress(processed, total, rescored=rescored)
+
+    logger.info(f"Rescored {rescored}/{processed} candidates for job {job_id}")
+    return {"job_id": job_id, "candidates": processed, "rescored": rescored, "unchanged": processed - rescored}
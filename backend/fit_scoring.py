@@ -0,0 +1,284 @@
+"""
+Fit Scoring - deterministic candidate/job fit scores
+
+`calculate_fit_score` scores a single candidate (used as the fallback when
+the AI story does not provide a score). `score_candidates` and
+`rank_candidates` score every candidate of a job in one pass: candidate
+features are extracted once, skills are mapped onto a shared vocabulary
+and the skill, experience and role components are computed as NumPy array
+operations. Both paths produce identical scores.
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from skill_taxonomy import canonical_skill, related_role_terms, skill_id
+
+logger = logging.getLogger(__name__)
+
+# Bump when the scoring rules or skill taxonomy change so stored scores get refreshed
+SCORING_VERSION = 2
+
+SKILLS_WEIGHT = 45
+EXPERIENCE_WEIGHT = 35
+ROLE_WEIGHT = 20
+
+# Share of the score given to CV/job description text similarity when it is requested
+SIMILARITY_WEIGHT = 20
+
+YEAR_PATTERN = re.compile(r'20\d{2}|19\d{2}')
+
+
+# ============ FEATURE EXTRACTION ============
+
+def normalize_skills(skills) -> set:
+    """Canonical skill names (aliases such as "ReactJS" map to "react")"""
+    return set([canonical_skill(s) for s in skills or [] if isinstance(s, str)])
+
+
+def candidate_skill_ids(candidate: dict, skills: set) -> set:
+    """Skill IDs stored on the candidate, computed from its skills when it predates them"""
+    ids = candidate.get('skill_ids')
+    if ids is None:
+        return {skill_id(s) for s in skills}
+    return set(ids)
+
+
+def title_keywords(title: str) -> set:
+    return set(title.replace('-', ' ').replace('/', ' ').split())
+
+
+@lru_cache(maxsize=4096)
+def duration_months(duration: str) -> int:
+    """Months credited for one experience entry's duration string"""
+    duration = duration.lower()
+    if 'present' in duration or 'current' in duration:
+        return 24  # Assume 2 years if current
+    if '-' in duration:
+        parts = duration.split('-')
+        if len(parts) == 2:
+            years = YEAR_PATTERN.findall(duration)
+            if len(years) >= 2:
+                return (int(years[1]) - int(years[0])) * 12
+            return 24
+        return 0
+    return 24
+
+
+def estimate_candidate_years(experience_list: list) -> int:
+    """Years of experience estimated from the parsed experience entries"""
+    candidate_years = len(experience_list) * 2  # Rough estimate: 2 years per position
+
+    # Try to extract actual years from duration strings
+    total_months = sum(duration_months(exp.get('duration') or '') for exp in experience_list)
+
+    return max(candidate_years, total_months // 12)
+
+
+def job_experience_bounds(job_data: dict) -> Tuple[int, int]:
+    exp_range = job_data.get('experience_range') or {}
+    return exp_range.get('min_years', 0), exp_range.get('max_years', 15)
+
+
+def has_related_role(job_title: str, candidate_role: str) -> bool:
+    for key, synonyms in related_role_terms().items():
+        if key in job_title:
+            for syn in synonyms:
+                if syn in candidate_role:
+                    return True
+    return False
+
+
+# ============ SINGLE CANDIDATE ============
+
+def calculate_fit_score(candidate_data: dict, job_data: dict) -> int:
+    """Calculate fit score based on skills, experience, and role alignment"""
+
+    # Skills Match (45% weight)
+    candidate_skills = normalize_skills(candidate_data.get('skills', []))
+    job_skills = normalize_skills(job_data.get('required_skills', []))
+
+    if job_skills:
+        # Direct match on the candidate's stored skill IDs
+        candidate_ids = candidate_skill_ids(candidate_data, candidate_skills)
+        matched = {js for js in job_skills if skill_id(js) in candidate_ids}
+        direct_matches = len(matched)
+        # Partial match (check if job skill is substring of candidate skill or vice versa)
+        partial_matches = 0
+        for js in job_skills:
+            if js not in matched:
+                for cs in candidate_skills:
+                    if js in cs or cs in js:
+                        partial_matches += 0.5
+                        break
+        total_matches = direct_matches + partial_matches
+        skills_match_score = min((total_matches / len(job_skills)) * SKILLS_WEIGHT, SKILLS_WEIGHT)
+    else:
+        skills_match_score = 22  # Base score if no job skills specified
+
+    # Experience Match (35% weight)
+    candidate_years = estimate_candidate_years(candidate_data.get('experience') or [])
+    min_years, max_years = job_experience_bounds(job_data)
+
+    if min_years <= candidate_years <= max_years:
+        exp_match_score = 35
+    elif candidate_years > max_years:
+        exp_match_score = 30  # Overqualified but still good
+    elif candidate_years >= min_years * 0.7:
+        exp_match_score = 25  # Close enough
+    else:
+        exp_match_score = max((candidate_years / min_years) * 35, 10) if min_years > 0 else 20
+
+    # Role Alignment (20% weight)
+    candidate_role = (candidate_data.get('current_role') or '').lower()
+    job_title = (job_data.get('title') or '').lower()
+
+    common_keywords = title_keywords(job_title) & title_keywords(candidate_role)
+    if common_keywords:
+        role_match_score = min(len(common_keywords) * 5 + 10, ROLE_WEIGHT)
+    elif has_related_role(job_title, candidate_role):
+        role_match_score = 15
+    else:
+        role_match_score = 8
+
+    total_score = int(skills_match_score + exp_match_score + role_match_score)
+    final_score = min(max(total_score, 20), 100)
+
+    logger.debug(
+        f"Fit score: skills={skills_match_score:.1f}, exp={exp_match_score:.1f}, "
+        f"role={role_match_score} = {final_score}%"
+    )
+
+    return final_score
+
+
+# ============ BATCH SCORING ============
+
+def _skill_component(job_skills: List[str], candidates: List[dict]) -> np.ndarray:
+    n = len(candidates)
+    if not job_skills:
+        return np.full(n, 22.0)
+
+    # Job skill columns by skill ID, for direct matches against each candidate's stored IDs
+    columns_by_id = {}
+    for j, js in enumerate(job_skills):
+        columns_by_id.setdefault(skill_id(js), []).append(j)
+    direct = np.zeros((n, len(job_skills)), dtype=bool)
+
+    # Flatten every candidate's normalized skills and code them against a shared vocabulary
+    vocabulary = {}
+    owners, codes = [], []
+    for i, candidate in enumerate(candidates):
+        skills = normalize_skills(candidate.get('skills', []))
+        for sid in candidate_skill_ids(candidate, skills):
+            for j in columns_by_id.get(sid, ()):
+                direct[i, j] = True
+        for skill in skills:
+            owners.append(i)
+            codes.append(vocabulary.setdefault(skill, len(vocabulary)))
+
+    # relation[j, v]: job skill j and vocabulary skill v are substrings of one another
+    relation = np.array(
+        [[js in skill or skill in js for skill in vocabulary] for js in job_skills],
+        dtype=bool
+    ).reshape(len(job_skills), len(vocabulary))
+
+    # Only skills related to some job skill can affect the score
+    relevant = np.flatnonzero(relation.any(axis=0))
+    if relevant.size == 0:
+        return np.minimum((direct.sum(axis=1) / len(job_skills)) * SKILLS_WEIGHT, SKILLS_WEIGHT)
+    column_of = np.full(len(vocabulary), -1)
+    column_of[relevant] = np.arange(relevant.size)
+
+    owners = np.array(owners, dtype=np.int64)
+    columns = column_of[np.array(codes, dtype=np.int64)]
+    keep = columns >= 0
+
+    # has_skill[i, v]: candidate i lists relevant skill v
+    has_skill = np.zeros((n, relevant.size), dtype=np.int32)
+    has_skill[owners[keep], columns[keep]] = 1
+
+    # Partial matches: half credit for unmatched job skills with a related candidate skill
+    partial = ((has_skill @ relation[:, relevant].T.astype(np.int32)) > 0) & ~direct
+
+    total_matches = direct.sum(axis=1) + partial.sum(axis=1) * 0.5
+    return np.minimum((total_matches / len(job_skills)) * SKILLS_WEIGHT, SKILLS_WEIGHT)
+
+
+def _experience_component(candidate_years: np.ndarray, min_years, max_years) -> np.ndarray:
+    if min_years > 0:
+        below = np.maximum((candidate_years / min_years) * 35, 10)
+    else:
+        below = np.full(candidate_years.shape, 20.0)
+    return np.select(
+        [
+            (min_years <= candidate_years) & (candidate_years <= max_years),
+            candidate_years > max_years,
+            candidate_years >= min_years * 0.7
+        ],
+        [35.0, 30.0, 25.0],
+        default=below
+    )
+
+
+def _role_component(job_title: str, candidate_roles: List[str]) -> np.ndarray:
+    job_keywords = title_keywords(job_title)
+
+    # Many candidates share a current role; score each distinct role once
+    unique_roles, inverse = np.unique(np.array(candidate_roles, dtype=object), return_inverse=True)
+    role_scores = np.empty(len(unique_roles))
+    for k, role in enumerate(unique_roles):
+        common = len(job_keywords & title_keywords(role))
+        if common:
+            role_scores[k] = min(common * 5 + 10, ROLE_WEIGHT)
+        elif has_related_role(job_title, role):
+            role_scores[k] = 15
+        else:
+            role_scores[k] = 8
+    return role_scores[inverse.reshape(-1)]
+
+
+def score_components(job_data: dict, candidates: List[dict]) -> dict:
+    """Skill, experience and role component arrays for every candidate"""
+    job_skills = sorted(normalize_skills(job_data.get('required_skills', [])))
+    min_years, max_years = job_experience_bounds(job_data)
+    job_title = (job_data.get('title') or '').lower()
+
+    candidate_years = np.array(
+        [estimate_candidate_years(c.get('experience') or []) for c in candidates], dtype=np.int64
+    )
+    candidate_roles = [(c.get('current_role') or '').lower() for c in candidates]
+
+    return {
+        "skills": _skill_component(job_skills, candidates),
+        "experience": _experience_component(candidate_years, min_years, max_years),
+        "role": _role_component(job_title, candidate_roles)
+    }
+
+
+def score_candidates(job_data: dict, candidates: List[dict], similarity: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Fit scores for all candidates, in input order (same values as calculate_fit_score).
+
+    With `similarity` (cosine similarity of each CV to the job description,
+    0-1), the keyword score is scaled down and the similarity contributes
+    SIMILARITY_WEIGHT points.
+    """
+    if not candidates:
+        return np.zeros(0, dtype=np.int64)
+    components = score_components(job_data, candidates)
+    total = components["skills"] + components["experience"] + components["role"]
+    if similarity is not None:
+        total = total * (100 - SIMILARITY_WEIGHT) / 100 + np.clip(similarity, 0, 1) * SIMILARITY_WEIGHT
+    return np.clip(total.astype(np.int64), 20, 100)
+
+
+def rank_candidates(job_data: dict, candidates: List[dict],
+                    similarity: Optional[np.ndarray] = None) -> List[Tuple[dict, int]]:
+    """Candidates paired with their fit score, best first (ties keep input order)"""
+    scores = score_candidates(job_data, candidates, similarity)
+    order = np.argsort(-scores, kind="stable")
+    return [(candidates[i], int(scores[i])) for i in order]
@@ -0,0 +1,364 @@
+"""
+Hiring Analytics - funnel conversion, time in stage and recruiter throughput
+
+Stage transitions are scattered over `candidates` (created = applied),
+`reviews` (approve / reject) and `audit_logs` (interview and hiring
+actions, keyed by interview). A sync job folds them into `hiring_events`:
+one small document per transition with client, job, candidate, stage, time
+and actor. Each source is read incrementally from a stored watermark on its
+timestamp index, with a short lookback. Events are upserted by a key derived
+from their source document, so re-reading the overlap is harmless.
+
+Metrics for a client (or one job) and a period (`2026-10`, `2026-Q4`,
+`2026`) load that client's events from the period start with one
+`(client_id, at)` index range, bounded FOLLOW_UP_DAYS past the period end.
+They are computed with vectorized pandas over a first-time-in-stage pivot.
+The cohort is the candidates who applied in the period. Results are cached
+in `hiring_analytics_cache` per client, job and period. A cached result
+stays valid until a sync writes new events.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from pymongo import UpdateOne
+
+from interview_availability import parse_time
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "hiring_events_sync"
+
+SYNC_MINUTES = int(os.environ.get("HIRING_ANALYTICS_SYNC_MINUTES", "15"))
+
+BATCH_SIZE = 1000
+# Re-read this much before each watermark; writes with close timestamps may commit out of order
+LOOKBACK = timedelta(minutes=5)
+# Stages reached this long after the period still count for its cohort
+FOLLOW_UP_DAYS = 180
+
+STATE_ID = "hiring_events"
+
+# Funnel stages in order; conversion is measured between neighbours
+FUNNEL = [
+    "applied", "approved", "interview_requested", "interview_confirmed", "interview_completed",
+    "interview_passed", "hired",
+]
+EXIT_STAGES = ["rejected", "interview_failed", "no_show", "interview_cancelled"]
+STAGES = FUNNEL + EXIT_STAGES + ["pipelined"]
+
+AUDIT_STAGES = {
+    "INTERVIEW_CREATE": "interview_requested",
+    "INTERVIEW_SLOT_BOOKED": "interview_confirmed",
+    "INTERVIEW_COMPLETED": "interview_completed",
+    "INTERVIEW_PASSED": "interview_passed",
+    "INTERVIEW_FAILED": "interview_failed",
+    "INTERVIEW_NO_SHOW": "no_show",
+    "INTERVIEW_CANCELLED": "interview_cancelled",
+    "HIRING_INITIATED": "hired",
+}
+REVIEW_STAGES = {"APPROVE": "approved", "PIPELINE": "pipelined", "REJECT": "rejected"}
+
+EVENT_COLUMNS = ["candidate_id", "job_id", "stage", "at", "actor", "actor_role"]
+
+
+def is_sync_enabled() -> bool:
+    return SYNC_MINUTES > 0
+
+
+async def ensure_analytics_indexes(db):
+    await db.hiring_events.create_index("event_id", unique=True)
+    await db.hiring_events.create_index([("client_id", 1), ("at", 1)])
+    await db.hiring_events.create_index([("client_id", 1), ("job_id", 1), ("at", 1)])
+    await db.hiring_analytics_cache.create_index("key", unique=True)
+    # Incremental sync reads each source by its timestamp
+    await db.audit_logs.create_index("timestamp")
+    await db.reviews.create_index("timestamp")
+    await db.candidates.create_index("created_at")
+
+
+# ============ SYNC ============
+
+async def _load_by_id(db, collection: str, id_field: str, ids, projection: dict) -> Dict[str, dict]:
+    ids = [i for i in ids if i]
+    if not ids:
+        return {}
+    docs = await db[collection].find({id_field: {"$in": ids}}, projection).to_list(len(ids))
+    return {doc[id_field]: doc for doc in docs}
+
+
+async def _job_clients(db, job_ids) -> Dict[str, str]:
+    jobs = await _load_by_id(db, "jobs", "job_id", set(job_ids), {"_id": 0, "job_id": 1, "client_id": 1})
+    return {job_id: job.get("client_id") for job_id, job in jobs.items()}
+
+
+def _event(event_id: str, stage: str, at, client_id, job_id, candidate_id, actor=None, actor_role=None,
+           interview_id=None) -> dict:
+    return {
+        "event_id": event_id, "stage": stage, "at": parse_time(at), "client_id": client_id, "job_id": job_id,
+        "candidate_id": candidate_id, "interview_id": interview_id, "actor": actor, "actor_role": actor_role,
+    }
+
+
+async def _candidate_events(db, candidates: List[dict]) -> List[dict]:
+    clients = await _job_clients(db, {c.get("job_id") for c in candidates})
+    return [
+        _event(f"applied:{c['candidate_id']}", "applied", c["created_at"], clients.get(c.get("job_id")),
+               c.get("job_id"), c["candidate_id"], actor=c.get("created_by"))
+        for c in candidates
+    ]
+
+
+async def _review_events(db, reviews: List[dict]) -> List[dict]:
+    candidates = await _load_by_id(
+        db, "candidates", "candidate_id", {r["candidate_id"] for r in reviews},
+        {"_id": 0, "candidate_id": 1, "job_id": 1}
+    )
+    clients = await _job_clients(db, {c.get("job_id") for c in candidates.values()})
+    events = []
+    for review in reviews:
+        job_id = candidates.get(review["candidate_id"], {}).get("job_id")
+        events.append(_event(
+            f"review:{review['review_id']}", REVIEW_STAGES[review["action"]], review["timestamp"],
+            clients.get(job_id), job_id, review["candidate_id"],
+            actor=review.get("user_id"), actor_role=review.get("user_role")
+        ))
+    return events
+
+
+async def _audit_events(db, logs: List[dict]) -> List[dict]:
+    interviews = await _load_by_id(
+        db, "interviews", "interview_id", {log.get("entity_id") for log in logs},
+        {"_id": 0, "interview_id": 1, "client_id": 1, "job_id": 1, "candidate_id": 1}
+    )
+    events = []
+    for log in logs:
+        interview = interviews.get(log.get("entity_id"))
+        if not interview:
+            continue
+        events.append(_event(
+            f"audit:{log['log_id']}", AUDIT_STAGES[log["action_type"]], log["timestamp"],
+            log.get("client_id") or interview.get("client_id"), interview.get("job_id"),
+            interview.get("candidate_id"), actor=log.get("user_email"), actor_role=log.get("user_role"),
+            interview_id=interview["interview_id"]
+        ))
+    return events
+
+
+# (collection, timestamp field, extra filter, projection, to_events)
+SOURCES = [
+    ("candidates", "created_at", {},
+     {"_id": 0, "candidate_id": 1, "job_id": 1, "created_at": 1, "created_by": 1}, _candidate_events),
+    ("reviews", "timestamp", {"action": {"$in": list(REVIEW_STAGES)}},
+     {"_id": 0, "review_id": 1, "candidate_id": 1, "action": 1, "timestamp": 1, "user_id": 1, "user_role": 1},
+     _review_events),
+    ("audit_logs", "timestamp", {"action_type": {"$in": list(AUDIT_STAGES)}},
+     {"_id": 0, "log_id": 1, "action_type": 1, "entity_id": 1, "client_id": 1, "timestamp": 1, "user_email": 1,
+      "user_role": 1}, _audit_events),
+]
+
+
+async def _write_events(db, events: List[dict]) -> int:
+    """Upsert events; returns how many were new or changed (re-read overlap counts as neither)"""
+    events = [e for e in events if e["at"] and e["client_id"] and e["candidate_id"]]
+    if not events:
+        return 0
+    result = await db.hiring_events.bulk_write(
+        [UpdateOne({"event_id": e["event_id"]}, {"$set": e}, upsert=True) for e in events], ordered=False
+    )
+    return result.upserted_count + result.modified_count
+
+
+async def _sync_source(db, collection: str, time_field: str, extra: dict, projection: dict, to_events,
+                       watermark: Optional[str], batch_size: int) -> Tuple[Optional[str], int]:
+    query = {**extra, time_field: {"$ne": None}}
+    if watermark:
+        query[time_field] = {"$gte": (parse_time(watermark) - LOOKBACK).isoformat()}
+    written = 0
+    batch = []
+    cursor = db[collection].find(query, projection).sort(time_field, 1).batch_size(batch_size)
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            written += await _write_events(db, await to_events(db, batch))
+            watermark = max(watermark or "", batch[-1][time_field])
+            batch = []
+    if batch:
+        written += await _write_events(db, await to_events(db, batch))
+        watermark = max(watermark or "", batch[-1][time_field])
+    return watermark, written
+
+
+async def sync_hiring_events(db, progress=None, batch_size: int = BATCH_SIZE) -> dict:
+    """Fold new stage transitions from every source into hiring_events (safe to re-run)"""
+    state = await db.hiring_analytics_state.find_one({"_id": STATE_ID}) or {}
+    watermarks = dict(state.get("watermarks") or {})
+    if progress:
+        await progress(0, len(SOURCES))
+
+    counts = {}
+    for done, (collection, time_field, extra, projection, to_events) in enumerate(SOURCES, start=1):
+        watermarks[collection], counts[collection] = await _sync_source(
+            db, collection, time_field, extra, projection, to_events, watermarks.get(collection), batch_size
+        )
+        if progress:
+            await progress(done, len(SOURCES))
+
+    update = {"$set": {"watermarks": watermarks, "synced_at": datetime.now(timezone.utc)}}
+    if any(counts.values()):
+        # Bumping the version invalidates cached metrics
+        update["$inc"] = {"version": 1}
+    await db.hiring_analytics_state.update_one({"_id": STATE_ID}, update, upsert=True)
+    return counts
+
+
+async def run_sync_loop(db):
+    """Background loop started with the app when periodic sync is enabled"""
+    while True:
+        try:
+            counts = await sync_hiring_events(db)
+            if any(counts.values()):
+                logger.info(f"Hiring events synced: {counts}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Hiring events sync failed: {str(e)}")
+        await asyncio.sleep(SYNC_MINUTES * 60)
+
+
+# ============ METRICS ============
+
+def parse_period(period: str) -> Tuple[datetime, datetime]:
+    """[start, end) of a `YYYY-MM`, `YYYY-Qn` or `YYYY` period in UTC; ValueError if malformed"""
+    period = period.strip().upper()
+    if len(period) == 4 and period.isdigit():
+        year = int(period)
+        return datetime(year, 1, 1, tzinfo=timezone.utc), datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    year_part, sep, rest = period.partition("-")
+    if not (sep and len(year_part) == 4 and year_part.isdigit()):
+        raise ValueError(f"Invalid period: {period}")
+    year = int(year_part)
+    if rest.startswith("Q") and rest[1:] in ("1", "2", "3", "4"):
+        first_month, months = (int(rest[1:]) - 1) * 3 + 1, 3
+    elif rest.isdigit() and 1 <= int(rest) <= 12:
+        first_month, months = int(rest), 1
+    else:
+        raise ValueError(f"Invalid period: {period}")
+    start = datetime(year, first_month, 1, tzinfo=timezone.utc)
+    end_month = first_month + months
+    end = datetime(year + (end_month - 1) // 12, (end_month - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def _duration_summary(days: pd.Series) -> Optional[dict]:
+    days = days.dropna()
+    days = days[days >= 0]
+    if days.empty:
+        return None
+    return {
+        "count": int(days.size),
+        "mean": round(float(days.mean()), 2),
+        "median": round(float(days.median()), 2),
+        "p90": round(float(days.quantile(0.9)), 2),
+    }
+
+
+def events_frame(events: List[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(events, columns=EVENT_COLUMNS)
+    df["at"] = pd.to_datetime(df["at"], utc=True)
+    return df
+
+
+def funnel_metrics(df: pd.DataFrame, start: datetime, end: datetime) -> dict:
+    """Cohort funnel, stage latencies and recruiter throughput from an event frame"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+    # First time each candidate reached each stage
+    first = df.groupby(["candidate_id", "stage"])["at"].min().unstack().reindex(columns=STAGES)
+    first = first.astype("datetime64[ns, UTC]")
+    cohort = first[(first["applied"] >= start) & (first["applied"] < end)]
+
+    # A candidate who reached a later stage passed every earlier one, even if it was never recorded
+    reached = cohort[FUNNEL].notna().astype(int).iloc[:, ::-1].cummax(axis=1).iloc[:, ::-1]
+    reached_counts = reached.sum()
+    funnel = []
+    for i, stage in enumerate(FUNNEL):
+        previous = int(reached_counts.iloc[i - 1]) if i else None
+        count = int(reached_counts[stage])
+        funnel.append({
+            "stage": stage,
+            "candidates": count,
+            "conversion": round(count / previous, 3) if previous else None,
+        })
+
+    stage_latency = {
+        f"{a}->{b}": _duration_summary((cohort[b] - cohort[a]).dt.total_seconds() / 86400)
+        for a, b in zip(FUNNEL, FUNNEL[1:])
+    }
+
+    jobs = df.groupby("candidate_id")["job_id"].first().reindex(cohort.index)
+    by_job = [
+        {"job_id": job_id, "funnel": {stage: int(n) for stage, n in counts.items()}}
+        for job_id, counts in reached.groupby(jobs).sum().iterrows()
+    ]
+
+    in_period = df[(df["at"] >= start) & (df["at"] < end) & df["actor"].notna() & (df["actor_role"] != "candidate")]
+    throughput = in_period.groupby(["actor", "stage"]).size().unstack(fill_value=0)
+    recruiters = [
+        {"actor": actor, "events": int(row.sum()), "stages": {stage: int(n) for stage, n in row.items() if n}}
+        for actor, row in throughput.iterrows()
+    ]
+    recruiters.sort(key=lambda r: -r["events"])
+
+    return {
+        "cohort_size": int(len(cohort)),
+        "funnel": funnel,
+        "exits": {stage: int(cohort[stage].notna().sum()) for stage in EXIT_STAGES},
+        "stage_latency_days": stage_latency,
+        "time_to_hire_days": _duration_summary((cohort["hired"] - cohort["applied"]).dt.total_seconds() / 86400),
+        "by_job": by_job,
+        "recruiters": recruiters,
+    }
+
+
+def cache_key(client_id: str, job_id: Optional[str], period: str) -> str:
+    return f"{client_id}:{job_id or '*'}:{period}"
+
+
+async def get_hiring_funnel(db, client_id: str, period: str, job_id: Optional[str] = None) -> dict:
+    """Funnel metrics of a client (or one of its jobs) for a period, cached until the next sync writes events"""
+    start, end = parse_period(period)
+    period = period.strip().upper()
+    key = cache_key(client_id, job_id, period)
+    state = await db.hiring_analytics_state.find_one({"_id": STATE_ID}, {"version": 1, "synced_at": 1}) or {}
+    version = state.get("version", 0)
+
+    cached = await db.hiring_analytics_cache.find_one({"key": key}, {"_id": 0})
+    if cached and cached["version"] == version:
+        return cached["result"]
+
+    query = {"client_id": client_id, "at": {"$gte": start, "$lt": end + timedelta(days=FOLLOW_UP_DAYS)}}
+    if job_id:
+        query["job_id"] = job_id
+    projection = {"_id": 0, **{column: 1 for column in EVENT_COLUMNS}}
+    events = await db.hiring_events.find(query, projection).to_list(None)
+
+    metrics = await asyncio.to_thread(funnel_metrics, events_frame(events), start, end)
+    result = {
+        "client_id": client_id,
+        "job_id": job_id,
+        "period": period,
+        "period_start": start.isoformat(),
+        "period_end": end.isoformat(),
+        "synced_at": state["synced_at"].isoformat() if state.get("synced_at") else None,
+        **metrics,
+    }
+    await db.hiring_analytics_cache.update_one(
+        {"key": key},
+        {"$set": {"key": key, "version": version, "result": result, "computed_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    return result
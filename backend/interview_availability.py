@@ -0,0 +1,226 @@
+"""
+Interview Availability - scheduling conflicts and free slots
+
+Booked interviews store their slot as BSON datetimes (`scheduled_start_at`,
+`scheduled_end_at`) next to the original ISO strings, indexed per client and
+per candidate by start time. Only slots up to MAX_INTERVAL long count, so
+everything overlapping [start, end) starts in
+(start - MAX_INTERVAL, end). Loading the busy intervals near a set of
+proposed slots is therefore one bounded index range scan.
+
+Loaded intervals go into an `IntervalIndex`: starts sorted once, overlap
+lookups by bisection with the same maximum-length bound. Checking a
+proposed slot costs O(log n + k) instead of a scan of every interview, and
+the same index backs the "suggest free slots" query for a client.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "interview_schedule_backfill"
+
+# Interviews in these states hold their scheduled slot
+BLOCKING_STATUSES = ["Awaiting Candidate Confirmation", "Confirmed", "Scheduled"]
+
+MAX_INTERVAL = timedelta(days=1)
+MAX_SUGGESTION_DAYS = 31
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def parse_time(value) -> Optional[datetime]:
+    """Aware UTC datetime from an ISO string or (possibly naive) datetime"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def schedule_fields(start_time, end_time) -> dict:
+    """Indexed datetime copies of a scheduled slot"""
+    return {"scheduled_start_at": parse_time(start_time), "scheduled_end_at": parse_time(end_time)}
+
+
+class IntervalIndex:
+    """Static index of [start, end) intervals for overlap queries"""
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, dict]]):
+        ordered = sorted((i for i in intervals if i[1] > i[0]), key=lambda i: i[0])
+        self._starts = [start for start, _, _ in ordered]
+        self._ends = [end for _, end, _ in ordered]
+        self._items = [item for _, _, item in ordered]
+        self._max_length = max((e - s for s, e in zip(self._starts, self._ends)), default=timedelta(0))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[dict]:
+        """Items whose interval overlaps [start, end)"""
+        # Only intervals starting in (start - max_length, end) can overlap
+        lo = bisect_right(self._starts, start - self._max_length)
+        hi = bisect_left(self._starts, end)
+        return [self._items[i] for i in range(lo, hi) if self._ends[i] > start]
+
+    def busy_periods(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Merged busy time within [start, end)"""
+        lo = bisect_right(self._starts, start - self._max_length)
+        hi = bisect_left(self._starts, end)
+        merged = []
+        for i in range(lo, hi):
+            s, e = max(self._starts[i], start), min(self._ends[i], end)
+            if e <= s:
+                continue
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        return merged
+
+    def free_slots(self, start: datetime, end: datetime, duration: timedelta, step: timedelta,
+                   limit: int) -> List[Tuple[datetime, datetime]]:
+        """Slots of `duration` on a `step` grid from `start` that avoid every interval"""
+        slots = []
+        cursor = start
+        for busy_start, busy_end in self.busy_periods(start, end) + [(end, end)]:
+            while cursor + duration <= busy_start and len(slots) < limit:
+                slots.append((cursor, cursor + duration))
+                cursor += step
+            if len(slots) >= limit:
+                break
+            if cursor < busy_end:
+                # Next grid point at or after the busy period
+                steps = -((start - busy_end) // step)
+                cursor = start + steps * step
+        return slots
+
+
+async def ensure_availability_indexes(db):
+    await db.interviews.create_index([("client_id", 1), ("scheduled_start_at", 1)])
+    await db.interviews.create_index([("candidate_id", 1), ("scheduled_start_at", 1)])
+
+
+async def load_interval_index(db, start: datetime, end: datetime, client_id: Optional[str] = None,
+                              candidate_id: Optional[str] = None) -> IntervalIndex:
+    """Busy intervals of a client and/or candidate that can overlap [start, end)"""
+    owners = []
+    if client_id:
+        owners.append({"client_id": client_id})
+    if candidate_id:
+        owners.append({"candidate_id": candidate_id})
+    if not owners:
+        return IntervalIndex([])
+    query = {
+        "$or": owners,
+        "interview_status": {"$in": BLOCKING_STATUSES},
+        "scheduled_start_at": {"$gt": start - MAX_INTERVAL, "$lt": end},
+    }
+    projection = {
+        "_id": 0, "interview_id": 1, "client_id": 1, "job_id": 1, "candidate_id": 1,
+        "scheduled_start_at": 1, "scheduled_end_at": 1,
+    }
+    intervals = []
+    async for interview in db.interviews.find(query, projection):
+        interval_start = parse_time(interview.get("scheduled_start_at"))
+        interval_end = parse_time(interview.get("scheduled_end_at"))
+        if interval_start and interval_end:
+            intervals.append((interval_start, interval_end, interview))
+    return IntervalIndex(intervals)
+
+
+def conflict_scope(interview: dict, job_id: str, candidate_id: str) -> str:
+    if interview.get("candidate_id") == candidate_id:
+        return "candidate"
+    if interview.get("job_id") == job_id:
+        return "job"
+    return "client"
+
+
+async def find_slot_conflicts(db, client_id: str, job_id: str, candidate_id: str, slots: List[dict]) -> List[dict]:
+    """Scheduled interviews that overlap any proposed {start_time, end_time} slot"""
+    parsed = [(i, parse_time(s.get("start_time")), parse_time(s.get("end_time"))) for i, s in enumerate(slots)]
+    parsed = [(i, s, e) for i, s, e in parsed if s and e and e > s]
+    if not parsed:
+        return []
+    index = await load_interval_index(
+        db, min(s for _, s, _ in parsed), max(e for _, _, e in parsed), client_id, candidate_id
+    )
+    conflicts = []
+    for slot_index, start, end in parsed:
+        for interview in index.overlapping(start, end):
+            conflicts.append({
+                "slot_index": slot_index,
+                "interview_id": interview["interview_id"],
+                "candidate_id": interview.get("candidate_id"),
+                "job_id": interview.get("job_id"),
+                "scope": conflict_scope(interview, job_id, candidate_id),
+                "scheduled_start_at": parse_time(interview["scheduled_start_at"]).isoformat(),
+                "scheduled_end_at": parse_time(interview["scheduled_end_at"]).isoformat(),
+            })
+    return conflicts
+
+
+async def suggest_free_slots(db, client_id: str, start_date: date, end_date: date, duration_minutes: int = 60,
+                             time_zone: str = "Asia/Kolkata", work_start_hour: int = 9, work_end_hour: int = 18,
+                             step_minutes: int = 30, limit: int = 20, include_weekends: bool = False) -> List[dict]:
+    """Free slots in a client's working hours between two dates (inclusive)"""
+    tz = ZoneInfo(time_zone)
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    range_start = datetime.combine(start_date, time(work_start_hour), tz).astimezone(timezone.utc)
+    range_end = datetime.combine(end_date, time(work_end_hour), tz).astimezone(timezone.utc)
+    index = await load_interval_index(db, range_start, range_end, client_id=client_id)
+
+    now = datetime.now(timezone.utc)
+    suggestions = []
+    day = start_date
+    while day <= end_date and len(suggestions) < limit:
+        if include_weekends or day.weekday() < 5:
+            window_start = datetime.combine(day, time(work_start_hour), tz).astimezone(timezone.utc)
+            window_end = datetime.combine(day, time(work_end_hour), tz).astimezone(timezone.utc)
+            for start, end in index.free_slots(window_start, window_end, duration, step, limit - len(suggestions)):
+                if start >= now:
+                    suggestions.append({"start_time": start.isoformat(), "end_time": end.isoformat()})
+        day += timedelta(days=1)
+    return suggestions[:limit]
+
+
+async def backfill_schedule_fields(db, progress=None, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """Datetime schedule fields for interviews booked before they existed (safe to re-run)"""
+    query = {"scheduled_start_time": {"$ne": None}, "scheduled_start_at": {"$exists": False}}
+    total = await db.interviews.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    processed = 0
+    operations = []
+    projection = {"_id": 0, "interview_id": 1, "scheduled_start_time": 1, "scheduled_end_time": 1}
+    async for interview in db.interviews.find(query, projection).batch_size(batch_size):
+        operations.append(UpdateOne(
+            {"interview_id": interview["interview_id"]},
+            {"$set": schedule_fields(interview.get("scheduled_start_time"), interview.get("scheduled_end_time"))}
+        ))
+        processed += 1
+        if len(operations) >= batch_size:
+            await db.interviews.bulk_write(operations, ordered=False)
+            operations = []
+            if progress:
+                await progress(processed, total)
+    if operations:
+        await db.interviews.bulk_write(operations, ordered=False)
+    if progress:
+        await progress(processed, total)
+    if processed:
+        logger.info(f"Backfilled schedule fields for {processed} interviews")
+    return {"interviews": processed}
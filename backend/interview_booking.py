@@ -0,0 +1,96 @@
+"""
+Interview Booking - race-free slot booking
+
+A booking is a single conditional `update_one`: it matches the interview only
+while it is still awaiting confirmation and the chosen slot is still
+available, and flips that slot's `is_available` through an array filter
+instead of rewriting the whole `proposed_slots` array. When several
+bookings race, MongoDB applies exactly one of them. The others match
+nothing and report why the slot could not be booked.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from interview_availability import schedule_fields
+
+BOOKABLE_STATUS = "Awaiting Candidate Confirmation"
+CONFIRMED_STATUS = "Confirmed"
+
+
+class BookingError(Exception):
+    """Why a slot cannot be booked, with the HTTP status to report"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def find_slot(interview: dict, slot_id: str) -> Optional[dict]:
+    for slot in interview.get("proposed_slots") or []:
+        if slot.get("slot_id") == slot_id:
+            return slot
+    return None
+
+
+def bookable_slot(interview: dict, slot_id: str) -> dict:
+    """The slot to book, or BookingError if this interview state does not allow it"""
+    if interview["interview_status"] != BOOKABLE_STATUS:
+        raise BookingError(
+            400, f"Interview is not awaiting confirmation (current status: {interview['interview_status']})"
+        )
+    slot = find_slot(interview, slot_id)
+    if not slot:
+        raise BookingError(404, "Slot not found")
+    if not slot.get("is_available", True):
+        raise BookingError(400, "Slot is no longer available")
+    return slot
+
+
+def booking_filter(interview_id: str, slot: dict) -> dict:
+    """Matches only while the interview is bookable and the slot is unchanged and free"""
+    return {
+        "interview_id": interview_id,
+        "interview_status": BOOKABLE_STATUS,
+        "proposed_slots": {"$elemMatch": {
+            "slot_id": slot["slot_id"],
+            "is_available": {"$ne": False},  # Slots without the flag count as available
+            "start_time": slot["start_time"],
+            "end_time": slot["end_time"],
+        }},
+    }
+
+
+def booking_update(slot: dict, confirmed: bool, now: str) -> dict:
+    return {"$set": {
+        "proposed_slots.$[slot].is_available": False,
+        "selected_slot_id": slot["slot_id"],
+        "scheduled_start_time": slot["start_time"],
+        "scheduled_end_time": slot["end_time"],
+        **schedule_fields(slot["start_time"], slot["end_time"]),
+        "interview_status": CONFIRMED_STATUS if confirmed else BOOKABLE_STATUS,
+        "candidate_confirmation_timestamp": now if confirmed else None,
+        "updated_at": now,
+    }}
+
+
+async def book_slot(db, interview: dict, slot_id: str, confirmed: bool = True, now: Optional[str] = None) -> dict:
+    """Atomically book a slot of `interview` (as read by the caller); returns the booked slot"""
+    slot = bookable_slot(interview, slot_id)
+    now = now or datetime.now(timezone.utc).isoformat()
+    result = await db.interviews.update_one(
+        booking_filter(interview["interview_id"], slot),
+        booking_update(slot, confirmed, now),
+        array_filters=[{"slot.slot_id": slot_id}]
+    )
+    if result.modified_count == 1:
+        return slot
+
+    # Lost a race: report the state that made the conditional update miss
+    current = await db.interviews.find_one(
+        {"interview_id": interview["interview_id"]}, {"_id": 0, "interview_status": 1, "proposed_slots": 1}
+    )
+    if not current:
+        raise BookingError(404, "Interview not found")
+    bookable_slot(current, slot_id)
+    raise BookingError(409, "Slot changed while booking, please try again")
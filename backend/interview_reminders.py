@@ -0,0 +1,304 @@
+"""
+Interview Reminders - email and SMS reminders before scheduled interviews
+
+Confirming a booking writes one `interview_reminders` document per channel
+and offset (INTERVIEW_REMINDER_OFFSETS_MINUTES before the start, 24h and 1h
+by default). Each document has the `ReminderSchedule` fields, with the due
+time in `scheduled_time`. A background loop claims due reminders in batches
+with one range query on the (status, scheduled_time) index, the same claim
+pattern as the notification digest queue. It loads the interviews,
+candidates, jobs and clients of a batch with one `$in` query each, sends
+through `send_email`/`send_sms_twilio` concurrently, and bulk-writes the
+delivery status back. Only due reminders are ever read, however many
+interviews are upcoming.
+
+Reminders are not tracked through every later status change. A reminder
+whose interview has been cancelled or rescheduled since it was written is
+dropped when it comes due.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pymongo import UpdateOne
+
+from interview_availability import parse_time
+from interview_models import ReminderSchedule
+from notification_service import (
+    get_interview_reminder_email_template, get_interview_reminder_sms, send_email, send_sms_twilio
+)
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "interview_reminders_schedule"
+
+REMINDER_OFFSETS_MINUTES = [
+    int(m) for m in os.environ.get("INTERVIEW_REMINDER_OFFSETS_MINUTES", "1440,60").split(",") if m.strip()
+]
+REMINDER_CHANNELS = [
+    c.strip() for c in os.environ.get("INTERVIEW_REMINDER_CHANNELS", "email,sms").split(",") if c.strip()
+]
+REMINDER_TICK_SECONDS = int(os.environ.get("INTERVIEW_REMINDER_TICK_SECONDS", "60"))
+
+BATCH_SIZE = 200
+SEND_CONCURRENCY = 10
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(minutes=5)
+
+# Claims older than this are assumed to belong to a crashed worker
+STALE_CLAIM_MINUTES = 10
+
+# Interview states that still get reminders
+REMIND_STATUSES = ["Confirmed", "Scheduled"]
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_SKIPPED = "skipped"
+
+INTERVIEW_FIELDS = {
+    "_id": 0, "interview_id": 1, "job_id": 1, "client_id": 1, "interview_status": 1, "interview_mode": 1,
+    "interview_duration": 1, "meeting_link": 1, "time_zone": 1, "scheduled_start_time": 1, "scheduled_start_at": 1,
+}
+
+
+def is_reminders_enabled() -> bool:
+    return bool(REMINDER_OFFSETS_MINUTES and REMINDER_CHANNELS)
+
+
+async def ensure_reminder_indexes(db):
+    await db.interview_reminders.create_index(
+        [("interview_id", 1), ("reminder_type", 1), ("offset_minutes", 1)], unique=True
+    )
+    await db.interview_reminders.create_index([("status", 1), ("scheduled_time", 1)])
+    await db.interview_reminders.create_index("claim_id", sparse=True)
+
+
+def reminder_documents(interview_id: str, candidate_id: str, start: datetime, now: datetime,
+                       offsets: Optional[List[int]] = None, channels: Optional[List[str]] = None) -> List[dict]:
+    """Reminder documents for an interview starting at `start` (only those still in the future)"""
+    documents = []
+    for offset in offsets or REMINDER_OFFSETS_MINUTES:
+        due = start - timedelta(minutes=offset)
+        if due <= now:
+            continue
+        for channel in channels or REMINDER_CHANNELS:
+            schedule = ReminderSchedule(interview_id=interview_id, reminder_type=channel, scheduled_time=due)
+            documents.append({
+                "reminder_id": f"rem_{uuid.uuid4().hex[:12]}",
+                **schedule.model_dump(),
+                "candidate_id": candidate_id,
+                "offset_minutes": offset,
+                "interview_start": start,
+                "status": STATUS_PENDING,
+                "attempts": 0,
+                "created_at": now,
+            })
+    return documents
+
+
+async def schedule_reminders(db, interview_id: str, candidate_id: str, start_time, now: Optional[datetime] = None,
+                             offsets: Optional[List[int]] = None, channels: Optional[List[str]] = None) -> int:
+    """(Re)schedule an interview's reminders for its start time; returns reminders written"""
+    start = parse_time(start_time)
+    now = now or datetime.now(timezone.utc)
+    if not start or start <= now:
+        return 0
+    existing = await db.interview_reminders.find(
+        {"interview_id": interview_id}, {"_id": 0, "reminder_type": 1, "offset_minutes": 1, "interview_start": 1}
+    ).to_list(None)
+    current = {
+        (r["reminder_type"], r["offset_minutes"]) for r in existing if parse_time(r.get("interview_start")) == start
+    }
+    operations = [
+        UpdateOne(
+            {"interview_id": interview_id, "reminder_type": doc["reminder_type"], "offset_minutes": doc["offset_minutes"]},
+            {"$set": doc, "$unset": {"claim_id": "", "claimed_at": ""}},
+            upsert=True
+        )
+        for doc in reminder_documents(interview_id, candidate_id, start, now, offsets, channels)
+        if (doc["reminder_type"], doc["offset_minutes"]) not in current
+    ]
+    if operations:
+        await db.interview_reminders.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def describe_lead_time(delta: timedelta) -> str:
+    minutes = max(1, round(delta.total_seconds() / 60))
+    if minutes >= 1440 and minutes % 1440 < 60:
+        days = minutes // 1440
+        return "tomorrow" if days == 1 else f"in {days} days"
+    if minutes >= 60:
+        hours = round(minutes / 60)
+        return f"in {hours} hour{'s' if hours != 1 else ''}"
+    return f"in {minutes} minute{'s' if minutes != 1 else ''}"
+
+
+def format_start(start: datetime, time_zone: Optional[str]) -> tuple:
+    """Start time text in the interview's time zone, and the zone name shown"""
+    try:
+        tz = ZoneInfo(time_zone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        tz, time_zone = timezone.utc, "UTC"
+    return start.astimezone(tz).strftime('%A, %B %d, %Y at %I:%M %p'), time_zone or "UTC"
+
+
+async def _load_by_id(db, collection: str, id_field: str, ids, projection: dict) -> Dict[str, dict]:
+    ids = list({i for i in ids if i})
+    if not ids:
+        return {}
+    docs = await db[collection].find({id_field: {"$in": ids}}, projection).to_list(None)
+    return {doc[id_field]: doc for doc in docs}
+
+
+def _outcome(status: str, detail: str, now: datetime, **extra) -> dict:
+    outcome = {"status": status, "delivery_status": detail[:500], **extra}
+    if status == STATUS_SENT:
+        outcome.update(sent=True, sent_at=now)
+    return outcome
+
+
+async def _deliver_batch(db, reminders: List[dict], now: datetime, senders: dict) -> Dict[str, dict]:
+    """Send a claimed batch; returns the outcome per reminder_id"""
+    interviews = await _load_by_id(db, "interviews", "interview_id", (r["interview_id"] for r in reminders),
+                                   INTERVIEW_FIELDS)
+    candidates = await _load_by_id(db, "candidates", "candidate_id", (r.get("candidate_id") for r in reminders),
+                                   {"_id": 0, "candidate_id": 1, "name": 1, "email": 1, "phone": 1})
+    jobs = await _load_by_id(db, "jobs", "job_id", (i.get("job_id") for i in interviews.values()),
+                             {"_id": 0, "job_id": 1, "title": 1})
+    clients = await _load_by_id(db, "clients", "client_id", (i.get("client_id") for i in interviews.values()),
+                                {"_id": 0, "client_id": 1, "company_name": 1})
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def deliver(reminder: dict) -> dict:
+        interview = interviews.get(reminder["interview_id"])
+        start = parse_time(reminder.get("interview_start"))
+        if (not interview or interview.get("interview_status") not in REMIND_STATUSES
+                or parse_time(interview.get("scheduled_start_at") or interview.get("scheduled_start_time")) != start):
+            return _outcome(STATUS_CANCELLED, "Interview no longer scheduled at this time", now)
+        if start <= now:
+            return _outcome(STATUS_SKIPPED, "Interview already started", now)
+
+        candidate = candidates.get(reminder.get("candidate_id")) or {}
+        job = jobs.get(interview.get("job_id")) or {}
+        client = clients.get(interview.get("client_id")) or {}
+        start_text, time_zone = format_start(start, interview.get("time_zone"))
+        starts_in = describe_lead_time(start - now)
+
+        channel = reminder["reminder_type"]
+        if channel == "email":
+            if not candidate.get("email"):
+                return _outcome(STATUS_FAILED, "Candidate has no email address", now)
+            subject, body = get_interview_reminder_email_template(
+                interview, candidate, job, client, start_text, time_zone, starts_in
+            )
+            send = senders["email"](candidate["email"], subject, body)
+        elif channel == "sms":
+            if not candidate.get("phone"):
+                return _outcome(STATUS_FAILED, "Candidate has no phone number", now)
+            send = senders["sms"](candidate["phone"], get_interview_reminder_sms(job, client, start_text, starts_in))
+        else:
+            return _outcome(STATUS_FAILED, f"Unsupported reminder channel: {channel}", now)
+
+        try:
+            async with semaphore:
+                result = await send
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        if result.get("success"):
+            return _outcome(STATUS_SENT, "delivered", now)
+
+        attempts = reminder.get("attempts", 0) + 1
+        retry_at = now + RETRY_DELAY
+        if attempts < MAX_ATTEMPTS and retry_at < start:
+            return _outcome(STATUS_PENDING, str(result.get("error")), now, attempts=attempts, scheduled_time=retry_at)
+        return _outcome(STATUS_FAILED, str(result.get("error")), now, attempts=attempts)
+
+    outcomes = await asyncio.gather(*(deliver(r) for r in reminders))
+    return {r["reminder_id"]: outcome for r, outcome in zip(reminders, outcomes)}
+
+
+async def dispatch_due_reminders(db, now: Optional[datetime] = None, batch_size: int = BATCH_SIZE,
+                                 senders: Optional[dict] = None) -> Dict[str, int]:
+    """Send every reminder that is due; returns counts per resulting status"""
+    now = now or datetime.now(timezone.utc)
+    senders = senders or {"email": send_email, "sms": send_sms_twilio}
+
+    # Release claims left behind by a worker that died mid-send
+    await db.interview_reminders.update_many(
+        {"status": STATUS_SENDING, "claimed_at": {"$lt": now - timedelta(minutes=STALE_CLAIM_MINUTES)}},
+        {"$set": {"status": STATUS_PENDING}, "$unset": {"claim_id": "", "claimed_at": ""}}
+    )
+
+    counts = {}
+    while True:
+        due = await db.interview_reminders.find(
+            {"status": STATUS_PENDING, "scheduled_time": {"$lte": now}}, {"_id": 0, "reminder_id": 1}
+        ).sort("scheduled_time", 1).limit(batch_size).to_list(batch_size)
+        if not due:
+            break
+
+        claim_id = uuid.uuid4().hex
+        await db.interview_reminders.update_many(
+            {"reminder_id": {"$in": [r["reminder_id"] for r in due]}, "status": STATUS_PENDING},
+            {"$set": {"status": STATUS_SENDING, "claim_id": claim_id, "claimed_at": now}}
+        )
+        claimed = await db.interview_reminders.find({"claim_id": claim_id}, {"_id": 0}).to_list(None)
+        if claimed:
+            outcomes = await _deliver_batch(db, claimed, now, senders)
+            await db.interview_reminders.bulk_write([
+                UpdateOne(
+                    {"reminder_id": reminder_id, "claim_id": claim_id},
+                    {"$set": {**outcome, "updated_at": now}, "$unset": {"claim_id": "", "claimed_at": ""}}
+                )
+                for reminder_id, outcome in outcomes.items()
+            ], ordered=False)
+            for outcome in outcomes.values():
+                counts[outcome["status"]] = counts.get(outcome["status"], 0) + 1
+        if len(due) < batch_size:
+            break
+    return counts
+
+
+async def run_reminder_loop(db):
+    """Background loop started with the app when reminders are enabled"""
+    while True:
+        try:
+            counts = await dispatch_due_reminders(db)
+            if counts:
+                logger.info(f"Interview reminders dispatched: {counts}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Interview reminder dispatch failed: {str(e)}")
+        await asyncio.sleep(REMINDER_TICK_SECONDS)
+
+
+async def schedule_upcoming_reminders(db, progress=None) -> dict:
+    """Schedule reminders for confirmed upcoming interviews booked before reminders existed"""
+    now = datetime.now(timezone.utc)
+    query = {"interview_status": {"$in": REMIND_STATUSES}, "scheduled_start_at": {"$gt": now}}
+    total = await db.interviews.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    processed = 0
+    written = 0
+    projection = {"_id": 0, "interview_id": 1, "candidate_id": 1, "scheduled_start_at": 1}
+    async for interview in db.interviews.find(query, projection).batch_size(BATCH_SIZE):
+        written += await schedule_reminders(
+            db, interview["interview_id"], interview["candidate_id"], interview["scheduled_start_at"], now
+        )
+        processed += 1
+        if progress and processed % BATCH_SIZE == 0:
+            await progress(processed, total)
+    if progress:
+        await progress(processed, total)
+    return {"interviews": processed, "reminders": written}
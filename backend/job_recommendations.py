@@ -0,0 +1,157 @@
+"""
+Job Recommendations - suggest open jobs for a candidate
+
+`job_skill_index` is an inverted index from canonical skill ID to the open
+(Active) jobs requiring it: one posting per (skill_id, job_id). It is kept
+in sync when jobs are created, updated, closed or deleted. Recommending
+jobs for a candidate looks up the postings of the candidate's skill IDs,
+counts shared skills per job in the database, and only the best-overlapping
+jobs are loaded and fit-scored - the cost depends on the candidate's skills,
+not on how many jobs are open.
+"""
+import logging
+from typing import List, Optional
+
+from pymongo import InsertOne, UpdateOne
+
+from fit_scoring import calculate_fit_score
+from skill_taxonomy import skill_ids
+
+logger = logging.getLogger(__name__)
+
+OPEN_JOB_STATUS = "Active"
+
+# Jobs with the most shared skills that get loaded and fit-scored
+CANDIDATE_JOB_POOL = 200
+
+REBUILD_BATCH_SIZE = 500
+
+# Job fields that decide a job's postings
+JOB_INDEX_FIELDS = ("status", "required_skills")
+
+
+async def ensure_job_skill_indexes(db):
+    await db.job_skill_index.create_index([("skill_id", 1), ("job_id", 1)], unique=True)
+    await db.job_skill_index.create_index("job_id")
+
+
+def job_postings(job: dict) -> List[dict]:
+    """Postings for a job; closed and draft jobs have none"""
+    if job.get("status") != OPEN_JOB_STATUS:
+        return []
+    ids = job.get("required_skill_ids")
+    if ids is None:
+        ids = skill_ids(job.get("required_skills"))
+    return [
+        {"skill_id": sid, "job_id": job["job_id"], "client_id": job.get("client_id")}
+        for sid in ids
+    ]
+
+
+def index_fields_changed(job: dict, update_data: dict) -> bool:
+    """Whether a job update can change the job's postings"""
+    return any(
+        field in update_data and update_data[field] != job.get(field)
+        for field in JOB_INDEX_FIELDS
+    )
+
+
+async def remove_job(db, job_id: str):
+    await db.job_skill_index.delete_many({"job_id": job_id})
+
+
+async def index_job(db, job: dict):
+    """Replace a job's postings with ones matching its current status and skills"""
+    postings = job_postings(job)
+    await db.job_skill_index.delete_many(
+        {"job_id": job["job_id"], "skill_id": {"$nin": [p["skill_id"] for p in postings]}}
+    )
+    if postings:
+        await db.job_skill_index.bulk_write([
+            UpdateOne({"skill_id": p["skill_id"], "job_id": p["job_id"]}, {"$set": p}, upsert=True)
+            for p in postings
+        ], ordered=False)
+
+
+async def rebuild_job_skill_index(db, progress=None, batch_size: int = REBUILD_BATCH_SIZE) -> dict:
+    """Rebuild the whole index from the jobs collection (safe to re-run)"""
+    query = {"status": OPEN_JOB_STATUS}
+    total = await db.jobs.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    await db.job_skill_index.delete_many({})
+
+    processed = 0
+    postings = 0
+    operations = []
+    cursor = db.jobs.find(
+        query, {"_id": 0, "job_id": 1, "client_id": 1, "status": 1, "required_skills": 1, "required_skill_ids": 1}
+    )
+    async for job in cursor.batch_size(batch_size):
+        operations.extend(InsertOne(posting) for posting in job_postings(job))
+        processed += 1
+        if len(operations) >= batch_size:
+            await db.job_skill_index.bulk_write(operations, ordered=False)
+            postings += len(operations)
+            operations = []
+        if progress and processed % batch_size == 0:
+            await progress(processed, total)
+
+    if operations:
+        await db.job_skill_index.bulk_write(operations, ordered=False)
+        postings += len(operations)
+    if progress:
+        await progress(processed, total)
+
+    logger.info(f"Rebuilt job skill index: {postings} postings for {processed} open jobs")
+    return {"jobs": processed, "postings": postings}
+
+
+async def shared_skill_counts(db, candidate_skill_ids: List[int], exclude_job_id: Optional[str] = None,
+                              pool: int = CANDIDATE_JOB_POOL) -> List[dict]:
+    """Open jobs sharing skills with a candidate, most shared skills first"""
+    if not candidate_skill_ids:
+        return []
+    match = {"skill_id": {"$in": candidate_skill_ids}}
+    if exclude_job_id:
+        match["job_id"] = {"$ne": exclude_job_id}
+    return await db.job_skill_index.aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$job_id", "shared_skills": {"$sum": 1}}},
+        {"$sort": {"shared_skills": -1, "_id": 1}},
+        {"$limit": pool}
+    ]).to_list(None)
+
+
+def rank_jobs(candidate: dict, jobs: List[dict], shared: dict, limit: int) -> List[dict]:
+    """Score jobs for a candidate and return the top `limit`, best first"""
+    scored = [
+        {"job": job, "fit_score": calculate_fit_score(candidate, job), "shared_skills": shared.get(job["job_id"], 0)}
+        for job in jobs
+    ]
+    scored.sort(key=lambda r: (-r["fit_score"], -r["shared_skills"], r["job"]["job_id"]))
+    return scored[:limit]
+
+
+async def recommend_jobs(db, candidate: dict, limit: int = 10, pool: int = CANDIDATE_JOB_POOL) -> List[dict]:
+    """
+    Top open jobs for a candidate, excluding the job they applied to.
+
+    Only jobs in the inverted index that share at least one skill are
+    considered; the `pool` with the most shared skills are fit-scored.
+    """
+    candidate_skill_ids = candidate.get("skill_ids")
+    if candidate_skill_ids is None:
+        candidate_skill_ids = skill_ids(candidate.get("skills"))
+
+    counts = await shared_skill_counts(db, candidate_skill_ids, candidate.get("job_id"), pool)
+    if not counts:
+        return []
+    shared = {c["_id"]: c["shared_skills"] for c in counts}
+
+    # The index can briefly lag a job update; re-check status on the job itself
+    jobs = await db.jobs.find(
+        {"job_id": {"$in": list(shared)}, "status": OPEN_JOB_STATUS}, {"_id": 0}
+    ).to_list(None)
+    return rank_jobs(candidate, jobs, shared, limit)
@@ -0,0 +1,308 @@
+"""
+No-Show Risk - materialized no-show history and risk scores
+
+A batch job makes one projected pass over `interviews`. It folds each
+candidate's history into a `CandidateNoShowSummary` (no-shows, completed
+interviews, mean confirmation latency) and collects the upcoming booked
+interviews within RISK_HORIZON_DAYS. For those interviews it loads the sent
+reminders, the candidate responses (`reminder_responses`), the candidates
+and the jobs with one `$in` query each per batch. Each interview then gets
+a 1-10 risk score from past no-shows, how long the candidate took to
+confirm and how they answered a reminder. Not answering is not held
+against a candidate: reminders do not carry a reply link yet, so replies
+only come through the public reminder-response endpoint.
+
+Summaries go to `candidate_no_show_summaries` and scores to
+`interview_risk`, both upserted in bulk. Documents the run did not touch
+are deleted afterwards. The at-risk dashboard and the `at_risk` pipeline
+count read only the materialized scores, so a request never scans the
+interviews. Scores are as fresh as the last run
+(NO_SHOW_RISK_REFRESH_MINUTES). Interviews that are completed, cancelled
+or marked as a no-show are removed from `interview_risk` straight away.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from interview_availability import BLOCKING_STATUSES, parse_time
+from interview_models import CandidateNoShowSummary
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "no_show_risk_refresh"
+
+REFRESH_MINUTES = int(os.environ.get("NO_SHOW_RISK_REFRESH_MINUTES", "60"))
+
+RISK_HORIZON_DAYS = 14
+AT_RISK_SCORE = 6  # Interviews scoring at least this are listed as at risk
+
+# A candidate with this many no-shows is flagged
+FLAG_NO_SHOWS = 2
+
+NO_SHOW_STATUS = "No Show"
+COMPLETED_STATUSES = ["Completed", "Passed", "Failed"]
+
+BATCH_SIZE = 500
+
+INTERVIEW_FIELDS = {
+    "_id": 0, "interview_id": 1, "candidate_id": 1, "job_id": 1, "client_id": 1, "interview_status": 1,
+    "no_show_flag": 1, "created_at": 1, "updated_at": 1, "candidate_confirmation_timestamp": 1,
+    "scheduled_start_at": 1,
+}
+
+
+def is_refresh_enabled() -> bool:
+    return REFRESH_MINUTES > 0
+
+
+async def ensure_risk_indexes(db):
+    await db.candidate_no_show_summaries.create_index("candidate_id", unique=True)
+    await db.interview_risk.create_index("interview_id", unique=True)
+    await db.interview_risk.create_index([("client_id", 1), ("at_risk", 1), ("scheduled_time", 1)])
+    await db.interview_risk.create_index([("at_risk", 1), ("scheduled_time", 1)])
+    await db.interview_risk.create_index("refreshed_at")
+    await db.reminder_responses.create_index([("interview_id", 1), ("response_timestamp", -1)])
+
+
+def _hours_between(start, end) -> Optional[float]:
+    start, end = parse_time(start), parse_time(end)
+    if not start or not end or end < start:
+        return None
+    return (end - start).total_seconds() / 3600
+
+
+class HistoryFold:
+    """Per-candidate no-show history accumulated over one pass of interviews"""
+
+    def __init__(self):
+        self.no_shows = 0
+        self.completed = 0
+        self.last_no_show = None
+        self.latency_total = 0.0
+        self.latency_count = 0
+
+    def add(self, interview: dict):
+        status = interview.get("interview_status")
+        if status == NO_SHOW_STATUS or interview.get("no_show_flag"):
+            self.no_shows += 1
+            # mark-no-show stamps updated_at; later edits only move it forward
+            marked = parse_time(interview.get("updated_at"))
+            if marked and (self.last_no_show is None or marked > self.last_no_show):
+                self.last_no_show = marked
+        elif status in COMPLETED_STATUSES:
+            self.completed += 1
+        latency = _hours_between(interview.get("created_at"), interview.get("candidate_confirmation_timestamp"))
+        if latency is not None:
+            self.latency_total += latency
+            self.latency_count += 1
+
+    @property
+    def mean_confirmation_hours(self) -> Optional[float]:
+        if not self.latency_count:
+            return None
+        return round(self.latency_total / self.latency_count, 1)
+
+    def summary(self, candidate_id: str) -> dict:
+        attended = self.no_shows + self.completed
+        return {
+            **CandidateNoShowSummary(
+                candidate_id=candidate_id,
+                total_no_shows=self.no_shows,
+                flagged=self.no_shows >= FLAG_NO_SHOWS,
+                last_no_show_date=self.last_no_show,
+                interviews_completed=self.completed,
+                completion_rate=round(self.completed / attended, 3) if attended else 1.0,
+            ).model_dump(),
+            "mean_confirmation_hours": self.mean_confirmation_hours,
+        }
+
+
+def risk_score(summary: dict, interview: dict, response: Optional[str]) -> tuple:
+    """(score 1-10, factors) for an upcoming interview"""
+    score = 1
+    factors = []
+
+    no_shows = summary["total_no_shows"]
+    if no_shows:
+        score += min(no_shows * 2, 4)
+        factors.append(f"{no_shows} past no-show{'s' if no_shows != 1 else ''}")
+    if no_shows and summary["completion_rate"] < 0.5:
+        score += 1
+        factors.append("misses most interviews")
+
+    latency = _hours_between(interview.get("created_at"), interview.get("candidate_confirmation_timestamp"))
+    if interview.get("interview_status") not in ("Confirmed", "Scheduled"):
+        score += 2
+        factors.append("not confirmed by candidate")
+    elif latency is not None and latency > 48:
+        score += 2
+        factors.append("slow to confirm")
+    elif latency is not None and latency > 24:
+        score += 1
+        factors.append("slow to confirm")
+
+    if response == "cannot_attend":
+        score += 5
+        factors.append("replied cannot attend")
+    elif response == "reschedule_request":
+        score += 3
+        factors.append("asked to reschedule")
+    elif response == "confirmed":
+        score -= 2
+
+    return max(1, min(score, 10)), factors
+
+
+async def _load_by_id(db, collection: str, id_field: str, ids, projection: dict) -> Dict[str, dict]:
+    if not ids:
+        return {}
+    docs = await db[collection].find({id_field: {"$in": list(ids)}}, projection).to_list(len(ids))
+    return {doc[id_field]: doc for doc in docs}
+
+
+async def _score_batch(db, interviews: List[dict], histories: Dict[str, HistoryFold],
+                       refreshed_at: datetime) -> Tuple[List[UpdateOne], int]:
+    """Upserts of the batch's risk documents, and how many of them are at risk"""
+    interview_ids = [i["interview_id"] for i in interviews]
+
+    last_sent: Dict[str, datetime] = {}
+    reminders = await db.interview_reminders.find(
+        {"interview_id": {"$in": interview_ids}, "status": "sent"},
+        {"_id": 0, "interview_id": 1, "sent_at": 1}
+    ).to_list(None)
+    for reminder in reminders:
+        key = reminder["interview_id"]
+        sent_at = parse_time(reminder.get("sent_at"))
+        if sent_at and (key not in last_sent or sent_at > last_sent[key]):
+            last_sent[key] = sent_at
+
+    latest_response: Dict[str, dict] = {}
+    responses = await db.reminder_responses.find(
+        {"interview_id": {"$in": interview_ids}},
+        {"_id": 0, "interview_id": 1, "response_type": 1, "response_timestamp": 1}
+    ).to_list(None)
+    for response in responses:
+        current = latest_response.get(response["interview_id"])
+        if current is None or parse_time(response["response_timestamp"]) > parse_time(current["response_timestamp"]):
+            latest_response[response["interview_id"]] = response
+
+    candidates = await _load_by_id(
+        db, "candidates", "candidate_id", {i["candidate_id"] for i in interviews},
+        {"_id": 0, "candidate_id": 1, "name": 1}
+    )
+    jobs = await _load_by_id(db, "jobs", "job_id", {i["job_id"] for i in interviews}, {"_id": 0, "job_id": 1, "title": 1})
+
+    operations = []
+    at_risk = 0
+    for interview in interviews:
+        interview_id = interview["interview_id"]
+        summary = histories[interview["candidate_id"]].summary(interview["candidate_id"])
+        response = latest_response.get(interview_id, {}).get("response_type")
+        score, factors = risk_score(summary, interview, response)
+        at_risk += score >= AT_RISK_SCORE
+        operations.append(UpdateOne({"interview_id": interview_id}, {"$set": {
+            "interview_id": interview_id,
+            "candidate_id": interview["candidate_id"],
+            "job_id": interview["job_id"],
+            "client_id": interview["client_id"],
+            "interview_status": interview["interview_status"],
+            "candidate_name": candidates.get(interview["candidate_id"], {}).get("name") or "",
+            "job_title": jobs.get(interview["job_id"], {}).get("title") or "",
+            "scheduled_time": parse_time(interview["scheduled_start_at"]),
+            "last_reminder_sent": last_sent.get(interview_id),
+            "reminder_response": response is not None,
+            "risk_score": score,
+            "risk_factors": factors,
+            "past_no_shows": summary["total_no_shows"],
+            "at_risk": score >= AT_RISK_SCORE,
+            "refreshed_at": refreshed_at,
+        }}, upsert=True))
+    return operations, at_risk
+
+
+async def refresh_no_show_risk(db, progress=None, now: Optional[datetime] = None,
+                               batch_size: int = BATCH_SIZE) -> dict:
+    """Recompute candidate no-show summaries and risk scores of upcoming interviews"""
+    now = now or datetime.now(timezone.utc)
+    horizon = now + timedelta(days=RISK_HORIZON_DAYS)
+    total = await db.interviews.count_documents({})
+    if progress:
+        await progress(0, total)
+
+    histories: Dict[str, HistoryFold] = {}
+    upcoming = []
+    processed = 0
+    async for interview in db.interviews.find({}, INTERVIEW_FIELDS).batch_size(batch_size):
+        candidate_id = interview.get("candidate_id")
+        if not candidate_id:
+            continue
+        histories.setdefault(candidate_id, HistoryFold()).add(interview)
+        start = parse_time(interview.get("scheduled_start_at"))
+        if interview.get("interview_status") in BLOCKING_STATUSES and start and now <= start < horizon:
+            upcoming.append(interview)
+        processed += 1
+        if progress and processed % batch_size == 0:
+            await progress(processed, total)
+
+    summaries = [
+        UpdateOne({"candidate_id": candidate_id}, {"$set": {**history.summary(candidate_id), "refreshed_at": now}},
+                  upsert=True)
+        for candidate_id, history in histories.items()
+    ]
+    for i in range(0, len(summaries), batch_size):
+        await db.candidate_no_show_summaries.bulk_write(summaries[i:i + batch_size], ordered=False)
+
+    at_risk = 0
+    for i in range(0, len(upcoming), batch_size):
+        operations, batch_at_risk = await _score_batch(db, upcoming[i:i + batch_size], histories, now)
+        at_risk += batch_at_risk
+        await db.interview_risk.bulk_write(operations, ordered=False)
+
+    # Whatever this run did not rewrite is no longer upcoming or no longer exists
+    await db.interview_risk.delete_many({"refreshed_at": {"$lt": now}})
+    await db.candidate_no_show_summaries.delete_many({"refreshed_at": {"$lt": now}})
+
+    if progress:
+        await progress(processed, total)
+    return {"candidates": len(histories), "upcoming_interviews": len(upcoming), "at_risk": at_risk}
+
+
+async def discard_interview_risk(db, interview_id: str):
+    """Drop the score of an interview that has been completed, cancelled or missed"""
+    await db.interview_risk.delete_one({"interview_id": interview_id})
+
+
+def at_risk_query(now: datetime, client_id: Optional[str] = None) -> dict:
+    query = {"at_risk": True, "scheduled_time": {"$gte": now}}
+    if client_id:
+        query["client_id"] = client_id
+    return query
+
+
+async def list_at_risk(db, now: Optional[datetime] = None, client_id: Optional[str] = None,
+                       limit: int = 50) -> List[dict]:
+    """Materialized at-risk interviews, highest risk first"""
+    now = now or datetime.now(timezone.utc)
+    cursor = db.interview_risk.find(at_risk_query(now, client_id), {"_id": 0, "refreshed_at": 0})
+    return await cursor.sort([("risk_score", -1), ("scheduled_time", 1)]).limit(limit).to_list(limit)
+
+
+async def count_at_risk(db, now: Optional[datetime] = None, client_id: Optional[str] = None) -> int:
+    return await db.interview_risk.count_documents(at_risk_query(now or datetime.now(timezone.utc), client_id))
+
+
+async def run_refresh_loop(db):
+    """Background loop started with the app when periodic refresh is enabled"""
+    while True:
+        try:
+            counts = await refresh_no_show_risk(db)
+            logger.info(f"No-show risk refreshed: {counts}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"No-show risk refresh failed: {str(e)}")
+        await asyncio.sleep(REFRESH_MINUTES * 60)
@@ -0,0 +1,177 @@
+"""
+Notification Digest - coalesce notification emails per recipient
+
+With NOTIFICATION_DIGEST_WINDOW_MINUTES > 0, non-urgent notification emails
+are queued in `notification_email_queue` instead of being sent one by one.
+A background loop sends each recipient a single digest once their oldest
+queued email has waited for the window. Urgent categories (interview
+bookings) and a window of 0 keep the old send-immediately behaviour.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from email_renderer import render_template
+from notification_service import send_email
+
+logger = logging.getLogger(__name__)
+
+DIGEST_WINDOW_MINUTES = int(os.environ.get("NOTIFICATION_DIGEST_WINDOW_MINUTES", "0"))
+DIGEST_FLUSH_INTERVAL_SECONDS = int(os.environ.get("NOTIFICATION_DIGEST_FLUSH_INTERVAL_SECONDS", "60"))
+# Sent queue entries are kept this long for troubleshooting, then removed by a TTL index
+SENT_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_EMAIL_QUEUE_RETENTION_DAYS", "7"))
+
+# Categories that always go out immediately
+URGENT_CATEGORIES = {
+    "interview_booked",
+}
+
+CATEGORY_LABELS = {
+    "new_job": "New Jobs",
+    "candidate_status_change": "Candidate Status Changes",
+    "interview_booked": "Interview Bookings",
+}
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+
+# Claims older than this are assumed to belong to a crashed worker
+STALE_CLAIM_MINUTES = 10
+
+
+async def ensure_digest_indexes(db):
+    await db.notification_email_queue.create_index([("status", 1), ("recipient", 1), ("created_at", 1)])
+    await db.notification_email_queue.create_index("claim_id", sparse=True)
+    await db.notification_email_queue.create_index(
+        "sent_at", expireAfterSeconds=SENT_RETENTION_DAYS * 24 * 3600
+    )
+
+
+def is_digest_enabled(window_minutes: int = None) -> bool:
+    window = DIGEST_WINDOW_MINUTES if window_minutes is None else window_minutes
+    return window > 0
+
+
+async def deliver_email(
+    db,
+    to: str,
+    subject: str,
+    body: str,
+    category: str,
+    summary: Optional[str] = None,
+    window_minutes: int = None
+) -> dict:
+    """
+    Send a notification email now, or queue it for the recipient's next digest.
+
+    Returns the send_email result, or {"success": True, "queued": True}.
+    """
+    if not is_digest_enabled(window_minutes) or category in URGENT_CATEGORIES:
+        return await send_email(to, subject, body)
+
+    await db.notification_email_queue.insert_one({
+        "entry_id": f"mailq_{uuid.uuid4().hex[:12]}",
+        "recipient": to,
+        "category": category,
+        "subject": subject,
+        "body": body,
+        "summary": summary or subject,
+        "status": STATUS_PENDING,
+        "created_at": datetime.now(timezone.utc)
+    })
+    return {"success": True, "queued": True}
+
+
+def build_digest(entries: list) -> tuple:
+    """Subject and body for a recipient's queued entries"""
+    groups = {}
+    for entry in sorted(entries, key=lambda e: e["created_at"]):
+        groups.setdefault(entry["category"], []).append(entry)
+
+    total = len(entries)
+    subject = f"Arbeit digest: {total} update{'s' if total != 1 else ''}"
+    body = render_template(
+        "notification_digest.html",
+        total=total,
+        since=min(e["created_at"] for e in entries),
+        groups=[
+            {"label": CATEGORY_LABELS.get(category, category.replace("_", " ").title()), "items": items}
+            for category, items in groups.items()
+        ]
+    )
+    return subject, body
+
+
+async def _flush_recipient(db, recipient: str) -> int:
+    """Claim and send one recipient's pending entries; returns emails sent"""
+    claim_id = uuid.uuid4().hex
+    await db.notification_email_queue.update_many(
+        {"recipient": recipient, "status": STATUS_PENDING},
+        {"$set": {"status": STATUS_SENDING, "claim_id": claim_id, "claimed_at": datetime.now(timezone.utc)}}
+    )
+    entries = await db.notification_email_queue.find({"claim_id": claim_id}, {"_id": 0}).to_list(None)
+    if not entries:
+        return 0
+
+    if len(entries) == 1:
+        # Nothing to coalesce; send the original email
+        subject, body = entries[0]["subject"], entries[0]["body"]
+    else:
+        subject, body = build_digest(entries)
+
+    result = await send_email(recipient, subject, body)
+    if result.get("success"):
+        await db.notification_email_queue.update_many(
+            {"claim_id": claim_id},
+            # The rendered body is only needed until it has been sent
+            {"$set": {"status": STATUS_SENT, "sent_at": datetime.now(timezone.utc)}, "$unset": {"body": ""}}
+        )
+        return 1
+
+    logger.error(f"Failed to send digest to {recipient}: {result.get('error')}")
+    await db.notification_email_queue.update_many(
+        {"claim_id": claim_id},
+        {"$set": {"status": STATUS_PENDING}, "$unset": {"claim_id": "", "claimed_at": ""}}
+    )
+    return 0
+
+
+async def flush_due_digests(db, window_minutes: int = None) -> int:
+    """Send digests to every recipient whose oldest queued email is due"""
+    window = DIGEST_WINDOW_MINUTES if window_minutes is None else window_minutes
+    now = datetime.now(timezone.utc)
+
+    # Release claims left behind by a worker that died mid-send
+    await db.notification_email_queue.update_many(
+        {"status": STATUS_SENDING, "claimed_at": {"$lt": now - timedelta(minutes=STALE_CLAIM_MINUTES)}},
+        {"$set": {"status": STATUS_PENDING}, "$unset": {"claim_id": "", "claimed_at": ""}}
+    )
+
+    due = await db.notification_email_queue.aggregate([
+        {"$match": {"status": STATUS_PENDING}},
+        {"$group": {"_id": "$recipient", "oldest": {"$min": "$created_at"}}},
+        {"$match": {"oldest": {"$lte": now - timedelta(minutes=window)}}}
+    ]).to_list(None)
+
+    sent = 0
+    for recipient in due:
+        sent += await _flush_recipient(db, recipient["_id"])
+    return sent
+
+
+async def run_digest_loop(db):
+    """Background loop started with the app when digests are enabled"""
+    while True:
+        try:
+            sent = await flush_due_digests(db)
+            if sent:
+                logger.info(f"Sent {sent} notification digest email(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Notification digest flush failed: {str(e)}")
+        await asyncio.sleep(DIGEST_FLUSH_INTERVAL_SECONDS)
@@ -0,0 +1,163 @@
+"""
+Notification Inbox - per-user notification state
+
+A notification is written once to `notifications` and fanned out to one
+`notification_inbox` entry per recipient. Each entry carries the user's
+own read flag plus the fields needed to render the notification, so the
+bell count is an indexed count and list/unread filtering happens in the
+query instead of scanning `read_by` arrays.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional, List, Set
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Notification fields copied onto every inbox entry
+DENORMALIZED_FIELDS = (
+    "type", "title", "message", "entity_type", "entity_id", "client_id", "created_by", "created_at"
+)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+async def ensure_inbox_indexes(db):
+    """Indexes backing the unread count, inbox listing and idempotent fan-out"""
+    await db.notification_inbox.create_index(
+        [("user_email", 1), ("is_read", 1), ("created_at", -1)]
+    )
+    await db.notification_inbox.create_index([("user_email", 1), ("created_at", -1)])
+    await db.notification_inbox.create_index(
+        [("user_email", 1), ("notification_id", 1)], unique=True
+    )
+    await db.notifications.create_index("notification_id")
+
+
+async def resolve_recipients(directory, notification: dict) -> Set[str]:
+    """
+    Emails that should see a notification: users holding one of `for_roles`,
+    explicit `for_users`, and the client users of `client_id`.
+    """
+    snapshot = await directory.snapshot()
+    emails = {u["email"] for u in snapshot.users_with_roles(notification.get("for_roles") or [])}
+    emails.update(notification.get("for_users") or [])
+    emails.update(u["email"] for u in snapshot.client_users(notification.get("client_id")))
+    return emails
+
+
+def build_inbox_entry(notification: dict, user_email: str, is_read: bool = False) -> dict:
+    entry = {
+        "notification_id": notification["notification_id"],
+        "user_email": user_email,
+        "is_read": is_read,
+        "read_at": None
+    }
+    for field in DENORMALIZED_FIELDS:
+        entry[field] = notification.get(field)
+    if entry["created_by"] is None:
+        entry["created_by"] = "system"
+    return entry
+
+
+async def fan_out(db, notification: dict, recipients, read_by=()) -> List[dict]:
+    """Upsert one inbox entry per recipient; existing entries are left untouched"""
+    read_by = set(read_by)
+    entries = [build_inbox_entry(notification, email, email in read_by) for email in sorted(recipients)]
+    if not entries:
+        return []
+
+    operations = [
+        UpdateOne(
+            {"user_email": entry["user_email"], "notification_id": entry["notification_id"]},
+            {"$setOnInsert": entry},
+            upsert=True
+        )
+        for entry in entries
+    ]
+    try:
+        await db.notification_inbox.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate keys from a concurrent fan-out of the same notification are harmless
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+    return entries
+
+
+async def publish_notification(db, directory, notification: dict) -> List[dict]:
+    """Store a notification and deliver it to every recipient's inbox"""
+    await db.notifications.insert_one(dict(notification))
+    recipients = await resolve_recipients(directory, notification)
+    return await fan_out(db, notification, recipients)
+
+
+def inbox_query(user_email: str, unread_only: bool = False) -> dict:
+    query = {"user_email": user_email}
+    if unread_only:
+        query["is_read"] = False
+    return query
+
+
+async def list_inbox(db, user_email: str, unread_only: bool = False, limit: int = 50) -> List[dict]:
+    return await db.notification_inbox.find(
+        inbox_query(user_email, unread_only),
+        {"_id": 0}
+    ).sort("created_at", -1).limit(limit).to_list(limit)
+
+
+async def count_unread(db, user_email: str) -> int:
+    return await db.notification_inbox.count_documents(inbox_query(user_email, unread_only=True))
+
+
+async def mark_read(db, user_email: str, notification_id: str) -> Optional[bool]:
+    """
+    Mark one entry read. Returns True when it was unread, False when it was
+    already read, and None when the user has no such notification.
+    """
+    entry_query = {"user_email": user_email, "notification_id": notification_id}
+    result = await db.notification_inbox.update_one(
+        {**entry_query, "is_read": False},
+        {"$set": {"is_read": True, "read_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    if result.modified_count:
+        return True
+    entry = await db.notification_inbox.find_one(entry_query, {"_id": 0, "notification_id": 1})
+    return False if entry else None
+
+
+async def mark_all_read(db, user_email: str) -> int:
+    result = await db.notification_inbox.update_many(
+        inbox_query(user_email, unread_only=True),
+        {"$set": {"is_read": True, "read_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    return result.modified_count
+
+
+async def backfill_inbox(db, directory, progress=None, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """
+    Fan out notifications created before the inbox existed.
+
+    Recipients are resolved against the current users; `read_by` is carried
+    over as the read flag. Safe to re-run since fan-out only inserts.
+    """
+    query = {"$or": [
+        {"for_roles": {"$exists": True}},
+        {"for_users": {"$exists": True}}
+    ]}
+    total = await db.notifications.count_documents(query)
+    processed = 0
+    entries = 0
+
+    cursor = db.notifications.find(query, {"_id": 0}).sort("created_at", 1).batch_size(batch_size)
+    async for notification in cursor:
+        recipients = await resolve_recipients(directory, notification)
+        entries += len(await fan_out(db, notification, recipients, notification.get("read_by") or []))
+        processed += 1
+        if progress and processed % batch_size == 0:
+            await progress(processed, total)
+
+    if progress:
+        await progress(processed, total)
+    return {"notifications_processed": processed, "inbox_entries": entries}
@@ -0,0 +1,165 @@
+"""
+Notification Stream - push notification events to connected users
+
+Connected browsers hold one Server-Sent Events stream each. Events for a
+user are delivered through an in-process pub/sub broker. With a single
+worker the publishing code feeds the broker directly; with several
+workers, set NOTIFICATION_CHANGE_STREAM=true and every worker tails a
+MongoDB change stream on `notification_inbox` instead (requires a replica
+set), so a notification created on one worker reaches users connected to
+any other.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Set, Optional
+
+logger = logging.getLogger(__name__)
+
+USE_CHANGE_STREAM = os.environ.get("NOTIFICATION_CHANGE_STREAM", "false").lower() == "true"
+
+# Seconds between keepalive comments on an idle stream
+KEEPALIVE_SECONDS = 25
+
+# Events buffered per connection before the slowest ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+CHANGE_STREAM_RETRY_SECONDS = 5
+
+# Inbox fields sent to the browser with a "notification" event
+EVENT_FIELDS = (
+    "notification_id", "type", "title", "message", "entity_type", "entity_id",
+    "client_id", "created_by", "created_at", "is_read"
+)
+
+
+def notification_event(entry: dict) -> dict:
+    payload = {field: entry.get(field) for field in EVENT_FIELDS}
+    return {"event": "notification", "data": {**payload, "unread_delta": 1}}
+
+
+def read_event(notification_id: str) -> dict:
+    return {"event": "read", "data": {"notification_id": notification_id, "unread_delta": -1}}
+
+
+def unread_count_event(count: int) -> dict:
+    return {"event": "unread_count", "data": {"unread_count": count}}
+
+
+def format_sse(event: dict) -> str:
+    """Serialize an event in text/event-stream framing"""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+class NotificationBroker:
+    """In-process pub/sub keyed by user email"""
+
+    def __init__(self, use_change_stream: bool = USE_CHANGE_STREAM):
+        self.use_change_stream = use_change_stream
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_email: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_email, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_email: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_email)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_email]
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def deliver(self, user_email: str, event: dict):
+        """Hand an event to every local connection of a user"""
+        for queue in self._subscribers.get(user_email, ()):
+            if queue.full():
+                # Slow client: drop its oldest event rather than block publishers
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def publish(self, user_email: str, event: dict):
+        """
+        Publish an event produced by this worker. In change-stream mode the
+        watcher delivers it (to every worker), so local delivery is skipped.
+        """
+        if not self.use_change_stream:
+            self.deliver(user_email, event)
+
+    def publish_entries(self, entries):
+        for entry in entries:
+            self.publish(entry["user_email"], notification_event(entry))
+
+    async def stream(self, user_email: str, initial_events=(), is_disconnected=None):
+        """Async generator of SSE frames for one connection"""
+        queue = self.subscribe(user_email)
+        try:
+            # Tell EventSource to wait a few seconds before reconnecting
+            yield "retry: 5000\n\n"
+            for event in initial_events:
+                yield format_sse(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                    yield format_sse(event)
+                except asyncio.TimeoutError:
+                    if is_disconnected and await is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(user_email, queue)
+
+    # ---- cross-worker delivery ----
+
+    def _handle_change(self, change: dict):
+        operation = change.get("operationType")
+        document = change.get("fullDocument") or {}
+        user_email = document.get("user_email")
+        if not user_email or user_email not in self._subscribers:
+            return
+
+        if operation == "insert":
+            self.deliver(user_email, notification_event(document))
+        elif operation == "update":
+            updated = change.get("updateDescription", {}).get("updatedFields", {})
+            if updated.get("is_read") is True:
+                self.deliver(user_email, read_event(document["notification_id"]))
+
+    async def _watch(self, db):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update"]}}}]
+        resume_token = None
+        while True:
+            try:
+                async with db.notification_inbox.watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=resume_token
+                ) as change_stream:
+                    async for change in change_stream:
+                        resume_token = change_stream.resume_token
+                        self._handle_change(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification change stream interrupted: {str(e)}")
+                await asyncio.sleep(CHANGE_STREAM_RETRY_SECONDS)
+
+    def start(self, db):
+        """Start tailing the inbox change stream when cross-worker mode is on"""
+        if self.use_change_stream and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(db))
+
+    async def stop(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
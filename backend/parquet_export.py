@@ -0,0 +1,373 @@
+"""
+Parquet Export - columnar exports of candidates, interviews and audit logs
+
+Each dataset has a fixed column list (name, source field, type). Exports
+from different days therefore share one Arrow schema, whatever optional
+fields individual documents happen to carry. Documents are read with one
+cursor sorted by the dataset's time field over an optional [start, end)
+range. The read uses the timestamp index and a projection of the exported
+fields only. Rows are shaped in batches of BATCH_ROWS and each batch is
+written as one Parquet row group. Memory stays at one batch plus the bytes
+not yet sent, however large the collection.
+
+With `partition` set to `month` or `day`, rows go into hive-style
+partitions (`interviews/month=2026-10/interviews.parquet`). The time-ordered
+cursor makes each partition contiguous, so only one writer is open at a
+time. Over HTTP the partitions are streamed as entries of a ZIP archive.
+From the command line they are written to a directory:
+
+    python parquet_export.py interviews --from 2026-01-01 --to 2026-10-01 --partition month --out exports
+
+pyarrow is imported on first use, so the API starts without it and only
+the export endpoints depend on it.
+"""
+import argparse
+import asyncio
+import json
+import os
+import zipfile
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from interview_availability import parse_time
+
+BATCH_ROWS = 10_000
+
+PARTITIONS = ("none", "month", "day")
+
+# Column types: string, int, float, bool, timestamp, strings (list of strings), json (serialized to a string)
+DATASETS = {
+    "candidates": {
+        "collection": "candidates",
+        "time_field": "created_at",
+        "columns": [
+            ("candidate_id", "candidate_id", "string"),
+            ("job_id", "job_id", "string"),
+            ("status", "status", "string"),
+            ("current_role", "current_role", "string"),
+            ("skills", "skills", "strings"),
+            ("fit_score", "ai_story.fit_score", "float"),
+            ("no_show_count", "no_show_count", "int"),
+            ("created_by", "created_by", "string"),
+            ("created_at", "created_at", "timestamp"),
+        ],
+    },
+    "interviews": {
+        "collection": "interviews",
+        "time_field": "created_at",
+        "columns": [
+            ("interview_id", "interview_id", "string"),
+            ("client_id", "client_id", "string"),
+            ("job_id", "job_id", "string"),
+            ("candidate_id", "candidate_id", "string"),
+            ("interview_status", "interview_status", "string"),
+            ("interview_mode", "interview_mode", "string"),
+            ("interview_duration", "interview_duration", "int"),
+            ("interview_round", "interview_round", "int"),
+            ("scheduled_start_at", "scheduled_start_at", "timestamp"),
+            ("scheduled_end_at", "scheduled_end_at", "timestamp"),
+            ("candidate_confirmation_timestamp", "candidate_confirmation_timestamp", "timestamp"),
+            ("no_show_flag", "no_show_flag", "bool"),
+            ("rating", "rating", "int"),
+            ("created_by", "created_by", "string"),
+            ("created_at", "created_at", "timestamp"),
+            ("updated_at", "updated_at", "timestamp"),
+        ],
+    },
+    "audit_logs": {
+        "collection": "audit_logs",
+        "time_field": "timestamp",
+        "columns": [
+            ("log_id", "log_id", "string"),
+            ("timestamp", "timestamp", "timestamp"),
+            ("user_id", "user_id", "string"),
+            ("user_email", "user_email", "string"),
+            ("user_role", "user_role", "string"),
+            ("client_id", "client_id", "string"),
+            ("action_type", "action_type", "string"),
+            ("entity_type", "entity_type", "string"),
+            ("entity_id", "entity_id", "string"),
+            ("previous_value", "previous_value", "json"),
+            ("new_value", "new_value", "json"),
+            ("metadata", "metadata", "json"),
+        ],
+    },
+}
+
+
+def _pyarrow():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def is_available() -> bool:
+    try:
+        _pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+async def ensure_export_indexes(db):
+    # candidates.created_at and audit_logs.timestamp are indexed for the hiring analytics sync
+    await db.interviews.create_index("created_at")
+
+
+def arrow_schema(dataset: str):
+    pa, _ = _pyarrow()
+    types = {
+        "string": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"), "strings": pa.list_(pa.string()), "json": pa.string(),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in DATASETS[dataset]["columns"]])
+
+
+def _lookup(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _convert(value, kind: str):
+    if value is None:
+        return None
+    try:
+        if kind == "string":
+            return str(value)
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        if kind == "bool":
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    if kind == "timestamp":
+        return parse_time(value)
+    if kind == "strings":
+        return [str(v) for v in value] if isinstance(value, list) else None
+    return json.dumps(value, default=str)
+
+
+def to_row(dataset: str, doc: dict) -> dict:
+    """Export row of a document, coerced to the dataset's column types"""
+    return {name: _convert(_lookup(doc, path), kind) for name, path, kind in DATASETS[dataset]["columns"]}
+
+
+def partition_value(timestamp: Optional[datetime], partition: str) -> Optional[str]:
+    if partition == "none":
+        return None
+    if timestamp is None:
+        return "unknown"
+    return timestamp.strftime("%Y-%m" if partition == "month" else "%Y-%m-%d")
+
+
+def partition_path(dataset: str, partition: str, value: Optional[str]) -> str:
+    if value is None:
+        return f"{dataset}.parquet"
+    return f"{dataset}/{partition}={value}/{dataset}.parquet"
+
+
+def _range_bound(value: date) -> str:
+    # Time fields are stored as ISO strings, which compare in time order
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).isoformat()
+
+
+async def export_query(db, dataset: str, start: Optional[date] = None, end: Optional[date] = None,
+                       client_id: Optional[str] = None) -> dict:
+    time_field = DATASETS[dataset]["time_field"]
+    query = {}
+    if start or end:
+        query[time_field] = {}
+        if start:
+            query[time_field]["$gte"] = _range_bound(start)
+        if end:
+            query[time_field]["$lt"] = _range_bound(end)
+    if client_id:
+        if dataset == "candidates":
+            # Candidates belong to a client through their job
+            jobs = await db.jobs.find({"client_id": client_id}, {"_id": 0, "job_id": 1}).to_list(None)
+            query["job_id"] = {"$in": [job["job_id"] for job in jobs]}
+        else:
+            query["client_id"] = client_id
+    return query
+
+
+async def iter_row_batches(db, dataset: str, start: Optional[date] = None, end: Optional[date] = None,
+                           client_id: Optional[str] = None, partition: str = "none",
+                           batch_rows: int = BATCH_ROWS) -> AsyncIterator[Tuple[Optional[str], List[dict]]]:
+    """(partition value, rows) in time order; no batch spans two partitions"""
+    spec = DATASETS[dataset]
+    time_field = spec["time_field"]
+    projection = {"_id": 0, **{path: 1 for _, path, _ in spec["columns"]}}
+    query = await export_query(db, dataset, start, end, client_id)
+    cursor = db[spec["collection"]].find(query, projection).sort(time_field, 1).batch_size(batch_rows)
+
+    current, rows = None, []
+    async for doc in cursor:
+        row = to_row(dataset, doc)
+        value = partition_value(parse_time(doc.get(time_field)), partition)
+        if rows and (value != current or len(rows) >= batch_rows):
+            yield current, rows
+            rows = []
+        current = value
+        rows.append(row)
+    if rows:
+        yield current, rows
+
+
+class _ChunkSink:
+    """Write-only file for pyarrow and zipfile; written bytes are handed out by drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _record_batch(schema, rows: List[dict]):
+    pa, _ = _pyarrow()
+    return pa.RecordBatch.from_pylist(rows, schema=schema)
+
+
+async def stream_parquet(db, dataset: str, start: Optional[date] = None, end: Optional[date] = None,
+                         client_id: Optional[str] = None, partition: str = "none",
+                         batch_rows: int = BATCH_ROWS) -> AsyncIterator[bytes]:
+    """One Parquet file, or a ZIP of partition files when partitioned, yielded chunk by chunk"""
+    _, pq = _pyarrow()
+    schema = arrow_schema(dataset)
+    parquet_sink = _ChunkSink()
+    zip_sink = _ChunkSink() if partition != "none" else None
+    archive = zipfile.ZipFile(zip_sink, mode="w") if zip_sink else None
+    now = datetime.now().timetuple()[:6]
+    writer = entry = None
+    current = None
+
+    def write_rows(rows: List[dict]):
+        # Encoding runs in a worker thread; a row group per batch
+        writer.write_batch(_record_batch(schema, rows))
+
+    def close_partition():
+        writer.close()
+        if entry:
+            entry.write(parquet_sink.drain())
+            entry.close()
+
+    def drained() -> bytes:
+        if entry:
+            entry.write(parquet_sink.drain())
+            return zip_sink.drain()
+        return parquet_sink.drain()
+
+    async for value, rows in iter_row_batches(db, dataset, start, end, client_id, partition, batch_rows):
+        if writer is None or value != current:
+            if writer is not None:
+                await asyncio.to_thread(close_partition)
+                yield zip_sink.drain()
+            current = value
+            parquet_sink = _ChunkSink()
+            writer = pq.ParquetWriter(parquet_sink, schema, compression="zstd")
+            if archive:
+                info = zipfile.ZipInfo(partition_path(dataset, partition, value), date_time=now)
+                info.compress_type = zipfile.ZIP_STORED  # Parquet pages are already compressed
+                entry = archive.open(info, mode="w", force_zip64=True)
+        await asyncio.to_thread(write_rows, rows)
+        chunk = drained()
+        if chunk:
+            yield chunk
+
+    if writer is None:
+        # No rows: still a valid, empty file with the dataset's schema
+        writer = pq.ParquetWriter(parquet_sink, schema, compression="zstd")
+        if archive:
+            info = zipfile.ZipInfo(partition_path(dataset, "none", None), date_time=now)
+            entry = archive.open(info, mode="w", force_zip64=True)
+    await asyncio.to_thread(close_partition)
+    if archive:
+        archive.close()
+        yield zip_sink.drain()
+    else:
+        yield parquet_sink.drain()
+
+
+async def export_to_directory(db, dataset: str, out_dir: Path, start: Optional[date] = None,
+                              end: Optional[date] = None, client_id: Optional[str] = None,
+                              partition: str = "none", batch_rows: int = BATCH_ROWS) -> List[Path]:
+    """Write the export under `out_dir`; returns the files written"""
+    _, pq = _pyarrow()
+    schema = arrow_schema(dataset)
+    written = []
+    writer = None
+    current = None
+    async for value, rows in iter_row_batches(db, dataset, start, end, client_id, partition, batch_rows):
+        if writer is None or value != current:
+            if writer is not None:
+                writer.close()
+            current = value
+            path = Path(out_dir) / partition_path(dataset, partition, value)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(str(path), schema, compression="zstd")
+            written.append(path)
+        await asyncio.to_thread(writer.write_batch, _record_batch(schema, rows))
+    if writer is not None:
+        writer.close()
+    return written
+
+
+async def _export_cli(args) -> List[Path]:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        return await export_to_directory(
+            client[os.environ['DB_NAME']], args.dataset, args.out, args.start, args.end, args.client_id,
+            args.partition
+        )
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a collection to Parquet")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="First day (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Last day (YYYY-MM-DD, exclusive)")
+    parser.add_argument("--client-id")
+    parser.add_argument("--partition", choices=PARTITIONS, default="none")
+    parser.add_argument("--out", type=Path, default=Path("exports"))
+    args = parser.parse_args()
+
+    files = asyncio.run(_export_cli(args))
+    for path in files:
+        print(path)
+    print(f"{len(files)} file(s) written")
+
+
+if __name__ == "__main__":
+    main()
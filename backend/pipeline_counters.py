@@ -0,0 +1,156 @@
+"""
+Pipeline Counters - materialized interview status counts
+
+`interview_pipeline_counters` has one document per client, plus one for all
+clients (ALL_CLIENTS). Each document holds the `InterviewPipelineStats`
+counts. Creating an interview increments its initial status. Every status
+transition applies the update with `find_one_and_update`, which returns the
+status it replaced atomically. The counters then move one from the old status
+to the new one, in a single bulk write for both documents. Concurrent
+transitions of the same interview each see the status they actually
+replaced, so the counts cannot drift. The dashboard reads one document
+instead of grouping the interviews collection on every load.
+
+`rebuild_counters` recomputes every document with one `$group`. It runs at
+startup when no counters exist yet, and from the maintenance endpoint to
+reconcile. A transition that lands while a rebuild is running can be
+counted twice or not at all; the next rebuild corrects it.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "pipeline_counters_rebuild"
+
+ALL_CLIENTS = "*"
+
+# Interview status -> InterviewPipelineStats field; other statuses only count in the total
+STATUS_FIELDS = {
+    "Awaiting Candidate Confirmation": "awaiting_confirmation",
+    "Confirmed": "confirmed",
+    "Scheduled": "scheduled",
+    "Completed": "completed",
+    "No Show": "no_shows",
+    "Cancelled": "cancelled",
+}
+COUNTER_FIELDS = ["total_interviews", *STATUS_FIELDS.values()]
+
+
+def empty_counts() -> dict:
+    return {field: 0 for field in COUNTER_FIELDS}
+
+
+async def _apply(db, client_id: str, increments: dict):
+    increments = {field: n for field, n in increments.items() if n}
+    if not increments:
+        return
+    now = datetime.now(timezone.utc)
+    await db.interview_pipeline_counters.bulk_write([
+        UpdateOne({"client_id": key}, {"$inc": increments, "$set": {"updated_at": now}}, upsert=True)
+        for key in (client_id, ALL_CLIENTS)
+    ], ordered=False)
+
+
+async def record_created(db, client_id: str, status: str):
+    increments = {"total_interviews": 1}
+    if status in STATUS_FIELDS:
+        increments[STATUS_FIELDS[status]] = 1
+    await _apply(db, client_id, increments)
+
+
+async def record_transition(db, client_id: str, old_status: Optional[str], new_status: str):
+    if old_status == new_status:
+        return
+    increments = {}
+    if old_status in STATUS_FIELDS:
+        increments[STATUS_FIELDS[old_status]] = -1
+    if new_status in STATUS_FIELDS:
+        increments[STATUS_FIELDS[new_status]] = increments.get(STATUS_FIELDS[new_status], 0) + 1
+    await _apply(db, client_id, increments)
+
+
+async def record_deleted(db, client_id: str, statuses: Iterable[Optional[str]]):
+    """Remove deleted interviews (by their last status) from the counts"""
+    increments = {"total_interviews": 0}
+    for status in statuses:
+        increments["total_interviews"] -= 1
+        if status in STATUS_FIELDS:
+            increments[STATUS_FIELDS[status]] = increments.get(STATUS_FIELDS[status], 0) - 1
+    await _apply(db, client_id, increments)
+
+
+async def update_interview_status(db, interview_id: str, update: dict) -> Optional[dict]:
+    """Apply an update that sets `interview_status` and count the transition it made"""
+    before = await db.interviews.find_one_and_update(
+        {"interview_id": interview_id}, update,
+        projection={"_id": 0, "client_id": 1, "interview_status": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before:
+        await record_transition(
+            db, before["client_id"], before.get("interview_status"), update["$set"]["interview_status"]
+        )
+    return before
+
+
+async def update_interview_fields(db, interview_id: str, fields: dict):
+    """Set interview fields, counting the transition when `interview_status` is among them"""
+    if "interview_status" in fields:
+        await update_interview_status(db, interview_id, {"$set": fields})
+    else:
+        await db.interviews.update_one({"interview_id": interview_id}, {"$set": fields})
+
+
+async def get_counts(db, client_id: Optional[str] = None) -> dict:
+    """Counts for one client, or for all clients"""
+    doc = await db.interview_pipeline_counters.find_one({"client_id": client_id or ALL_CLIENTS}, {"_id": 0})
+    counts = empty_counts()
+    if doc:
+        for field in COUNTER_FIELDS:
+            counts[field] = max(doc.get(field, 0), 0)
+    return counts
+
+
+async def has_counters(db) -> bool:
+    return await db.interview_pipeline_counters.find_one({"client_id": ALL_CLIENTS}, {"_id": 1}) is not None
+
+
+async def rebuild_counters(db, progress=None) -> dict:
+    """Recompute every counter document from the interviews (safe to re-run)"""
+    if progress:
+        await progress(0, 1)
+    grouped = await db.interviews.aggregate([
+        {"$group": {"_id": {"client_id": "$client_id", "status": "$interview_status"}, "count": {"$sum": 1}}}
+    ]).to_list(None)
+
+    by_client = {ALL_CLIENTS: empty_counts()}
+    for row in grouped:
+        client_id = row["_id"].get("client_id")
+        if not client_id:
+            continue
+        field = STATUS_FIELDS.get(row["_id"].get("status"))
+        for counts in (by_client.setdefault(client_id, empty_counts()), by_client[ALL_CLIENTS]):
+            counts["total_interviews"] += row["count"]
+            if field:
+                counts[field] += row["count"]
+
+    now = datetime.now(timezone.utc)
+    await db.interview_pipeline_counters.bulk_write([
+        UpdateOne({"client_id": client_id}, {"$set": {**counts, "updated_at": now}}, upsert=True)
+        for client_id, counts in by_client.items()
+    ], ordered=False)
+    # Clients whose interviews are all gone
+    await db.interview_pipeline_counters.delete_many({"client_id": {"$nin": list(by_client)}})
+
+    if progress:
+        await progress(1, 1)
+    logger.info(f"Rebuilt interview pipeline counters for {len(by_client) - 1} clients")
+    return {"clients": len(by_client) - 1, "interviews": by_client[ALL_CLIENTS]["total_interviews"]}
+
+
+async def ensure_counter_indexes(db):
+    await db.interview_pipeline_counters.create_index("client_id", unique=True)
@@ -0,0 +1,107 @@
+"""
+Recipient Directory - cached lookup of notification recipients
+
+Every notification path needs the admin/recruiter mailing list and, for
+client-facing events, the users of one client. Instead of querying the
+users collection on each event, the directory loads all users once,
+keeps the snapshot for a short TTL and is invalidated whenever a user is
+created, updated or deleted.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional, List, Dict
+
+logger = logging.getLogger(__name__)
+
+INTERNAL_ROLES = ("admin", "recruiter")
+
+# Seconds a snapshot stays valid before the next lookup reloads it
+RECIPIENT_DIRECTORY_TTL_SECONDS = float(os.environ.get("RECIPIENT_DIRECTORY_TTL_SECONDS", "60"))
+
+USER_PROJECTION = {"_id": 0, "email": 1, "name": 1, "role": 1, "client_id": 1, "phone": 1}
+
+
+class RecipientSnapshot:
+    """Immutable view of the users collection keyed by role and client_id"""
+
+    def __init__(self, users: List[dict]):
+        self.by_role: Dict[str, List[dict]] = {}
+        self.by_client: Dict[str, List[dict]] = {}
+        for user in users:
+            if not user.get("email"):
+                continue
+            self.by_role.setdefault(user.get("role"), []).append(user)
+            if user.get("client_id"):
+                self.by_client.setdefault(user["client_id"], []).append(user)
+
+    def users_with_roles(self, roles) -> List[dict]:
+        """Users holding any of the given roles"""
+        result = []
+        for role in roles:
+            result.extend(self.by_role.get(role, []))
+        return result
+
+    def client_users(self, client_id: Optional[str]) -> List[dict]:
+        """client_user accounts belonging to a client"""
+        if not client_id:
+            return []
+        return [u for u in self.by_client.get(client_id, []) if u.get("role") == "client_user"]
+
+
+class RecipientDirectory:
+    """TTL cache of recipient lists, shared by all notification senders"""
+
+    def __init__(self, db, ttl_seconds: float = RECIPIENT_DIRECTORY_TTL_SECONDS):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[RecipientSnapshot] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """Drop the cached snapshot; the next lookup reloads from MongoDB"""
+        self._generation += 1
+        self._snapshot = None
+
+    def _is_fresh(self) -> bool:
+        return self._snapshot is not None and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    async def snapshot(self) -> RecipientSnapshot:
+        """Return the cached snapshot, reloading it once when stale"""
+        if self._is_fresh():
+            return self._snapshot
+
+        async with self._lock:
+            # Another waiter may have refreshed while we were queued
+            if self._is_fresh():
+                return self._snapshot
+
+            generation = self._generation
+            users = await self.db.users.find({}, USER_PROJECTION).to_list(None)
+            snapshot = RecipientSnapshot(users)
+
+            # Only keep it if no invalidation happened during the load
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._loaded_at = time.monotonic()
+            logger.debug(f"Recipient directory loaded {len(users)} users")
+            return snapshot
+
+    async def internal_recipients(self) -> List[dict]:
+        """All admins and recruiters"""
+        return (await self.snapshot()).users_with_roles(INTERNAL_ROLES)
+
+    async def client_recipients(self, client_id: Optional[str]) -> List[dict]:
+        """client_user accounts of one client"""
+        return (await self.snapshot()).client_users(client_id)
+
+    async def recipients_by_role(self) -> Dict[str, List[dict]]:
+        """Recipient lists keyed by role"""
+        return (await self.snapshot()).by_role
+
+    async def recipients_by_client(self) -> Dict[str, List[dict]]:
+        """Recipient lists keyed by client_id"""
+        return (await self.snapshot()).by_client
@@ -0,0 +1,191 @@
+"""
+Redaction - remove contact details from CV text in a single pass
+
+All patterns are compiled once and merged into one alternation, so a CV is
+scanned once instead of once per pattern. Alternatives are listed in the
+order the old per-pattern passes ran (email, phone, short phone, LinkedIn,
+other URLs), which gives the same output unless two contact details overlap
+or touch. Then the earliest match wins and covers its whole span, where the
+old passes could leave a half-redacted URL ("[URL REDACTED] REDACTED]") or
+part of a phone number behind.
+
+`redact` also returns the redacted spans as compact [start, end, kind]
+triples in original-text coordinates, which is all that is needed to
+rebuild the redacted view later with `apply_spans`.
+
+Candidates store only `cv_text_original` plus those spans
+(`cv_redaction_spans`) instead of a second full copy of the CV; the
+redacted view is produced on demand and kept in a small per-process LRU
+keyed by candidate and `cv_text_id`, which changes whenever the CV text
+does. Documents still carrying `cv_text_redacted` keep working until the
+maintenance backfill converts them.
+"""
+import logging
+import re
+import uuid
+from typing import List, Optional, Tuple
+
+from cachetools import LRUCache
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "redaction_spans_backfill"
+
+VIEW_CACHE_SIZE = 256
+BACKFILL_BATCH_SIZE = 200
+
+EMAIL = 0
+PHONE = 1
+LINKEDIN = 2
+URL = 3
+
+REPLACEMENTS = {
+    EMAIL: "[EMAIL REDACTED]",
+    PHONE: "[PHONE REDACTED]",
+    LINKEDIN: "[LINKEDIN REDACTED]",
+    URL: "[URL REDACTED]",
+}
+
+_EMAIL = r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+_PHONE = r'(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3,4}[-.\s]?\d{4}\b'
+_PHONE_SHORT = r'\d{3}-\d{4}\b'  # Short format like 555-1234
+_LINKEDIN = r'https?://(?:www\.)?linkedin\.com/[^\s]+'
+_URL = r'https?://[^\s]+'
+
+# Alternatives in the old pass order. The shared \b is tested once and the
+# phone branches are only tried where a digit, "+" or "(" starts, which makes
+# the single pass cheaper than the separate passes it replaces.
+REDACTION_PATTERN = re.compile(
+    rf'\b(?:(?P<email>{_EMAIL})|(?=[\d+(])(?:(?P<phone>{_PHONE})|(?P<phone_short>{_PHONE_SHORT})))'
+    rf'|(?P<linkedin>{_LINKEDIN})|(?P<url>{_URL})'
+)
+_KIND_BY_GROUP = {"email": EMAIL, "phone": PHONE, "phone_short": PHONE, "linkedin": LINKEDIN, "url": URL}
+
+Span = List[int]  # [start, end, kind]
+
+
+def redact(text: str) -> Tuple[str, List[Span]]:
+    """Redacted text and the redacted spans of the original text"""
+    if not text:
+        return text, []
+    spans = []
+    pieces = []
+    position = 0
+    for match in REDACTION_PATTERN.finditer(text):
+        start, end = match.span()
+        kind = _KIND_BY_GROUP[match.lastgroup]
+        pieces.append(text[position:start])
+        pieces.append(REPLACEMENTS[kind])
+        spans.append([start, end, kind])
+        position = end
+    if not spans:
+        return text, []
+    pieces.append(text[position:])
+    return "".join(pieces), spans
+
+
+def redact_text(text: str) -> str:
+    """Redact personal information from text"""
+    return redact(text)[0]
+
+
+def find_spans(text: str) -> List[Span]:
+    """Only the redacted spans of a text"""
+    return [
+        [match.start(), match.end(), _KIND_BY_GROUP[match.lastgroup]]
+        for match in REDACTION_PATTERN.finditer(text or "")
+    ]
+
+
+def apply_spans(text: str, spans: List[Span]) -> str:
+    """Rebuild the redacted view of `text` from spans returned by `redact`/`find_spans`"""
+    if not spans:
+        return text
+    pieces = []
+    position = 0
+    for start, end, kind in spans:
+        pieces.append(text[position:start])
+        pieces.append(REPLACEMENTS[kind])
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+# ============ STORED CV TEXT ============
+
+def cv_text_fields(text: Optional[str]) -> dict:
+    """Fields to store for a candidate's CV text"""
+    return {
+        "cv_text_original": text,
+        "cv_redaction_spans": find_spans(text),
+        "cv_text_id": uuid.uuid4().hex[:12],
+    }
+
+
+def redacted_cv_text(candidate: dict) -> Optional[str]:
+    """Redacted view of a candidate document's CV text"""
+    if "cv_text_redacted" in candidate:
+        return candidate["cv_text_redacted"]  # Not yet converted to spans
+    text = candidate.get("cv_text_original")
+    if not text:
+        return text
+    spans = candidate.get("cv_redaction_spans")
+    return apply_spans(text, spans) if spans is not None else redact_text(text)
+
+
+# Projection with everything `redacted_cv_text` needs
+CV_TEXT_FIELDS = {"cv_text_original": 1, "cv_redaction_spans": 1, "cv_text_redacted": 1}
+
+_views = LRUCache(maxsize=VIEW_CACHE_SIZE)
+
+
+async def get_redacted_cv(db, candidate: dict) -> Optional[str]:
+    """Redacted CV for a candidate document that has at least candidate_id and cv_text_id
+
+    Recently produced views are served from the LRU without loading the CV
+    text from the database at all.
+    """
+    key = (candidate["candidate_id"], candidate.get("cv_text_id"))
+    if key in _views:
+        return _views[key]
+    if not CV_TEXT_FIELDS.keys() & candidate.keys():
+        candidate = await db.candidates.find_one(
+            {"candidate_id": candidate["candidate_id"]}, {"_id": 0, **CV_TEXT_FIELDS}
+        ) or {}
+    view = redacted_cv_text(candidate)
+    _views[key] = view
+    return view
+
+
+async def backfill_redaction_spans(db, progress=None, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """Replace stored `cv_text_redacted` copies with redaction spans (safe to re-run)"""
+    query = {"cv_text_original": {"$exists": True}, "cv_redaction_spans": {"$exists": False}}
+    total = await db.candidates.count_documents(query)
+    if progress:
+        await progress(0, total)
+
+    processed = 0
+    operations = []
+    cursor = db.candidates.find(query, {"_id": 0, "candidate_id": 1, "cv_text_original": 1})
+    async for candidate in cursor.batch_size(batch_size):
+        operations.append(UpdateOne(
+            {"candidate_id": candidate["candidate_id"]},
+            {
+                "$set": cv_text_fields(candidate.get("cv_text_original")),
+                "$unset": {"cv_text_redacted": ""}
+            }
+        ))
+        processed += 1
+        if len(operations) >= batch_size:
+            await db.candidates.bulk_write(operations, ordered=False)
+            operations = []
+            if progress:
+                await progress(processed, total)
+    if operations:
+        await db.candidates.bulk_write(operations, ordered=False)
+    if progress:
+        await progress(processed, total)
+    if processed:
+        logger.info(f"Converted {processed} candidates to redaction spans")
+    return {"candidates": processed}
@@ -1,16 +1,19 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, BackgroundTasks, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
 import io
+import asyncio
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr, ConfigDict, field_validator
 from typing import Optional, Literal, List
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+from zoneinfo import ZoneInfoNotFoundError
 import bcrypt
 import jwt
 import uuid
@@ -41,6 +44,34 @@ from notification_service import (
     get_interview_booked_email_template,
     send_client_user_welcome_email
 )
+from recipient_directory import RecipientDirectory
+import notification_inbox
+import notification_stream
+import notification_digest
+import background_jobs
+import fit_rescoring
+import skill_taxonomy
+import job_recommendations
+import text_similarity
+import candidate_dedup
+import candidate_identity
+from candidate_identity import identity_keys
+import redaction
+import story_pdf
+import interview_booking
+import interview_availability
+import interview_reminders
+import background_leader
+import no_show_risk
+import pipeline_counters
+import hiring_analytics
+import parquet_export
+import cv_storage
+import job_deletion
+import storage_gc
+from interview_models import AtRiskInterview, ReminderResponse
+from skill_taxonomy import dedupe_skills, skill_ids
+from fit_scoring import calculate_fit_score, rank_candidates
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -50,6 +81,12 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Cached recipient lists for notifications (invalidated on user changes)
+recipient_directory = RecipientDirectory(db)
+
+# Pushes notification events to connected browsers (SSE)
+notification_broker = notification_stream.NotificationBroker()
+
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'arbeit-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
@@ -61,6 +98,18 @@ security = HTTPBearer()
 
 # ============ NOTIFICATION HELPER FUNCTIONS ============
 
+async def queue_notification_email(to: str, subject: str, body: str, category: str) -> dict:
+    """Send a notification email, or hold it for the recipient's digest when digests are enabled"""
+    return await notification_digest.deliver_email(db, to, subject, body, category)
+
+
+async def publish_notification(notification_doc: dict):
+    """Store an in-app notification, fan it out to inboxes and push it to connected users"""
+    entries = await notification_inbox.publish_notification(db, recipient_directory, notification_doc)
+    notification_broker.publish_entries(entries)
+    return entries
+
+
 async def send_candidate_status_change_notification(
     candidate_id: str,
     old_status: str,
@@ -93,14 +142,11 @@ async def send_candidate_status_change_notification(
         )
         
         # Get recruiters to notify
-        recruiters = await db.users.find(
-            {"role": {"$in": ["admin", "recruiter"]}},
-            {"_id": 0, "email": 1}
-        ).to_list(100)
+        recruiters = await recipient_directory.internal_recipients()
         
         # Send to each recruiter
         for recruiter in recruiters:
-            await send_email(recruiter["email"], subject, body)
+            await queue_notification_email(recruiter["email"], subject, body, "candidate_status_change")
         
         # Create in-app notification
         notification_doc = {
@@ -157,23 +203,17 @@ async def send_interview_booking_notification(
         )
         
         # Get recruiters to notify
-        recruiters = await db.users.find(
-            {"role": {"$in": ["admin", "recruiter"]}},
-            {"_id": 0, "email": 1}
-        ).to_list(100)
+        recruiters = await recipient_directory.internal_recipients()
         
         # Send to each recruiter
         for recruiter in recruiters:
-            await send_email(recruiter["email"], subject, body)
+            await queue_notification_email(recruiter["email"], subject, body, "interview_booked")
         
         # Get client users to notify
-        client_users = await db.users.find(
-            {"role": "client_user", "client_id": interview["client_id"]},
-            {"_id": 0, "email": 1}
-        ).to_list(100)
+        client_users = await recipient_directory.client_recipients(interview["client_id"])
         
         for client_user in client_users:
-            await send_email(client_user["email"], subject, body)
+            await queue_notification_email(client_user["email"], subject, body, "interview_booked")
         
         # Create in-app notification
         notification_doc = {
@@ -468,6 +508,13 @@ class CandidateUpdate(BaseModel):
     summary: Optional[str] = None
     status: Optional[Literal["NEW", "PIPELINE", "APPROVED", "REJECTED"]] = None
 
+class DuplicateCandidate(BaseModel):
+    candidate_id: str
+    job_id: str
+    name: str
+    created_by: Optional[str] = None
+    similarity: float  # Estimated Jaccard similarity of the CV texts
+
 class CandidateResponse(BaseModel):
     candidate_id: str
     job_id: str
@@ -485,6 +532,8 @@ class CandidateResponse(BaseModel):
     status: str
     created_at: str
     created_by: str
+    text_similarity: Optional[float] = None  # Set when listing sorted by similarity
+    possible_duplicates: Optional[List[DuplicateCandidate]] = None  # Set on upload
 
 # Phase 5: Review Workflow Models
 class ReviewAction(str):
@@ -730,6 +779,7 @@ class InterviewResponse(BaseModel):
     round_name: Optional[str] = None
     feedback: Optional[str] = None
     rating: Optional[int] = None
+    slot_conflicts: List[dict] = []  # Scheduled interviews overlapping the proposed slots
 
 class InterviewListItem(BaseModel):
     """Lightweight interview item for lists"""
@@ -754,6 +804,21 @@ class InterviewPipelineStats(BaseModel):
     completed: int
     no_shows: int
     cancelled: int
+    at_risk: int = 0  # Upcoming interviews with a high materialized no-show risk score
+
+class AtRiskInterviewItem(AtRiskInterview):
+    """At-risk interview with the scoring context for the dashboard"""
+    candidate_id: str
+    job_id: str
+    client_id: str
+    interview_status: str
+    past_no_shows: int = 0
+    risk_factors: List[str] = []
+
+class ReminderResponseRequest(BaseModel):
+    """Candidate reply to an interview reminder"""
+    response_type: Literal["confirmed", "cannot_attend", "reschedule_request"]
+    response_text: Optional[str] = None
 
 
 # ============ UTILITIES ============
@@ -773,6 +838,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 async def save_cv_file(file: UploadFile, candidate_id: str) -> str:
     """Save uploaded CV file and return URL"""
     public_id = f"resumes/{candidate_id}"
+    await file.seek(0)
 
     result = cloudinary.uploader.upload(
         file.file,
@@ -846,23 +912,6 @@ async def extract_text_from_cv(file: UploadFile) -> str:
     
     return extracted_text if extracted_text else f"CV Upload - {file.filename}"
 
-def redact_text(text: str) -> str:
-    """Redact personal information from text"""
-    # Email redaction
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL REDACTED]', text)
-    
-    # Phone redaction (various formats including short forms)
-    text = re.sub(r'\b(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3,4}[-.\s]?\d{4}\b', '[PHONE REDACTED]', text)
-    text = re.sub(r'\b\d{3}-\d{4}\b', '[PHONE REDACTED]', text)  # Short format like 555-1234
-    
-    # LinkedIn URLs
-    text = re.sub(r'https?://(www\.)?linkedin\.com/[^\s]+', '[LINKEDIN REDACTED]', text)
-    
-    # Generic URLs (potential personal sites)
-    text = re.sub(r'https?://[^\s]+', '[URL REDACTED]', text)
-    
-    return text
-
 async def call_openai_directly(system_prompt: str, user_prompt: str, api_key: str) -> str:
     """Call OpenAI API directly using the official SDK"""
     try:
@@ -1011,6 +1060,9 @@ Parse the resume thoroughly and return ONLY valid JSON. Include the contact info
                 if parsed_data.get(key) is None:
                     parsed_data[key] = []
             
+            # Drop duplicate skills and aliases of skills already listed (e.g. "React" / "ReactJS")
+            parsed_data['skills'] = dedupe_skills(parsed_data['skills'])
+            
             # Deduplicate experience entries by company name
             if parsed_data.get('experience'):
                 seen_companies = {}
@@ -1248,105 +1300,6 @@ Generate ACCURATE JSON response.'''
         )
 
 
-def calculate_fit_score(candidate_data: dict, job_data: dict) -> int:
-    """Calculate fit score based on skills, experience, and role alignment"""
-    
-    # Skills Match (45% weight)
-    candidate_skills = set([s.lower().strip() for s in candidate_data.get('skills', [])])
-    job_skills = set([s.lower().strip() for s in job_data.get('required_skills', [])])
-    
-    if job_skills:
-        # Direct match
-        direct_matches = len(candidate_skills & job_skills)
-        # Partial match (check if job skill is substring of candidate skill or vice versa)
-        partial_matches = 0
-        for js in job_skills:
-            if js not in candidate_skills:
-                for cs in candidate_skills:
-                    if js in cs or cs in js:
-                        partial_matches += 0.5
-                        break
-        total_matches = direct_matches + partial_matches
-        skills_match_score = min((total_matches / len(job_skills)) * 45, 45)
-    else:
-        skills_match_score = 22  # Base score if no job skills specified
-    
-    # Experience Match (35% weight)
-    experience_list = candidate_data.get('experience', [])
-    candidate_years = len(experience_list) * 2  # Rough estimate: 2 years per position
-    
-    # Try to extract actual years from duration strings
-    total_months = 0
-    for exp in experience_list:
-        duration = exp.get('duration', '').lower()
-        if 'present' in duration or 'current' in duration:
-            total_months += 24  # Assume 2 years if current
-        elif '-' in duration:
-            try:
-                parts = duration.split('-')
-                if len(parts) == 2:
-                    # Try to parse years
-                    import re
-                    years = re.findall(r'20\d{2}|19\d{2}', duration)
-                    if len(years) >= 2:
-                        total_months += (int(years[1]) - int(years[0])) * 12
-                    else:
-                        total_months += 24
-            except:
-                total_months += 24
-        else:
-            total_months += 24
-    
-    candidate_years = max(candidate_years, total_months // 12)
-    
-    exp_range = job_data.get('experience_range', {})
-    min_years = exp_range.get('min_years', 0)
-    max_years = exp_range.get('max_years', 15)
-    
-    if min_years <= candidate_years <= max_years:
-        exp_match_score = 35
-    elif candidate_years > max_years:
-        exp_match_score = 30  # Overqualified but still good
-    elif candidate_years >= min_years * 0.7:
-        exp_match_score = 25  # Close enough
-    else:
-        exp_match_score = max((candidate_years / min_years) * 35, 10) if min_years > 0 else 20
-    
-    # Role Alignment (20% weight)
-    candidate_role = candidate_data.get('current_role', '').lower()
-    job_title = job_data.get('title', '').lower()
-    
-    # Check for keyword matches
-    job_keywords = set(job_title.replace('-', ' ').replace('/', ' ').split())
-    role_keywords = set(candidate_role.replace('-', ' ').replace('/', ' ').split())
-    
-    common_keywords = job_keywords & role_keywords
-    if common_keywords:
-        role_match_score = min(len(common_keywords) * 5 + 10, 20)
-    else:
-        # Check for related terms
-        related_terms = {
-            'developer': ['engineer', 'programmer', 'coder'],
-            'engineer': ['developer', 'architect', 'designer'],
-            'manager': ['lead', 'head', 'director', 'supervisor'],
-            'analyst': ['consultant', 'specialist', 'advisor'],
-            'designer': ['ux', 'ui', 'creative', 'artist']
-        }
-        role_match_score = 8
-        for key, synonyms in related_terms.items():
-            if key in job_title:
-                for syn in synonyms:
-                    if syn in candidate_role:
-                        role_match_score = 15
-                        break
-    
-    total_score = int(skills_match_score + exp_match_score + role_match_score)
-    final_score = min(max(total_score, 20), 100)
-    
-    print(f"[DEBUG] Fit Score Calculation: Skills={skills_match_score:.1f}, Exp={exp_match_score:.1f}, Role={role_match_score} = {final_score}%")
-    
-    return final_score
-
 def create_access_token(data: dict) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -1676,6 +1629,7 @@ async def register_user(user_data: UserCreate):
     }
     
     await db.users.insert_one(user_doc)
+    recipient_directory.invalidate()
     
     return UserResponse(
         email=user_data.email,
@@ -1783,7 +1737,7 @@ async def change_password(
 async def register_candidate_portal(candidate_data: CandidatePortalRegister):
     """Register a new candidate for the portal"""
     # Check if candidate already exists
-    existing = await db.candidate_portal_users.find_one({"email": candidate_data.email})
+    existing = await candidate_identity.find_portal_user(db, candidate_data.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1805,15 +1759,22 @@ async def register_candidate_portal(candidate_data: CandidatePortalRegister):
         "current_company": candidate_data.current_company,
         "experience_years": candidate_data.experience_years,
         "password_hash": password_hash,
+        **identity_keys(candidate_data.email, candidate_data.phone),
         "created_at": datetime.now(timezone.utc).isoformat(),
         "is_active": True
     }
     
-    await db.candidate_portal_users.insert_one(candidate_doc)
+    try:
+        await db.candidate_portal_users.insert_one(candidate_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A candidate with this email already exists"
+        )
     
     # Try to link with existing candidate records by email
     await db.candidates.update_many(
-        {"email": candidate_data.email},
+        candidate_identity.email_query(candidate_data.email),
         {"$set": {"candidate_portal_id": candidate_portal_id}}
     )
     
@@ -1832,7 +1793,7 @@ async def register_candidate_portal(candidate_data: CandidatePortalRegister):
 @api_router.post("/candidate-portal/login", response_model=CandidatePortalTokenResponse)
 async def login_candidate_portal(login_data: CandidatePortalLogin):
     """Login for candidate portal"""
-    candidate = await db.candidate_portal_users.find_one({"email": login_data.email})
+    candidate = await candidate_identity.find_portal_user(db, login_data.email)
     
     if not candidate:
         raise HTTPException(
@@ -2097,7 +2058,7 @@ async def create_candidate_portal_user_by_admin(
     import secrets
     
     # Check if email already exists
-    existing = await db.candidate_portal_users.find_one({"email": user_data.email})
+    existing = await candidate_identity.find_portal_user(db, user_data.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -2120,6 +2081,7 @@ async def create_candidate_portal_user_by_admin(
         "current_company": user_data.current_company,
         "experience_years": user_data.experience_years,
         "password_hash": password_hash,
+        **identity_keys(user_data.email, user_data.phone),
         "must_change_password": True,
         "status": "active",
         "linked_candidate_id": user_data.link_to_candidate_id,
@@ -2127,7 +2089,13 @@ async def create_candidate_portal_user_by_admin(
         "created_by": current_user["email"]
     }
     
-    await db.candidate_portal_users.insert_one(user_doc)
+    try:
+        await db.candidate_portal_users.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A candidate portal user with this email already exists"
+        )
     
     # Link to candidate if specified
     if user_data.link_to_candidate_id:
@@ -2223,6 +2191,7 @@ async def update_candidate_portal_user_by_admin(
     update_data = user_data.model_dump(exclude_unset=True)
     if not update_data:
         raise HTTPException(status_code=400, detail="No update data provided")
+    update_data.update(candidate_identity.contact_key_updates(update_data))
     
     await db.candidate_portal_users.update_one(
         {"candidate_portal_id": portal_id},
@@ -2376,7 +2345,7 @@ async def send_selection_notification(
         client = {"company_name": "Unknown Company"}
     
     # Check if candidate already has portal account
-    existing_portal_user = await db.candidate_portal_users.find_one({"email": candidate_email})
+    existing_portal_user = await candidate_identity.find_portal_user(db, candidate_email)
     
     if existing_portal_user:
         # Reset password for existing user
@@ -2384,7 +2353,7 @@ async def send_selection_notification(
         password_hash = bcrypt.hashpw(temp_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         
         await db.candidate_portal_users.update_one(
-            {"email": candidate_email},
+            {"candidate_portal_id": existing_portal_user["candidate_portal_id"]},
             {"$set": {
                 "password_hash": password_hash,
                 "must_change_password": True
@@ -2407,12 +2376,19 @@ async def send_selection_notification(
             "current_company": candidate.get("current_company", ""),
             "experience_years": None,
             "password_hash": password_hash,
+            **identity_keys(candidate_email, candidate.get("phone")),
             "must_change_password": True,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "is_active": True
         }
         
-        await db.candidate_portal_users.insert_one(portal_user_doc)
+        try:
+            await db.candidate_portal_users.insert_one(portal_user_doc)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A portal account for this email was created concurrently; please retry"
+            )
     
     # Link candidate record to portal user
     await db.candidates.update_one(
@@ -2486,15 +2462,7 @@ async def send_selection_notification(
 async def get_candidate_interviews(current_candidate: dict = Depends(get_current_candidate)):
     """Get all interviews for the logged-in candidate"""
     # Find candidate records linked to this portal user
-    candidate_records = await db.candidates.find(
-        {"$or": [
-            {"candidate_portal_id": current_candidate["candidate_portal_id"]},
-            {"email": current_candidate["email"]}
-        ]},
-        {"_id": 0}
-    ).to_list(100)
-    
-    candidate_ids = [c["candidate_id"] for c in candidate_records]
+    candidate_ids = await candidate_identity.candidate_ids_for(db, current_candidate)
     
     if not candidate_ids:
         return []
@@ -2540,15 +2508,7 @@ async def candidate_portal_book_slot(
         )
     
     # Verify this interview belongs to the candidate
-    candidate_records = await db.candidates.find(
-        {"$or": [
-            {"candidate_portal_id": current_candidate["candidate_portal_id"]},
-            {"email": current_candidate["email"]}
-        ]},
-        {"_id": 0, "candidate_id": 1}
-    ).to_list(100)
-    
-    candidate_ids = [c["candidate_id"] for c in candidate_records]
+    candidate_ids = await candidate_identity.candidate_ids_for(db, current_candidate)
     
     if interview["candidate_id"] not in candidate_ids:
         raise HTTPException(
@@ -2556,56 +2516,9 @@ async def candidate_portal_book_slot(
             detail="This interview does not belong to you"
         )
     
-    # Verify interview is in correct status
-    if interview["interview_status"] != "Awaiting Candidate Confirmation":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Interview is not awaiting confirmation (current status: {interview['interview_status']})"
-        )
-    
-    # Find the selected slot
-    selected_slot = None
-    for slot in interview.get("proposed_slots", []):
-        if slot["slot_id"] == slot_id:
-            selected_slot = slot
-            break
-    
-    if not selected_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Slot not found"
-        )
-    
-    if not selected_slot.get("is_available", True):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Slot is no longer available"
-        )
-    
+    # Book atomically; concurrent bookings of the slot cannot both succeed
     now = datetime.now(timezone.utc).isoformat()
-    
-    # Update interview with selected slot
-    update_data = {
-        "selected_slot_id": slot_id,
-        "scheduled_start_time": selected_slot["start_time"],
-        "scheduled_end_time": selected_slot["end_time"],
-        "interview_status": "Confirmed",
-        "candidate_confirmation_timestamp": now,
-        "updated_at": now
-    }
-    
-    # Mark selected slot as unavailable
-    updated_slots = []
-    for slot in interview.get("proposed_slots", []):
-        if slot["slot_id"] == slot_id:
-            slot["is_available"] = False
-        updated_slots.append(slot)
-    update_data["proposed_slots"] = updated_slots
-    
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
-        {"$set": update_data}
-    )
+    selected_slot = await book_slot_or_raise(interview, slot_id, confirmed=True, now=now)
     
     # Log audit event
     await log_audit_event(
@@ -2634,14 +2547,13 @@ async def candidate_portal_book_slot(
         "client_id": interview["client_id"],
         "for_roles": ["admin", "recruiter"],
         "created_by": current_candidate["email"],
-        "created_at": now,
-        "read_by": []
+        "created_at": now
     }
-    await db.notifications.insert_one(notification_doc)
+    await publish_notification(notification_doc)
     
     # Send email notification to recruiters
     try:
-        from notification_service import send_email, get_interview_booked_email_template
+        from notification_service import get_interview_booked_email_template
         
         job = await db.jobs.find_one({"job_id": interview["job_id"]}, {"_id": 0})
         client = await db.clients.find_one({"client_id": interview["client_id"]}, {"_id": 0})
@@ -2654,13 +2566,10 @@ async def candidate_portal_book_slot(
             interview, candidate or {}, job or {}, client or {}, slot_time
         )
         
-        recruiters = await db.users.find(
-            {"role": {"$in": ["admin", "recruiter"]}},
-            {"_id": 0, "email": 1}
-        ).to_list(100)
+        recruiters = await recipient_directory.internal_recipients()
         
         for recruiter in recruiters:
-            await send_email(recruiter["email"], subject, body)
+            await queue_notification_email(recruiter["email"], subject, body, "interview_booked")
     except Exception as e:
         logging.error(f"Error sending interview booked notification: {str(e)}")
     
@@ -2954,6 +2863,7 @@ async def create_client_user(
     }
     
     await db.users.insert_one(user_doc)
+    recipient_directory.invalidate()
     
     # Send welcome email with credentials
     frontend_url = os.environ.get('REACT_APP_FRONTEND_URL', 'https://arbeit.co.in')
@@ -3042,6 +2952,7 @@ async def update_client_user(
         {"email": decoded_email, "client_id": client_id},
         {"$set": update_data}
     )
+    recipient_directory.invalidate()
     
     # Fetch the updated user with the correct email
     final_email = new_email if email_changed else decoded_email
@@ -3108,6 +3019,7 @@ async def delete_client_user(
     
     # Delete the user
     await db.users.delete_one({"email": decoded_email, "client_id": client_id})
+    recipient_directory.invalidate()
     
     return {"message": f"User {decoded_email} removed successfully"}
 
@@ -3182,31 +3094,34 @@ async def create_job(
         "work_model": job_data.work_model,
         "city": job_data.city,
         "notice_period_days": job_data.notice_period_days,
-        "required_skills": job_data.required_skills,
+        "required_skills": dedupe_skills(job_data.required_skills),
+        "required_skill_ids": skill_ids(job_data.required_skills),
         "description": job_data.description,
         "status": job_data.status,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "created_by": current_user["email"]
     }
     
+    job_doc["text_vector"] = await text_similarity.job_vector_document(db, job_doc)
+    
     await db.jobs.insert_one(job_doc)
+    await job_recommendations.index_job(db, job_doc)
     
     # Send notification to recruiters (in background)
     async def send_job_notifications():
         try:
             # Get all recruiters and admins to notify
-            recruiters = await db.users.find(
-                {"role": {"$in": ["admin", "recruiter"]}},
-                {"_id": 0, "email": 1, "name": 1}
-            ).to_list(100)
+            recruiters = await recipient_directory.internal_recipients()
             
             # Generate email content
             subject, body = get_new_job_email_template(job_doc, client, current_user["email"])
             
             # Send email to each recruiter
             for recruiter in recruiters:
-                result = await send_email(recruiter["email"], subject, body)
-                if result["success"]:
+                result = await queue_notification_email(recruiter["email"], subject, body, "new_job")
+                if result.get("queued"):
+                    logging.info(f"Job notification email queued for {recruiter['email']}'s digest")
+                elif result["success"]:
                     logging.info(f"Job notification email sent to {recruiter['email']}")
                 else:
                     logging.error(f"Failed to send job notification to {recruiter['email']}: {result.get('error')}")
@@ -3222,10 +3137,9 @@ async def create_job(
                 "client_id": client_id,
                 "for_roles": ["admin", "recruiter"],
                 "created_by": current_user["email"],
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "read_by": []
+                "created_at": datetime.now(timezone.utc).isoformat()
             }
-            await db.notifications.insert_one(notification_doc)
+            await publish_notification(notification_doc)
             
         except Exception as e:
             logging.error(f"Error sending job notifications: {str(e)}")
@@ -3242,7 +3156,7 @@ async def create_job(
         experience_range=job_data.experience_range,
         salary_range=job_data.salary_range,
         work_model=job_data.work_model,
-        required_skills=job_data.required_skills,
+        required_skills=job_doc["required_skills"],
         description=job_data.description,
         status=job_data.status,
         created_at=job_doc["created_at"],
@@ -3291,6 +3205,9 @@ async def list_jobs(
     if status:
         query["status"] = status
     
+    # Jobs being deleted are already gone as far as clients are concerned
+    query["deletion_status"] = {"$ne": job_deletion.DELETING}
+    
     jobs = await db.jobs.find(query, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
     
     # Populate company names
@@ -3323,7 +3240,7 @@ async def get_job(
 ):
     """Get a specific job requirement"""
     job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
-    if not job:
+    if not job or job_deletion.is_deleting(job):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
@@ -3368,6 +3285,7 @@ async def get_job(
 async def update_job(
     job_id: str,
     job_data: JobUpdate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Update a job requirement"""
@@ -3378,6 +3296,12 @@ async def update_job(
             detail="Job not found"
         )
     
+    if job_deletion.is_deleting(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is being deleted"
+        )
+    
     # Tenant check for client users
     if current_user["role"] == "client_user":
         if job["client_id"] != current_user["client_id"]:
@@ -3407,13 +3331,24 @@ async def update_job(
     if "salary_range" in update_data and update_data["salary_range"]:
         if hasattr(update_data["salary_range"], 'model_dump'):
             update_data["salary_range"] = update_data["salary_range"].model_dump()
+    if update_data.get("required_skills") is not None:
+        update_data["required_skills"] = dedupe_skills(update_data["required_skills"])
+        update_data["required_skill_ids"] = skill_ids(update_data["required_skills"])
+    if any(field in update_data for field in ("title", "description", "required_skills")):
+        update_data["text_vector"] = await text_similarity.job_vector_document(db, {**job, **update_data})
     
     await db.jobs.update_one(
         {"job_id": job_id},
         {"$set": update_data}
     )
     
+    # Stored fit scores depend on title/skills/experience; refresh them in the background
+    if fit_rescoring.scoring_inputs_changed(job, update_data):
+        await start_fit_rescore(job_id, current_user["email"], background_tasks)
+    
     updated_job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if job_recommendations.index_fields_changed(job, update_data):
+        await job_recommendations.index_job(db, updated_job)
     client = await db.clients.find_one({"client_id": updated_job["client_id"]})
     
     return JobResponse(
@@ -3434,9 +3369,56 @@ async def update_job(
     )
 
 
+async def start_fit_rescore(job_id: str, requested_by: str, background_tasks: BackgroundTasks, force: bool = False) -> dict:
+    """Queue a background rescore of a job's candidates and return its task record"""
+    task = await background_jobs.create_task(
+        db, fit_rescoring.TASK_TYPE, requested_by, {"job_id": job_id, "force": force}
+    )
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        fit_rescoring.rescore_job_candidates, db, job_id, force=force
+    )
+    return task
+
+
+@api_router.post("/jobs/{job_id}/rescore")
+async def rescore_job_candidates(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    current_user: dict = Depends(require_admin_or_recruiter)
+):
+    """Recompute stored fit scores for a job's candidates (only changed inputs unless force=true)"""
+    job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0, "job_id": 1})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    task = await start_fit_rescore(job_id, current_user["email"], background_tasks, force=force)
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.get("/jobs/{job_id}/rescore-status")
+async def get_job_rescore_status(
+    job_id: str,
+    current_user: dict = Depends(require_admin_or_recruiter)
+):
+    """Progress of the most recent fit rescore for a job"""
+    task = await background_jobs.get_latest_task(db, fit_rescoring.TASK_TYPE, {"job_id": job_id})
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No rescore has been run for this job"
+        )
+    return task
+
+
 @api_router.delete("/jobs/{job_id}")
 async def delete_job(
     job_id: str,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a job (Admin only)"""
@@ -3464,20 +3446,9 @@ async def delete_job(
             detail="Job not found"
         )
     
-    # Delete all candidates for this job
-    candidates = await db.candidates.find({"job_id": job_id}, {"_id": 0}).to_list(1000)
-    candidate_count = len(candidates)
-    
-    for candidate in candidates:
-        # Delete CV versions
-        await db.candidate_cv_versions.delete_many({"candidate_id": candidate["candidate_id"]})
-        # Delete reviews
-        await db.candidate_reviews.delete_many({"candidate_id": candidate["candidate_id"]})
-        # Delete candidate
-        await db.candidates.delete_one({"candidate_id": candidate["candidate_id"]})
-    
-    # Delete the job
-    await db.jobs.delete_one({"job_id": job_id})
+    # Small jobs are deleted within the request; larger ones in the background with progress
+    counts = await job_deletion.count_dependents(db, job_id)
+    inline = counts["candidates"] + counts["interviews"] <= job_deletion.INLINE_LIMIT
     
     # Log audit event
     await log_audit_event(
@@ -3490,7 +3461,9 @@ async def delete_job(
         client_id=job.get("client_id"),
         metadata={
             "job_title": job["title"],
-            "candidates_deleted": candidate_count
+            "candidates_deleted": counts["candidates"],
+            "interviews_deleted": counts["interviews"],
+            "background": not inline
         },
         previous_value={
             "title": job["title"],
@@ -3499,10 +3472,23 @@ async def delete_job(
         }
     )
     
+    if inline:
+        result = await job_deletion.delete_job_cascade(db, job_id, cv_storage.get_storage())
+        return {"message": "Job and all associated data deleted successfully", **result}
+    
+    await job_deletion.mark_deleting(db, job_id)
+    task = await background_jobs.create_task(db, job_deletion.TASK_TYPE, current_user["email"], {"job_id": job_id})
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        job_deletion.delete_job_cascade, db, job_id, storage=cv_storage.get_storage()
+    )
     return {
-        "message": "Job and all associated data deleted successfully",
+        "message": "Job deletion started",
         "job_id": job_id,
-        "candidates_deleted": candidate_count
+        "candidates": counts["candidates"],
+        "interviews": counts["interviews"],
+        "task_id": task["task_id"],
+        "status": task["status"]
     }
 
 
@@ -3538,19 +3524,63 @@ async def close_job(
         {"job_id": job_id},
         {"$set": {"status": "Closed"}}
     )
+    await job_recommendations.remove_job(db, job_id)
     
     return {"message": "Job closed successfully"}
 
 
 # ============ CANDIDATE MANAGEMENT (Phase 4) ============
 
+async def find_duplicate_candidates(cv_text: str, current_user: dict, exclude_candidate_id: Optional[str] = None) -> list:
+    """Likely duplicates of a CV that the user is allowed to see"""
+    duplicates = await candidate_dedup.find_duplicates(db, cv_text, exclude_candidate_id)
+    if duplicates and current_user["role"] == "client_user":
+        # Client users only learn about candidates of their own client's jobs
+        own_jobs = await db.jobs.find(
+            {"job_id": {"$in": [d["job_id"] for d in duplicates]}, "client_id": current_user["client_id"]},
+            {"_id": 0, "job_id": 1}
+        ).to_list(None)
+        own_job_ids = {j["job_id"] for j in own_jobs}
+        duplicates = [d for d in duplicates if d["job_id"] in own_job_ids]
+    return duplicates
+
+
+@api_router.post("/candidates/duplicate-check", response_model=List[DuplicateCandidate])
+async def check_candidate_duplicates(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Likely duplicates of a CV among existing candidates, without creating anything"""
+    if current_user["role"] == "client_user":
+        has_permission = await check_permission(current_user, "can_upload_cv", current_user.get("client_id"))
+        if not has_permission:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permission denied: can_upload_cv required"
+            )
+    elif current_user["role"] not in ["admin", "recruiter"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin/recruiter can upload candidates"
+        )
+    
+    cv_text = await extract_text_from_cv(file)
+    return await find_duplicate_candidates(cv_text, current_user)
+
+
 @api_router.post("/candidates/upload", response_model=CandidateResponse)
 async def upload_candidate_cv(
     job_id: str = Form(...),
     file: UploadFile = File(...),
+    on_duplicate: Literal["warn", "reject", "allow"] = Form("warn"),
     current_user: dict = Depends(get_current_user)
 ):
-    """Upload CV and create candidate with AI parsing"""
+    """
+    Upload CV and create candidate with AI parsing.
+    
+    Near-duplicate CVs are detected before storage and AI parsing: "warn"
+    creates the candidate and lists them, "reject" returns 409 with them.
+    """
     # Check permission to upload CV
     if current_user["role"] == "client_user":
         has_permission = await check_permission(current_user, "can_upload_cv", current_user.get("client_id"))
@@ -3573,17 +3603,33 @@ async def upload_candidate_cv(
             detail="Job not found"
         )
     
-    # Generate candidate_id
-    candidate_id = f"cand_{uuid.uuid4().hex[:8]}"
-    
-    # Save CV file
-    cv_url = await save_cv_file(file, candidate_id)
+    if job_deletion.is_deleting(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is being deleted"
+        )
     
     # Extract text from CV using proper PDF/DOCX parsing
     cv_text = await extract_text_from_cv(file)
     print(f"[DEBUG] Extracted CV text length: {len(cv_text)} chars")
     print(f"[DEBUG] CV text preview: {cv_text[:500]}")
     
+    # Check for near-duplicates before paying for storage and AI parsing
+    duplicates = []
+    if on_duplicate != "allow":
+        duplicates = await find_duplicate_candidates(cv_text, current_user)
+        if duplicates and on_duplicate == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Likely duplicate of existing candidates", "duplicates": duplicates}
+            )
+    
+    # Generate candidate_id
+    candidate_id = f"cand_{uuid.uuid4().hex[:8]}"
+    
+    # Save CV file
+    cv_url = await save_cv_file(file, candidate_id)
+    
     # Parse CV with AI
     parsed_resume = await parse_cv_with_ai(cv_text)
     
@@ -3606,19 +3652,22 @@ async def upload_candidate_cv(
         "current_role": parsed_resume.current_role,
         "email": parsed_resume.email,
         "phone": parsed_resume.phone,
+        **identity_keys(parsed_resume.email, parsed_resume.phone),
         "linkedin": parsed_resume.linkedin,
         "skills": parsed_resume.skills,
+        "skill_ids": skill_ids(parsed_resume.skills),
         "experience": parsed_resume.experience,
         "education": parsed_resume.education,
         "summary": parsed_resume.summary,
         "cv_file_url": cv_url,
-        "cv_text_original": cv_text,
-        "cv_text_redacted": redact_text(cv_text),
+        **redaction.cv_text_fields(cv_text),
+        **candidate_dedup.dedup_fields(cv_text),
         "ai_story": ai_story.model_dump(),
         "status": "NEW",
         "created_at": datetime.now(timezone.utc).isoformat(),
         "created_by": current_user["email"]
     }
+    candidate_doc["text_vector"] = await text_similarity.candidate_vector_document(db, candidate_doc)
     
     await db.candidates.insert_one(candidate_doc)
     
@@ -3669,7 +3718,8 @@ async def upload_candidate_cv(
         ai_story=ai_story,
         status="NEW",
         created_at=candidate_doc["created_at"],
-        created_by=current_user["email"]
+        created_by=current_user["email"],
+        possible_duplicates=duplicates
     )
 
 @api_router.post("/candidates", response_model=CandidateResponse)
@@ -3700,6 +3750,12 @@ async def create_candidate_manual(
             detail="Job not found"
         )
     
+    if job_deletion.is_deleting(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is being deleted"
+        )
+    
     candidate_id = f"cand_{uuid.uuid4().hex[:8]}"
     
     # Generate AI story
@@ -3712,7 +3768,9 @@ async def create_candidate_manual(
         "current_role": candidate_data.current_role,
         "email": candidate_data.email,
         "phone": candidate_data.phone,
+        **identity_keys(candidate_data.email, candidate_data.phone),
         "skills": candidate_data.skills,
+        "skill_ids": skill_ids(candidate_data.skills),
         "experience": candidate_data.experience,
         "education": candidate_data.education,
         "summary": candidate_data.summary,
@@ -3722,6 +3780,7 @@ async def create_candidate_manual(
         "created_at": datetime.now(timezone.utc).isoformat(),
         "created_by": current_user["email"]
     }
+    candidate_doc["text_vector"] = await text_similarity.candidate_vector_document(db, candidate_doc)
     
     await db.candidates.insert_one(candidate_doc)
     
@@ -3748,9 +3807,10 @@ async def create_candidate_manual(
 async def list_job_candidates(
     job_id: str,
     show_rejected: bool = False,
+    sort_by: Optional[Literal["created_at", "fit_score", "similarity"]] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """List all candidates for a job (excluding rejected by default)"""
+    """List all candidates for a job (excluding rejected by default), optionally sorted"""
     # Verify job exists and user has access
     job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
     if not job:
@@ -3784,6 +3844,16 @@ async def list_job_candidates(
         {"_id": 0}
     ).to_list(1000)
     
+    similarities = {}
+    if sort_by == "created_at":
+        candidates.sort(key=lambda c: c.get("created_at", ""), reverse=True)
+    elif sort_by == "fit_score":
+        candidates.sort(key=lambda c: (c.get("ai_story") or {}).get("fit_score", 0), reverse=True)
+    elif sort_by == "similarity":
+        scores = await text_similarity.job_similarities(db, job, candidates)
+        similarities = {c["candidate_id"]: round(float(score), 4) for c, score in zip(candidates, scores)}
+        candidates.sort(key=lambda c: similarities[c["candidate_id"]], reverse=True)
+    
     result = []
     for cand in candidates:
         result.append(CandidateResponse(
@@ -3802,11 +3872,83 @@ async def list_job_candidates(
             ai_story=CandidateStory(**cand["ai_story"]) if cand.get("ai_story") else None,
             status=cand["status"],
             created_at=cand["created_at"],
-            created_by=cand["created_by"]
+            created_by=cand["created_by"],
+            text_similarity=similarities.get(cand["candidate_id"])
         ))
     
     return result
 
+class CandidateFitRanking(BaseModel):
+    candidate_id: str
+    name: str
+    current_role: Optional[str] = None
+    status: str
+    fit_score: int
+    stored_fit_score: Optional[int] = None
+    text_similarity: Optional[float] = None
+
+
+@api_router.get("/jobs/{job_id}/fit-ranking", response_model=List[CandidateFitRanking])
+async def rank_job_candidates(
+    job_id: str,
+    show_rejected: bool = False,
+    with_similarity: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Rank all candidates of a job by deterministic fit score, best first.
+    With with_similarity=true, CV/job description TF-IDF similarity is part of the score.
+    """
+    job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    # Tenant check for client users
+    if current_user["role"] == "client_user":
+        if job["client_id"] != current_user["client_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        has_permission = await check_permission(current_user, "can_view_candidates", current_user.get("client_id"))
+        if not has_permission:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permission denied: can_view_candidates required"
+            )
+    
+    query = {"job_id": job_id}
+    if not show_rejected:
+        query["status"] = {"$ne": "REJECT"}
+    
+    projection = {"_id": 0, "candidate_id": 1, "name": 1, "current_role": 1, "status": 1,
+                  "skills": 1, "skill_ids": 1, "experience": 1, "ai_story.fit_score": 1}
+    if with_similarity:
+        projection.update(text_similarity.CANDIDATE_TEXT_FIELDS)
+    candidates = await db.candidates.find(query, projection).to_list(None)
+    
+    similarity = None
+    similarities = {}
+    if with_similarity:
+        similarity = await text_similarity.job_similarities(db, job, candidates)
+        similarities = {c["candidate_id"]: round(float(score), 4) for c, score in zip(candidates, similarity)}
+    
+    return [
+        CandidateFitRanking(
+            candidate_id=cand["candidate_id"],
+            name=cand["name"],
+            current_role=cand.get("current_role"),
+            status=cand["status"],
+            fit_score=score,
+            stored_fit_score=(cand.get("ai_story") or {}).get("fit_score"),
+            text_similarity=similarities.get(cand["candidate_id"])
+        )
+        for cand, score in rank_candidates(job, candidates, similarity)
+    ]
+
 @api_router.get("/candidates/{candidate_id}", response_model=CandidateResponse)
 async def get_candidate(
     candidate_id: str,
@@ -3856,6 +3998,59 @@ async def get_candidate(
     )
 
 
+class RecommendedJob(BaseModel):
+    job_id: str
+    client_id: str
+    company_name: Optional[str] = None
+    title: str
+    location: str
+    required_skills: List[str]
+    fit_score: int
+    shared_skills: int
+
+
+@api_router.get("/candidates/{candidate_id}/recommended-jobs", response_model=List[RecommendedJob])
+async def get_recommended_jobs(
+    candidate_id: str,
+    limit: int = 10,
+    current_user: dict = Depends(require_admin_or_recruiter)
+):
+    """Other open jobs the candidate fits, found through the job skill index"""
+    candidate = await db.candidates.find_one(
+        {"candidate_id": candidate_id},
+        {"_id": 0, "candidate_id": 1, "job_id": 1, "skills": 1, "skill_ids": 1,
+         "experience": 1, "current_role": 1}
+    )
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    limit = max(1, min(limit, 50))
+    recommendations = await job_recommendations.recommend_jobs(db, candidate, limit=limit)
+    
+    client_ids = list({r["job"]["client_id"] for r in recommendations})
+    clients = await db.clients.find(
+        {"client_id": {"$in": client_ids}}, {"_id": 0, "client_id": 1, "company_name": 1}
+    ).to_list(None)
+    company_names = {c["client_id"]: c.get("company_name") for c in clients}
+    
+    return [
+        RecommendedJob(
+            job_id=r["job"]["job_id"],
+            client_id=r["job"]["client_id"],
+            company_name=company_names.get(r["job"]["client_id"]),
+            title=r["job"]["title"],
+            location=r["job"]["location"],
+            required_skills=r["job"].get("required_skills", []),
+            fit_score=r["fit_score"],
+            shared_skills=r["shared_skills"]
+        )
+        for r in recommendations
+    ]
+
+
 @api_router.delete("/candidates/{candidate_id}")
 async def delete_candidate(
     candidate_id: str,
@@ -3937,7 +4132,11 @@ async def get_candidate_cv(
     current_user: dict = Depends(get_current_user)
 ):
     """Get candidate CV (redacted or full)"""
-    candidate = await db.candidates.find_one({"candidate_id": candidate_id}, {"_id": 0})
+    # The CV text itself is loaded only when it is needed
+    candidate = await db.candidates.find_one(
+        {"candidate_id": candidate_id},
+        {"_id": 0, "candidate_id": 1, "job_id": 1, "cv_text_id": 1}
+    )
     if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -3968,7 +4167,11 @@ async def get_candidate_cv(
         if not await check_permission(current_user, "can_view_full_cv", current_user.get("client_id")):
             redacted = True
     
-    cv_text = candidate.get("cv_text_redacted") if redacted else candidate.get("cv_text_original")
+    if redacted:
+        cv_text = await redaction.get_redacted_cv(db, candidate)
+    else:
+        full = await db.candidates.find_one({"candidate_id": candidate_id}, {"_id": 0, "cv_text_original": 1})
+        cv_text = (full or {}).get("cv_text_original")
     
     return {
         "candidate_id": candidate_id,
@@ -4030,6 +4233,12 @@ async def update_candidate(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No update data provided"
         )
+    if update_dict.get("skills") is not None:
+        update_dict["skill_ids"] = skill_ids(update_dict["skills"])
+    update_dict.update(candidate_identity.contact_key_updates(update_dict))
+    # Without CV text the similarity vector is built from role, skills and summary
+    if not candidate.get("cv_text_original") and {"current_role", "skills", "summary"} & set(update_dict):
+        update_dict["text_vector"] = await text_similarity.candidate_vector_document(db, {**candidate, **update_dict})
     
     await db.candidates.update_one(
         {"candidate_id": candidate_id},
@@ -4121,29 +4330,76 @@ async def regenerate_candidate_story(
     )
 
 
-# ============ REVIEW WORKFLOW (Phase 5) ============
+# ============ SKILL TAXONOMY ============
 
-@api_router.post("/candidates/{candidate_id}/review", response_model=ReviewResponse)
-async def create_review(
-    candidate_id: str,
-    review_data: ReviewCreate,
+@api_router.get("/skills/lookup")
+async def lookup_skill(
+    name: str,
     current_user: dict = Depends(get_current_user)
 ):
-    """Create a review entry for a candidate"""
-    # Verify candidate exists and user has access
-    candidate = await db.candidates.find_one({"candidate_id": candidate_id}, {"_id": 0})
-    if not candidate:
+    """Canonical form, stable ID and known aliases of a skill"""
+    result = skill_taxonomy.lookup_skill(name)
+    if not result:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Candidate not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Skill name is required"
         )
-    
-    # Verify job access (tenant check for client users)
-    job = await db.jobs.find_one({"job_id": candidate["job_id"]}, {"_id": 0})
-    if current_user["role"] == "client_user":
-        if job["client_id"] != current_user["client_id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
+    return result
+
+
+@api_router.get("/skills/candidates")
+async def find_candidates_by_skill(
+    skill: str,
+    job_id: Optional[str] = None,
+    limit: int = 100,
+    current_user: dict = Depends(require_admin_or_recruiter)
+):
+    """Candidates with a skill (any alias), served by the skill_ids index"""
+    if not skill.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Skill name is required"
+        )
+    
+    limit = max(1, min(limit, 500))
+    query = {"skill_ids": skill_taxonomy.skill_id(skill)}
+    if job_id:
+        query["job_id"] = job_id
+    
+    candidates = await db.candidates.find(
+        query,
+        {"_id": 0, "candidate_id": 1, "job_id": 1, "name": 1, "current_role": 1, "status": 1, "skills": 1}
+    ).limit(limit).to_list(limit)
+    
+    return {
+        "skill": skill_taxonomy.lookup_skill(skill),
+        "candidates": candidates
+    }
+
+
+# ============ REVIEW WORKFLOW (Phase 5) ============
+
+@api_router.post("/candidates/{candidate_id}/review", response_model=ReviewResponse)
+async def create_review(
+    candidate_id: str,
+    review_data: ReviewCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Create a review entry for a candidate"""
+    # Verify candidate exists and user has access
+    candidate = await db.candidates.find_one({"candidate_id": candidate_id}, {"_id": 0})
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    # Verify job access (tenant check for client users)
+    job = await db.jobs.find_one({"job_id": candidate["job_id"]}, {"_id": 0})
+    if current_user["role"] == "client_user":
+        if job["client_id"] != current_user["client_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
             )
     
@@ -4229,15 +4485,6 @@ async def list_candidate_reviews(
 
 # ============ STORY VIEW & PDF EXPORT (Phase 6) ============
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.pdfgen import canvas
-from io import BytesIO
-
 @api_router.post("/candidates/{candidate_id}/story/regenerate")
 async def regenerate_candidate_story_endpoint(
     candidate_id: str,
@@ -4311,8 +4558,11 @@ async def export_candidate_story_pdf(
     current_user: dict = Depends(get_current_user)
 ):
     """Export candidate story as PDF"""
-    # Get candidate
-    candidate = await db.candidates.find_one({"candidate_id": candidate_id}, {"_id": 0})
+    # Get candidate (only the fields the PDF shows)
+    candidate = await db.candidates.find_one(
+        {"candidate_id": candidate_id},
+        {"_id": 0, "job_id": 1, **{field: 1 for field in story_pdf.STORY_FIELDS}}
+    )
     if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -4328,152 +4578,87 @@ async def export_candidate_story_pdf(
                 detail="Access denied"
             )
     
-    # Generate PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=25, bottomMargin=25, leftMargin=25, rightMargin=25)
-    
-    # Container for PDF elements
-    story_elements = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=8,
-        alignment=TA_CENTER,
-        fontName='Times-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=16,
-        textColor=colors.HexColor('#7F8C8D'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
+    # Served from cache unless the story content changed; rendered off the event loop otherwise
+    pdf = await story_pdf.get_story_pdf(candidate)
     
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#D4AF37'),
-        spaceAfter=12,
-        spaceBefore=16,
-        fontName='Times-Bold',
-        borderWidth=1,
-        borderColor=colors.HexColor('#D4AF37'),
-        borderPadding=8
+    # Return PDF as response
+    from fastapi.responses import Response
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=candidate_story_{candidate['name'].replace(' ', '_')}_{candidate_id}.pdf"
+        }
     )
+
+
+@api_router.get("/jobs/{job_id}/story-export")
+async def export_job_shortlist_pdfs(
+    job_id: str,
+    candidate_ids: Optional[str] = None,
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export story PDFs of a job's shortlist as one ZIP
+
+    `candidate_ids` is a comma-separated selection; without it the top `limit`
+    non-rejected candidates by fit score are exported.
+    """
+    job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
     
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#2C3E50'),
-        spaceAfter=8,
-        fontName='Helvetica',
-        leading=16
-    )
+    # Tenant check for client users
+    if current_user["role"] == "client_user":
+        if job["client_id"] != current_user["client_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        has_permission = await check_permission(current_user, "can_view_candidates", current_user.get("client_id"))
+        if not has_permission:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permission denied: can_view_candidates required"
+            )
     
-    # Hero section
-    story_elements.append(Paragraph(candidate["name"], title_style))
-    if candidate.get("current_role"):
-        story_elements.append(Paragraph(candidate["current_role"], subtitle_style))
-    
-    # Status and fit score
-    ai_story = candidate.get("ai_story", {})
-    fit_score = ai_story.get("fit_score", 0) if ai_story else 0
-    status_text = f"Status: {candidate['status']} | Fit Score: {fit_score}%"
-    story_elements.append(Paragraph(status_text, body_style))
-    story_elements.append(Spacer(1, 0.3*inch))
-    
-    # Professional Summary
-    if ai_story and ai_story.get("summary"):
-        story_elements.append(Paragraph("Professional Summary", heading_style))
-        story_elements.append(Paragraph(ai_story["summary"], body_style))
-        story_elements.append(Spacer(1, 0.2*inch))
-    
-    # Skills
-    if candidate.get("skills"):
-        story_elements.append(Paragraph("Core Skills", heading_style))
-        skills_text = " • ".join(candidate["skills"][:10])
-        story_elements.append(Paragraph(skills_text, body_style))
-        story_elements.append(Spacer(1, 0.2*inch))
-    
-    # Experience
-    if candidate.get("experience"):
-        story_elements.append(Paragraph("Career Timeline", heading_style))
-        for exp in candidate["experience"][:5]:
-            role_title = exp.get("role", "Position")
-            company = exp.get("company", "")
-            duration = exp.get("duration", "")
-            exp_text = f"<b>{role_title}</b>"
-            if company:
-                exp_text += f" at {company}"
-            if duration:
-                exp_text += f" ({duration})"
-            story_elements.append(Paragraph(exp_text, body_style))
-            
-            if exp.get("achievements") and isinstance(exp["achievements"], list):
-                for achievement in exp["achievements"][:3]:
-                    story_elements.append(Paragraph(f"  • {achievement}", body_style))
-            story_elements.append(Spacer(1, 0.1*inch))
-    
-    # Highlights
-    if ai_story and ai_story.get("highlights"):
-        story_elements.append(Paragraph("Key Achievements", heading_style))
-        for highlight in ai_story["highlights"][:5]:
-            story_elements.append(Paragraph(f"✓ {highlight}", body_style))
-        story_elements.append(Spacer(1, 0.2*inch))
-    
-    # Education
-    if candidate.get("education"):
-        story_elements.append(Paragraph("Education", heading_style))
-        for edu in candidate["education"][:3]:
-            degree = edu.get("degree", "")
-            institution = edu.get("institution", "")
-            year = edu.get("year", "")
-            edu_text = f"{degree}"
-            if institution:
-                edu_text += f" - {institution}"
-            if year:
-                edu_text += f" ({year})"
-            story_elements.append(Paragraph(edu_text, body_style))
-        story_elements.append(Spacer(1, 0.3*inch))
-    
-    # Footer
-    footer_text = f"Generated by Arbeit Talent Platform – {datetime.now().strftime('%B %d, %Y')} – Candidate ID: {candidate_id}"
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#95A5A6'),
-        alignment=TA_CENTER,
-        fontName='Helvetica-Oblique'
-    )
-    story_elements.append(Spacer(1, 0.5*inch))
-    story_elements.append(Paragraph(footer_text, footer_style))
+    projection = {"_id": 0, **{field: 1 for field in story_pdf.STORY_FIELDS}}
+    if candidate_ids:
+        selected = list(dict.fromkeys(cid.strip() for cid in candidate_ids.split(",") if cid.strip()))
+        if len(selected) > story_pdf.EXPORT_MAX_CANDIDATES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {story_pdf.EXPORT_MAX_CANDIDATES} candidates can be exported at once"
+            )
+        found = await db.candidates.find(
+            {"job_id": job_id, "candidate_id": {"$in": selected}}, projection
+        ).to_list(len(selected))
+        by_id = {c["candidate_id"]: c for c in found}
+        candidates = [by_id[cid] for cid in selected if cid in by_id]
+    else:
+        limit = max(1, min(limit, story_pdf.EXPORT_MAX_CANDIDATES))
+        candidates = await db.candidates.find(
+            {"job_id": job_id, "status": {"$nin": ["REJECT", "REJECTED"]}}, projection
+        ).sort("ai_story.fit_score", -1).limit(limit).to_list(limit)
     
-    # Build PDF
-    doc.build(story_elements)
-    buffer.seek(0)
+    if not candidates:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No candidates to export"
+        )
     
-    # Return PDF as response
     from fastapi.responses import StreamingResponse
     return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
+        story_pdf.stream_story_zip(candidates),
+        media_type="application/zip",
         headers={
-            "Content-Disposition": f"attachment; filename=candidate_story_{candidate['name'].replace(' ', '_')}_{candidate_id}.pdf"
+            "Content-Disposition": f"attachment; filename=shortlist_{job_id}.zip"
         }
     )
 
-
 # ============ HEALTH CHECK ============
 
 @api_router.get("/")
@@ -4510,6 +4695,12 @@ async def replace_candidate_cv(
             detail="Job not found"
         )
     
+    if job_deletion.is_deleting(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is being deleted"
+        )
+    
     if current_user["role"] == "client_user":
         if job["client_id"] != current_user["client_id"]:
             raise HTTPException(
@@ -4603,6 +4794,10 @@ async def replace_candidate_cv(
     
     await db.candidate_cv_versions.insert_one(version_doc)
     
+    # Only this candidate's similarity vector changes; no refit needed
+    cv_text_fields = redaction.cv_text_fields(cv_text)
+    text_vector = await text_similarity.candidate_vector_document(db, cv_text_fields)
+    
     # Update main candidate document with new data
     await db.candidates.update_one(
         {"candidate_id": candidate_id},
@@ -4612,17 +4807,24 @@ async def replace_candidate_cv(
                 "current_role": parsed_resume.current_role or candidate.get("current_role"),
                 "email": parsed_resume.email or candidate.get("email"),
                 "phone": parsed_resume.phone or candidate.get("phone"),
+                **identity_keys(
+                    parsed_resume.email or candidate.get("email"),
+                    parsed_resume.phone or candidate.get("phone")
+                ),
                 "linkedin": parsed_resume.linkedin or candidate.get("linkedin"),
                 "skills": parsed_resume.skills or candidate.get("skills", []),
+                "skill_ids": skill_ids(parsed_resume.skills or candidate.get("skills", [])),
                 "experience": parsed_resume.experience or candidate.get("experience", []),
                 "education": parsed_resume.education or candidate.get("education", []),
                 "summary": parsed_resume.summary or candidate.get("summary"),
                 "cv_file_url": cv_url,
-                "cv_text_original": cv_text,
-                "cv_text_redacted": redact_text(cv_text),
+                **cv_text_fields,
+                "text_vector": text_vector,
+                **candidate_dedup.dedup_fields(cv_text),
                 "ai_story": ai_story.model_dump(),
                 "story_last_generated": datetime.now(timezone.utc).isoformat()
-            }
+            },
+            "$unset": {"cv_text_redacted": ""}
         }
     )
     
@@ -5440,9 +5642,31 @@ async def export_access_matrix_csv(
 
 # ============ INTERVIEW ORCHESTRATION ENDPOINTS ============
 
+async def book_slot_or_raise(interview: dict, slot_id: str, confirmed: bool = True, now: Optional[str] = None) -> dict:
+    """Book a slot with a single conditional update; the database decides concurrent bookings"""
+    try:
+        slot = await interview_booking.book_slot(db, interview, slot_id, confirmed, now)
+    except interview_booking.BookingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    if confirmed:
+        # The conditional update only matches a bookable interview, so this is the transition it made
+        await pipeline_counters.record_transition(
+            db, interview["client_id"], interview_booking.BOOKABLE_STATUS, interview_booking.CONFIRMED_STATUS
+        )
+        try:
+            await interview_reminders.schedule_reminders(
+                db, interview["interview_id"], interview["candidate_id"], slot["start_time"]
+            )
+        except Exception as e:
+            logger.error(f"Failed to schedule reminders for {interview['interview_id']}: {str(e)}")
+    return slot
+
+
 @api_router.post("/interviews", response_model=InterviewResponse)
 async def create_interview(
     interview_data: InterviewCreate,
+    on_conflict: Literal["warn", "reject", "allow"] = "warn",
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new interview with proposed time slots (Client/Recruiter action)"""
@@ -5455,6 +5679,12 @@ async def create_interview(
             detail="Job not found"
         )
     
+    if job_deletion.is_deleting(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is being deleted"
+        )
+    
     # Verify candidate exists
     candidate = await db.candidates.find_one({"candidate_id": interview_data.candidate_id}, {"_id": 0})
     if not candidate:
@@ -5478,6 +5708,18 @@ async def create_interview(
                 detail="Access denied"
             )
     
+    # Check proposed slots against interviews already scheduled for this client or candidate
+    slot_conflicts = []
+    if on_conflict != "allow":
+        slot_conflicts = await interview_availability.find_slot_conflicts(
+            db, job["client_id"], interview_data.job_id, interview_data.candidate_id, interview_data.proposed_slots
+        )
+        if slot_conflicts and on_conflict == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Proposed slots overlap scheduled interviews", "conflicts": slot_conflicts}
+            )
+    
     # Get client info
     client = await db.clients.find_one({"client_id": job["client_id"]}, {"_id": 0})
     
@@ -5528,6 +5770,7 @@ async def create_interview(
     }
     
     await db.interviews.insert_one(interview_doc)
+    await pipeline_counters.record_created(db, interview_doc["client_id"], interview_doc["interview_status"])
     
     # Log audit event
     await log_audit_event(
@@ -5574,10 +5817,54 @@ async def create_interview(
         updated_at=now,
         created_by=current_user["email"],
         interview_round=interview_data.interview_round,
-        round_name=interview_data.round_name or f"Round {interview_data.interview_round}"
+        round_name=interview_data.round_name or f"Round {interview_data.interview_round}",
+        slot_conflicts=slot_conflicts
     )
 
 
+@api_router.get("/clients/{client_id}/free-slots")
+async def suggest_client_free_slots(
+    client_id: str,
+    start_date: date,
+    end_date: date,
+    duration_minutes: int = 60,
+    time_zone: str = "Asia/Kolkata",
+    work_start_hour: int = 9,
+    work_end_hour: int = 18,
+    step_minutes: int = 30,
+    limit: int = 20,
+    include_weekends: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Suggest interview slots in working hours that avoid the client's scheduled interviews"""
+    if current_user["role"] == "client_user" and current_user.get("client_id") != client_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    if end_date < start_date or (end_date - start_date).days >= interview_availability.MAX_SUGGESTION_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be 1-{interview_availability.MAX_SUGGESTION_DAYS} days"
+        )
+    if not (0 <= work_start_hour < work_end_hour <= 23) or not (15 <= duration_minutes <= 240) or step_minutes < 5:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid working hours, duration or step"
+        )
+    try:
+        slots = await interview_availability.suggest_free_slots(
+            db, client_id, start_date, end_date, duration_minutes, time_zone,
+            work_start_hour, work_end_hour, step_minutes, max(1, min(limit, 100)), include_weekends
+        )
+    except ZoneInfoNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown time zone: {time_zone}"
+        )
+    return {"client_id": client_id, "time_zone": time_zone, "duration_minutes": duration_minutes, "slots": slots}
+
+
 @api_router.get("/interviews", response_model=List[InterviewListItem])
 async def list_interviews(
     job_id: Optional[str] = None,
@@ -5704,10 +5991,8 @@ async def update_interview(
     update_dict = update_data.model_dump(exclude_unset=True)
     update_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
-        {"$set": update_dict}
-    )
+    # Status changes must reach the pipeline counters
+    await pipeline_counters.update_interview_fields(db, interview_id, update_dict)
     
     # Log audit event
     await log_audit_event(
@@ -5740,56 +6025,8 @@ async def book_interview_slot(
             detail="Interview not found"
         )
     
-    # Verify interview is in correct status
-    if interview["interview_status"] != "Awaiting Candidate Confirmation":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Interview is not awaiting confirmation (current status: {interview['interview_status']})"
-        )
-    
-    # Find the selected slot
-    selected_slot = None
-    for slot in interview.get("proposed_slots", []):
-        if slot["slot_id"] == slot_selection.slot_id:
-            selected_slot = slot
-            break
-    
-    if not selected_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Slot not found"
-        )
-    
-    if not selected_slot.get("is_available", True):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Slot is no longer available"
-        )
-    
-    now = datetime.now(timezone.utc).isoformat()
-    
-    # Update interview with selected slot
-    update_data = {
-        "selected_slot_id": slot_selection.slot_id,
-        "scheduled_start_time": selected_slot["start_time"],
-        "scheduled_end_time": selected_slot["end_time"],
-        "interview_status": "Confirmed" if slot_selection.confirmed else "Awaiting Candidate Confirmation",
-        "candidate_confirmation_timestamp": now if slot_selection.confirmed else None,
-        "updated_at": now
-    }
-    
-    # Mark selected slot as unavailable
-    updated_slots = []
-    for slot in interview.get("proposed_slots", []):
-        if slot["slot_id"] == slot_selection.slot_id:
-            slot["is_available"] = False
-        updated_slots.append(slot)
-    update_data["proposed_slots"] = updated_slots
-    
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
-        {"$set": update_data}
-    )
+    # Book atomically; concurrent bookings of the slot cannot both succeed
+    selected_slot = await book_slot_or_raise(interview, slot_selection.slot_id, confirmed=slot_selection.confirmed)
     
     # Log audit event
     await log_audit_event(
@@ -5928,8 +6165,8 @@ async def send_interview_invite(
         update_data["calendar_event_id"] = calendar_result.get("event_id", "")
         update_data["calendar_link"] = calendar_result.get("calendar_link", "")
     
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": update_data}
     )
     
@@ -5982,13 +6219,14 @@ async def mark_interview_completed(
     
     now = datetime.now(timezone.utc).isoformat()
     
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": {
             "interview_status": "Completed",
             "updated_at": now
         }}
     )
+    await no_show_risk.discard_interview_risk(db, interview_id)
     
     # Log audit event
     await log_audit_event(
@@ -6030,8 +6268,8 @@ async def mark_interview_no_show(
     # Increment no-show count for candidate
     current_no_show_count = interview.get("no_show_count", 0) + 1
     
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": {
             "interview_status": "No Show",
             "no_show_flag": True,
@@ -6039,6 +6277,7 @@ async def mark_interview_no_show(
             "updated_at": now
         }}
     )
+    await no_show_risk.discard_interview_risk(db, interview_id)
     
     # Update candidate's no-show count in candidates collection
     await db.candidates.update_one(
@@ -6084,13 +6323,14 @@ async def cancel_interview(
     
     now = datetime.now(timezone.utc).isoformat()
     
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": {
             "interview_status": "Cancelled",
             "updated_at": now
         }}
     )
+    await no_show_risk.discard_interview_risk(db, interview_id)
     
     # Log audit event
     await log_audit_event(
@@ -6163,8 +6403,8 @@ async def move_to_next_round(
         "passed_at": now
     }
     
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": update_data}
     )
     
@@ -6241,8 +6481,8 @@ async def reject_after_interview(
     now = datetime.now(timezone.utc).isoformat()
     
     # Update interview as Failed
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": {
             "interview_status": "Failed",
             "feedback": request.feedback,
@@ -6311,8 +6551,8 @@ async def initiate_hiring(
     current_round = interview.get("interview_round", 1)
     
     # Update interview status
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
+    await pipeline_counters.update_interview_status(
+        db, interview_id,
         {"$set": {
             "interview_status": "Passed",
             "feedback": request.feedback,
@@ -6430,54 +6670,32 @@ async def get_interview_pipeline_stats(
     current_user: dict = Depends(get_current_user)
 ):
     """Get interview pipeline statistics for dashboard"""
-    query = {}
-    
     # Tenant filtering
     if current_user["role"] == "client_user":
-        query["client_id"] = current_user["client_id"]
-    elif client_id:
-        query["client_id"] = client_id
-    
-    # Get counts by status
-    pipeline = [
-        {"$match": query},
-        {"$group": {
-            "_id": "$interview_status",
-            "count": {"$sum": 1}
-        }}
-    ]
-    
-    status_counts = await db.interviews.aggregate(pipeline).to_list(100)
-    
-    # Process results
-    stats = {
-        "total_interviews": 0,
-        "awaiting_confirmation": 0,
-        "confirmed": 0,
-        "scheduled": 0,
-        "completed": 0,
-        "no_shows": 0,
-        "cancelled": 0
-    }
+        client_id = current_user["client_id"]
     
-    status_mapping = {
-        "Awaiting Candidate Confirmation": "awaiting_confirmation",
-        "Confirmed": "confirmed",
-        "Scheduled": "scheduled",
-        "Completed": "completed",
-        "No Show": "no_shows",
-        "Cancelled": "cancelled"
-    }
+    # Counters are maintained on every status transition; one document read
+    stats = await pipeline_counters.get_counts(db, client_id)
     
-    for item in status_counts:
-        status_key = status_mapping.get(item["_id"])
-        if status_key:
-            stats[status_key] = item["count"]
-        stats["total_interviews"] += item["count"]
+    # Read from the materialized risk scores, not computed per request
+    stats["at_risk"] = await no_show_risk.count_at_risk(db, client_id=client_id)
     
     return InterviewPipelineStats(**stats)
 
 
+@api_router.get("/interviews/stats/at-risk", response_model=List[AtRiskInterviewItem])
+async def get_at_risk_interviews(
+    client_id: Optional[str] = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_user)
+):
+    """Upcoming interviews most likely to be no-shows, from the last risk refresh"""
+    if current_user["role"] == "client_user":
+        client_id = current_user["client_id"]
+    limit = max(1, min(limit, 200))
+    return await no_show_risk.list_at_risk(db, client_id=client_id, limit=limit)
+
+
 @api_router.get("/candidates/{candidate_id}/interviews", response_model=List[InterviewListItem])
 async def get_candidate_interviews(
     candidate_id: str,
@@ -6594,56 +6812,8 @@ async def public_book_slot(interview_id: str, slot_id: str, token: str):
             detail="Interview not found"
         )
     
-    # Verify interview is in correct status
-    if interview["interview_status"] != "Awaiting Candidate Confirmation":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Interview is not awaiting confirmation (current status: {interview['interview_status']})"
-        )
-    
-    # Find the selected slot
-    selected_slot = None
-    for slot in interview.get("proposed_slots", []):
-        if slot["slot_id"] == slot_id:
-            selected_slot = slot
-            break
-    
-    if not selected_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Slot not found"
-        )
-    
-    if not selected_slot.get("is_available", True):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Slot is no longer available"
-        )
-    
-    now = datetime.now(timezone.utc).isoformat()
-    
-    # Update interview with selected slot
-    update_data = {
-        "selected_slot_id": slot_id,
-        "scheduled_start_time": selected_slot["start_time"],
-        "scheduled_end_time": selected_slot["end_time"],
-        "interview_status": "Confirmed",
-        "candidate_confirmation_timestamp": now,
-        "updated_at": now
-    }
-    
-    # Mark selected slot as unavailable
-    updated_slots = []
-    for slot in interview.get("proposed_slots", []):
-        if slot["slot_id"] == slot_id:
-            slot["is_available"] = False
-        updated_slots.append(slot)
-    update_data["proposed_slots"] = updated_slots
-    
-    await db.interviews.update_one(
-        {"interview_id": interview_id},
-        {"$set": update_data}
-    )
+    # Book atomically; concurrent bookings of the slot cannot both succeed
+    selected_slot = await book_slot_or_raise(interview, slot_id, confirmed=True)
     
     # Log audit event (without user context since this is public)
     await log_audit_event(
@@ -6664,6 +6834,37 @@ async def public_book_slot(interview_id: str, slot_id: str, token: str):
     return {"message": "Interview slot confirmed", "interview_id": interview_id}
 
 
+@api_router.post("/public/interviews/{interview_id}/reminder-response")
+async def public_reminder_response(interview_id: str, token: str, request: ReminderResponseRequest):
+    """Public endpoint for candidates to answer an interview reminder"""
+    
+    if not verify_booking_token(interview_id, token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired booking link"
+        )
+    
+    interview = await db.interviews.find_one(
+        {"interview_id": interview_id}, {"_id": 0, "interview_id": 1, "candidate_id": 1}
+    )
+    if not interview:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Interview not found"
+        )
+    
+    response = ReminderResponse(
+        interview_id=interview_id,
+        candidate_id=interview["candidate_id"],
+        response_type=request.response_type,
+        response_text=request.response_text,
+        response_timestamp=datetime.now(timezone.utc)
+    )
+    await db.reminder_responses.insert_one(response.model_dump())
+    
+    return {"message": "Response recorded", "interview_id": interview_id}
+
+
 @api_router.get("/interviews/{interview_id}/booking-link")
 async def get_booking_link(
     interview_id: str,
@@ -6698,6 +6899,46 @@ async def get_booking_link(
     }
 
 
+# ============ HIRING ANALYTICS ============
+
+@api_router.get("/analytics/hiring-funnel")
+async def get_hiring_funnel(
+    period: str,
+    client_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Funnel conversion, time in stage and recruiter throughput for a client or job over a period"""
+    if current_user["role"] == "client_user":
+        client_id = current_user["client_id"]
+    if job_id:
+        job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0, "client_id": 1})
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        if client_id and job["client_id"] != client_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        client_id = job["client_id"]
+    if not client_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="client_id or job_id is required"
+        )
+    
+    try:
+        return await hiring_analytics.get_hiring_funnel(db, client_id, period, job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{str(e)} (expected YYYY, YYYY-Qn or YYYY-MM)"
+        )
+
+
 # ============ NOTIFICATION ENDPOINTS ============
 
 class NotificationResponse(BaseModel):
@@ -6720,41 +6961,52 @@ async def get_notifications(
     current_user: dict = Depends(get_current_user)
 ):
     """Get notifications for the current user"""
-    query = {
-        "$or": [
-            {"for_roles": current_user["role"]},
-            {"for_users": current_user["email"]}
-        ]
-    }
-    
-    # For client users, also filter by client_id
-    if current_user["role"] == "client_user":
-        query["$or"].append({"client_id": current_user.get("client_id")})
-    
-    notifications = await db.notifications.find(
-        query,
-        {"_id": 0}
-    ).sort("created_at", -1).limit(limit).to_list(limit)
+    entries = await notification_inbox.list_inbox(
+        db, current_user["email"], unread_only=unread_only, limit=limit
+    )
     
-    result = []
-    for notif in notifications:
-        is_read = current_user["email"] in notif.get("read_by", [])
-        if unread_only and is_read:
-            continue
-        result.append(NotificationResponse(
-            notification_id=notif["notification_id"],
-            type=notif["type"],
-            title=notif["title"],
-            message=notif["message"],
-            entity_type=notif.get("entity_type"),
-            entity_id=notif.get("entity_id"),
-            client_id=notif.get("client_id"),
-            created_at=notif["created_at"],
-            created_by=notif["created_by"],
-            is_read=is_read
-        ))
+    return [
+        NotificationResponse(
+            notification_id=entry["notification_id"],
+            type=entry["type"],
+            title=entry["title"],
+            message=entry["message"],
+            entity_type=entry.get("entity_type"),
+            entity_id=entry.get("entity_id"),
+            client_id=entry.get("client_id"),
+            created_at=entry["created_at"],
+            created_by=entry["created_by"],
+            is_read=entry["is_read"]
+        )
+        for entry in entries
+    ]
+
+
+@api_router.get("/notifications/stream")
+async def stream_notifications(request: Request, token: str):
+    """
+    Server-Sent Events stream of the current user's notifications.
+    EventSource cannot send headers, so the JWT is passed as ?token=.
+    """
+    payload = decode_token(token)
+    user = await db.users.find_one({"email": payload.get("email")}, {"_id": 0, "email": 1})
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
     
-    return result
+    unread_count = await notification_inbox.count_unread(db, user["email"])
+    from fastapi.responses import StreamingResponse
+    return StreamingResponse(
+        notification_broker.stream(
+            user["email"],
+            initial_events=[notification_stream.unread_count_event(unread_count)],
+            is_disconnected=request.is_disconnected
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @api_router.get("/notifications/unread-count")
@@ -6762,18 +7014,7 @@ async def get_unread_notification_count(
     current_user: dict = Depends(get_current_user)
 ):
     """Get count of unread notifications"""
-    query = {
-        "$or": [
-            {"for_roles": current_user["role"]},
-            {"for_users": current_user["email"]}
-        ],
-        "read_by": {"$ne": current_user["email"]}
-    }
-    
-    if current_user["role"] == "client_user":
-        query["$or"].append({"client_id": current_user.get("client_id")})
-    
-    count = await db.notifications.count_documents(query)
+    count = await notification_inbox.count_unread(db, current_user["email"])
     return {"unread_count": count}
 
 
@@ -6783,17 +7024,18 @@ async def mark_notification_read(
     current_user: dict = Depends(get_current_user)
 ):
     """Mark a notification as read"""
-    result = await db.notifications.update_one(
-        {"notification_id": notification_id},
-        {"$addToSet": {"read_by": current_user["email"]}}
-    )
+    changed = await notification_inbox.mark_read(db, current_user["email"], notification_id)
     
-    if result.modified_count == 0:
+    if changed is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
     
+    # Only a real transition lowers the bell count; repeat clicks and other tabs must not
+    if changed:
+        notification_broker.publish(current_user["email"], notification_stream.read_event(notification_id))
+    
     return {"message": "Notification marked as read"}
 
 
@@ -6802,19 +7044,302 @@ async def mark_all_notifications_read(
     current_user: dict = Depends(get_current_user)
 ):
     """Mark all notifications as read for the current user"""
-    query = {
-        "$or": [
-            {"for_roles": current_user["role"]},
-            {"for_users": current_user["email"]}
-        ]
-    }
+    modified = await notification_inbox.mark_all_read(db, current_user["email"])
+    notification_broker.publish(current_user["email"], notification_stream.unread_count_event(0))
     
-    result = await db.notifications.update_many(
-        query,
-        {"$addToSet": {"read_by": current_user["email"]}}
+    return {"message": f"Marked {modified} notifications as read"}
+
+
+# ============ MAINTENANCE ENDPOINTS ============
+
+async def require_admin(current_user: dict = Depends(get_current_user)):
+    """Dependency to require the admin role"""
+    if current_user["role"] != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+@api_router.post("/admin/maintenance/notification-inbox/backfill")
+async def backfill_notification_inbox(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Fan out notifications created before the per-user inbox existed"""
+    task = await background_jobs.create_task(db, "notification_inbox_backfill", current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        notification_inbox.backfill_inbox, db, recipient_directory
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/skill-ids/backfill")
+async def backfill_skill_ids(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Compute canonical skill IDs for existing candidates and jobs"""
+    task = await background_jobs.create_task(db, "skill_ids_backfill", current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        skill_taxonomy.backfill_skill_ids, db
     )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/job-skill-index/rebuild")
+async def rebuild_job_skill_index(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Rebuild the skill -> open job index used for job recommendations"""
+    task = await background_jobs.create_task(db, "job_skill_index_rebuild", current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        job_recommendations.rebuild_job_skill_index, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/similarity-model/refit")
+async def refit_similarity_model(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Refit TF-IDF weights over all job descriptions and CVs and re-vectorize them"""
+    task = await background_jobs.create_task(db, text_similarity.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        text_similarity.refit_model, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/candidate-minhash/backfill")
+async def backfill_candidate_minhash(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Build duplicate-detection signatures for existing candidates"""
+    task = await background_jobs.create_task(db, candidate_dedup.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        candidate_dedup.backfill_signatures, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/identity-keys/backfill")
+async def backfill_identity_keys(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Compute normalized email/phone keys where missing and re-run the identity key migration"""
+    task = await background_jobs.create_task(db, candidate_identity.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        candidate_identity.migrate_identity_keys, db, force=True
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+class MergePortalUsersRequest(BaseModel):
+    """Merge the portal accounts sharing an email into one"""
+    email: str
+    keep_candidate_portal_id: Optional[str] = None  # Defaults to the oldest account
+
+
+@api_router.get("/admin/maintenance/portal-email-conflicts")
+async def list_portal_email_conflicts(current_user: dict = Depends(require_admin)):
+    """Portal accounts whose emails differ only in case, found by the identity key migration"""
+    return await db.portal_email_conflicts.find({}, {"_id": 0}).sort("email_key", 1).to_list(1000)
+
+
+@api_router.post("/admin/maintenance/portal-email-conflicts/merge")
+async def merge_portal_email_conflict(
+    request: MergePortalUsersRequest,
+    current_user: dict = Depends(require_admin)
+):
+    """Relink candidates to one account and deactivate the others; retries the unique email index"""
+    try:
+        return await candidate_identity.merge_portal_users(
+            db, request.email, request.keep_candidate_portal_id, current_user["email"]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@api_router.post("/admin/maintenance/redaction-spans/backfill")
+async def backfill_redaction_spans(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Replace stored redacted CV copies with redaction spans"""
+    task = await background_jobs.create_task(db, redaction.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        redaction.backfill_redaction_spans, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/interview-schedule/backfill")
+async def backfill_interview_schedule(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Add indexed datetime schedule fields to interviews booked before they existed"""
+    task = await background_jobs.create_task(db, interview_availability.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        interview_availability.backfill_schedule_fields, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/interview-reminders/schedule")
+async def schedule_interview_reminders(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Schedule reminders for confirmed upcoming interviews that have none"""
+    task = await background_jobs.create_task(db, interview_reminders.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        interview_reminders.schedule_upcoming_reminders, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/no-show-risk/refresh")
+async def refresh_no_show_risk(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Recompute candidate no-show summaries and upcoming interview risk scores"""
+    task = await background_jobs.create_task(db, no_show_risk.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        no_show_risk.refresh_no_show_risk, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/pipeline-counters/rebuild")
+async def rebuild_pipeline_counters(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Recompute the interview pipeline counters from the interviews"""
+    task = await background_jobs.create_task(db, pipeline_counters.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        pipeline_counters.rebuild_counters, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/hiring-events/sync")
+async def sync_hiring_events(
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(require_admin)
+):
+    """Fold new stage transitions into the hiring analytics event table"""
+    task = await background_jobs.create_task(db, hiring_analytics.TASK_TYPE, current_user["email"])
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        hiring_analytics.sync_hiring_events, db
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.post("/admin/maintenance/cv-storage/gc")
+async def collect_cv_storage_garbage(
+    background_tasks: BackgroundTasks,
+    dry_run: bool = True,
+    current_user: dict = Depends(require_admin)
+):
+    """Delete stored CV files no candidate or CV version references (dry run unless dry_run=false)"""
+    task = await background_jobs.create_task(db, storage_gc.TASK_TYPE, current_user["email"], {"dry_run": dry_run})
+    background_tasks.add_task(
+        background_jobs.run_task, db, task["task_id"],
+        storage_gc.collect_garbage, db, cv_storage.get_storage(), dry_run=dry_run
+    )
+    return {"task_id": task["task_id"], "status": task["status"]}
+
+
+@api_router.get("/admin/maintenance/tasks/{task_id}")
+async def get_maintenance_task(
+    task_id: str,
+    current_user: dict = Depends(require_admin)
+):
+    """Get status and progress of a background maintenance task"""
+    task = await background_jobs.get_task(db, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    return task
+
+
+# ============ DATA EXPORTS ============
+
+@api_router.get("/admin/exports/parquet/{dataset}")
+async def export_parquet(
+    dataset: str,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    client_id: Optional[str] = None,
+    partition: Literal["none", "month", "day"] = "none",
+    current_user: dict = Depends(require_admin)
+):
+    """Stream candidates, interviews or audit logs as Parquet (a ZIP of partitions when partitioned)"""
+    from fastapi.responses import StreamingResponse
+    
+    if dataset not in parquet_export.DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown dataset (expected one of: {', '.join(sorted(parquet_export.DATASETS))})"
+        )
+    if from_date and to_date and to_date <= from_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="to_date must be after from_date"
+        )
+    if not parquet_export.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Parquet export requires pyarrow"
+        )
     
-    return {"message": f"Marked {result.modified_count} notifications as read"}
+    await log_audit_event(
+        user_id=current_user.get("user_id", current_user["email"]),
+        user_email=current_user["email"],
+        user_role=current_user["role"],
+        action_type="PARQUET_EXPORT",
+        entity_type=dataset,
+        client_id=client_id,
+        metadata={"from_date": str(from_date) if from_date else None, "to_date": str(to_date) if to_date else None,
+                  "partition": partition}
+    )
+    
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if partition == "none":
+        media_type, filename = "application/vnd.apache.parquet", f"{dataset}_{stamp}.parquet"
+    else:
+        media_type, filename = "application/zip", f"{dataset}_{partition}_{stamp}.zip"
+    return StreamingResponse(
+        parquet_export.stream_parquet(db, dataset, from_date, to_date, client_id, partition),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @api_router.get("/health")
@@ -6841,6 +7366,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Long-running loops started with the app, cancelled on shutdown
+background_loops = []
+
+
+# Each module's indexes are built on their own, so one failure does not skip the rest
+INDEX_BUILDERS = [
+    ("background task", background_jobs.ensure_background_task_indexes),
+    ("notification inbox", notification_inbox.ensure_inbox_indexes),
+    ("notification digest", notification_digest.ensure_digest_indexes),
+    ("fit rescoring", fit_rescoring.ensure_rescoring_indexes),
+    ("skill", skill_taxonomy.ensure_skill_indexes),
+    ("job skill", job_recommendations.ensure_job_skill_indexes),
+    ("similarity", text_similarity.ensure_similarity_indexes),
+    ("candidate dedup", candidate_dedup.ensure_dedup_indexes),
+    ("candidate identity", candidate_identity.ensure_identity_indexes),
+    ("interview availability", interview_availability.ensure_availability_indexes),
+    ("interview reminder", interview_reminders.ensure_reminder_indexes),
+    ("no-show risk", no_show_risk.ensure_risk_indexes),
+    ("pipeline counter", pipeline_counters.ensure_counter_indexes),
+    ("hiring analytics", hiring_analytics.ensure_analytics_indexes),
+    ("parquet export", parquet_export.ensure_export_indexes),
+]
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    for name, ensure in INDEX_BUILDERS:
+        try:
+            await ensure(db)
+        except Exception as e:
+            logger.error(f"Failed to ensure {name} indexes: {str(e)}")
+
+
+@app.on_event("startup")
+async def start_notification_stream():
+    notification_broker.start(db)
+
+
+def periodic_loops() -> list:
+    """Enabled periodic loops; they run on the worker holding the background lease"""
+    loops = []
+    if notification_digest.is_digest_enabled():
+        loops.append(notification_digest.run_digest_loop)
+    if interview_reminders.is_reminders_enabled():
+        loops.append(interview_reminders.run_reminder_loop)
+    if no_show_risk.is_refresh_enabled():
+        loops.append(no_show_risk.run_refresh_loop)
+    if hiring_analytics.is_sync_enabled():
+        loops.append(hiring_analytics.run_sync_loop)
+    if storage_gc.is_gc_enabled():
+        loops.append(storage_gc.run_gc_loop)
+    return loops
+
+
+@app.on_event("startup")
+async def start_periodic_loops():
+    # Without the lease every worker process would run each loop
+    loops = periodic_loops()
+    if loops and background_leader.is_enabled():
+        background_loops.append(asyncio.create_task(background_leader.run_as_leader(db, loops)))
+
+
+@app.on_event("startup")
+async def start_identity_key_migration():
+    # Lookups fall back to raw emails until this has run once; later boots only read the marker
+    async def migrate():
+        try:
+            await candidate_identity.migrate_identity_keys(db)
+        except Exception as e:
+            logger.error(f"Identity key migration failed: {str(e)}")
+    background_loops.append(asyncio.create_task(migrate()))
+
+
+@app.on_event("startup")
+async def start_pipeline_counter_rebuild():
+    # The stats endpoint reads only the counters; build them once for data written before they existed
+    async def rebuild():
+        try:
+            if not await pipeline_counters.has_counters(db):
+                await pipeline_counters.rebuild_counters(db)
+        except Exception as e:
+            logger.error(f"Pipeline counter rebuild failed: {str(e)}")
+    background_loops.append(asyncio.create_task(rebuild()))
+
+
+@app.on_event("startup")
+async def resume_job_deletions():
+    # Jobs still flagged as deleting were cut short by a restart; finishing them is idempotent
+    async def resume():
+        try:
+            resumed = await job_deletion.resume_interrupted_deletions(db, cv_storage.get_storage())
+            if resumed:
+                logger.info(f"Resumed {resumed} interrupted job deletion(s)")
+        except Exception as e:
+            logger.error(f"Resuming job deletions failed: {str(e)}")
+    background_loops.append(asyncio.create_task(resume()))
+
+
+@app.on_event("startup")
+async def precompile_email_templates():
+    from email_renderer import precompile_templates
+    precompile_templates()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await notification_broker.stop()
+    for task in background_loops:
+        task.cancel()
+    story_pdf.shutdown_pool()
     client.close()
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Skill Taxonomy - canonical skills, aliases and stable skill IDs
+
+The alias table (skill_taxonomy.json) is loaded once per process. Every
+skill string is canonicalized ("ReactJS", "react.js" -> "react") and mapped
+to a stable 48-bit integer ID derived from the canonical name, so IDs are
+identical across workers and restarts. Candidates store `skill_ids` and
+jobs store `required_skill_ids`; both are multikey-indexed, which turns
+skill matching into integer set intersection and skill search into an
+index lookup.
+"""
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_PATH = Path(__file__).parent / "skill_taxonomy.json"
+
+BACKFILL_BATCH_SIZE = 500
+
+
+class SkillTaxonomy:
+    """Alias table and related-role map loaded from JSON"""
+
+    def __init__(self, data: dict):
+        self.aliases_by_canonical = {}
+        self.canonical_by_alias = {}
+        for canonical, aliases in data.get("skills", {}).items():
+            canonical = normalize_skill_name(canonical)
+            self.aliases_by_canonical[canonical] = [normalize_skill_name(a) for a in aliases]
+            self.canonical_by_alias[canonical] = canonical
+            for alias in aliases:
+                self.canonical_by_alias[normalize_skill_name(alias)] = canonical
+        self.related_roles = data.get("related_roles", {})
+
+
+def normalize_skill_name(name: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(name.lower().split())
+
+
+@lru_cache(maxsize=1)
+def get_taxonomy() -> SkillTaxonomy:
+    with open(TAXONOMY_PATH, encoding="utf-8") as f:
+        taxonomy = SkillTaxonomy(json.load(f))
+    logger.info(f"Loaded skill taxonomy: {len(taxonomy.aliases_by_canonical)} canonical skills")
+    return taxonomy
+
+
+@lru_cache(maxsize=65536)
+def canonical_skill(name: str) -> str:
+    """Canonical name of a skill; unknown skills are their own canonical form"""
+    normalized = normalize_skill_name(name)
+    return get_taxonomy().canonical_by_alias.get(normalized, normalized)
+
+
+@lru_cache(maxsize=65536)
+def skill_id(name: str) -> int:
+    """Stable 48-bit ID of a skill's canonical name (fits BSON int64 and JS numbers)"""
+    digest = hashlib.blake2b(canonical_skill(name).encode("utf-8"), digest_size=6).digest()
+    return int.from_bytes(digest, "big")
+
+
+def skill_ids(skills) -> List[int]:
+    """Distinct skill IDs for a list of skill strings, in first-seen order"""
+    ids = []
+    seen = set()
+    for skill in skills or []:
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        sid = skill_id(skill)
+        if sid not in seen:
+            seen.add(sid)
+            ids.append(sid)
+    return ids
+
+
+def dedupe_skills(skills) -> List[str]:
+    """Drop blanks and aliases of skills already listed, keeping the first spelling"""
+    result = []
+    seen = set()
+    for skill in skills or []:
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        sid = skill_id(skill)
+        if sid not in seen:
+            seen.add(sid)
+            result.append(skill.strip())
+    return result
+
+
+def related_role_terms() -> dict:
+    return get_taxonomy().related_roles
+
+
+def lookup_skill(name: str) -> Optional[dict]:
+    """Canonical form, ID and known aliases of a skill string"""
+    if not name or not name.strip():
+        return None
+    canonical = canonical_skill(name)
+    return {
+        "query": name,
+        "canonical": canonical,
+        "skill_id": skill_id(name),
+        "known": canonical in get_taxonomy().aliases_by_canonical,
+        "aliases": get_taxonomy().aliases_by_canonical.get(canonical, [])
+    }
+
+
+# ============ PERSISTENCE ============
+
+async def ensure_skill_indexes(db):
+    await db.candidates.create_index("skill_ids")
+    await db.jobs.create_index("required_skill_ids")
+
+
+async def _backfill_collection(db, collection: str, id_field: str, skills_field: str, ids_field: str,
+                               progress=None, offset: int = 0, total: int = 0,
+                               batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    processed = 0
+    operations = []
+    cursor = db[collection].find({}, {"_id": 0, id_field: 1, skills_field: 1, ids_field: 1})
+    async for doc in cursor.batch_size(batch_size):
+        ids = skill_ids(doc.get(skills_field))
+        if doc.get(ids_field) != ids:
+            operations.append(UpdateOne({id_field: doc[id_field]}, {"$set": {ids_field: ids}}))
+        processed += 1
+        if len(operations) >= batch_size:
+            await db[collection].bulk_write(operations, ordered=False)
+            operations = []
+        if progress and processed % batch_size == 0:
+            await progress(offset + processed, total)
+    if operations:
+        await db[collection].bulk_write(operations, ordered=False)
+    return processed
+
+
+async def backfill_skill_ids(db, progress=None) -> dict:
+    """Compute skill ID arrays for existing candidates and jobs (safe to re-run)"""
+    candidates_total = await db.candidates.count_documents({})
+    jobs_total = await db.jobs.count_documents({})
+    total = candidates_total + jobs_total
+
+    candidates = await _backfill_collection(
+        db, "candidates", "candidate_id", "skills", "skill_ids", progress, 0, total
+    )
+    jobs = await _backfill_collection(
+        db, "jobs", "job_id", "required_skills", "required_skill_ids", progress, candidates, total
+    )
+    if progress:
+        await progress(candidates + jobs, total)
+    return {"candidates": candidates, "jobs": jobs}
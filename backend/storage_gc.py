@@ -0,0 +1,120 @@
+"""
+Storage GC - deleting CV files no candidate references any more
+
+Deleting a candidate or a CV version removes the Mongo documents but not
+the file uploaded by `save_cv_file`, and files from before the batched job
+delete were never removed either. The collector reconciles storage against
+Mongo. It collects the storage keys of every `cv_file_url` on `candidates`
+and every `file_url` on `candidate_cv_versions`. It then lists the stored
+files under the CV prefix and treats every file whose key is not
+referenced as an orphan.
+
+Files younger than MIN_AGE_HOURS are never orphans. `save_cv_file` uploads
+before the candidate or version document is written, so a fresh file may
+simply not be referenced yet. Orphans are deleted in batches of
+DELETE_BATCH_SIZE with a pause between batches to stay under the storage
+API rate limits. With `dry_run` nothing is deleted and the result lists
+what would be. As a guard against a misconfigured database, nothing is
+deleted when Mongo references no files at all. The loop is off unless
+CV_STORAGE_GC_HOURS is set.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import cv_storage
+
+logger = logging.getLogger(__name__)
+
+TASK_TYPE = "cv_storage_gc"
+
+GC_HOURS = int(os.environ.get("CV_STORAGE_GC_HOURS", "0"))
+
+MIN_AGE_HOURS = 24
+DELETE_BATCH_SIZE = 100
+BATCH_PAUSE_SECONDS = 1.0
+# How many orphan keys a result lists
+SAMPLE_SIZE = 100
+
+
+def is_gc_enabled() -> bool:
+    return GC_HOURS > 0
+
+
+async def referenced_keys(db, storage) -> set:
+    """Storage keys of every CV file referenced from Mongo"""
+    keys = set()
+    sources = ((db.candidates, "cv_file_url"), (db.candidate_cv_versions, "file_url"))
+    for collection, field in sources:
+        cursor = collection.find({field: {"$nin": [None, ""]}}, {"_id": 0, field: 1})
+        async for doc in cursor:
+            key = storage.key_for_url(doc.get(field))
+            if key:
+                keys.add(key)
+    return keys
+
+
+async def collect_garbage(
+    db,
+    storage=None,
+    dry_run: bool = True,
+    progress=None,
+    now: Optional[datetime] = None,
+    min_age_hours: float = MIN_AGE_HOURS,
+    batch_size: int = DELETE_BATCH_SIZE,
+    pause_seconds: float = BATCH_PAUSE_SECONDS,
+) -> dict:
+    """Find stored CV files with no reference in Mongo and delete them unless `dry_run`"""
+    storage = storage or cv_storage.get_storage()
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=min_age_hours)
+    referenced = await referenced_keys(db, storage)
+    if not referenced and not dry_run:
+        raise RuntimeError("No CV file references found in the database; refusing to delete")
+
+    counts = {"scanned": 0, "referenced": len(referenced), "too_new": 0, "orphaned": 0, "deleted": 0}
+    sample = []
+    batch = []
+
+    async def flush():
+        if batch:
+            if not dry_run:
+                counts["deleted"] += await storage.delete_keys(batch)
+                if pause_seconds:
+                    await asyncio.sleep(pause_seconds)
+            batch.clear()
+
+    async for key, created_at in storage.list_files():
+        counts["scanned"] += 1
+        if key in referenced:
+            continue
+        if created_at > cutoff:
+            counts["too_new"] += 1
+            continue
+        counts["orphaned"] += 1
+        if len(sample) < SAMPLE_SIZE:
+            sample.append(key)
+        batch.append(key)
+        if len(batch) >= batch_size:
+            await flush()
+            if progress:
+                await progress(counts["scanned"])
+    await flush()
+    if progress:
+        await progress(counts["scanned"], counts["scanned"])
+
+    logger.info(f"CV storage GC ({'dry run' if dry_run else 'delete'}): {counts}")
+    return {**counts, "dry_run": dry_run, "orphans": sample}
+
+
+async def run_gc_loop(db):
+    """Background loop started with the app when CV_STORAGE_GC_HOURS is set"""
+    while True:
+        await asyncio.sleep(GC_HOURS * 3600)
+        try:
+            await collect_garbage(db, dry_run=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"CV storage GC failed: {str(e)}")
@@ -0,0 +1,318 @@
+"""
+Story PDF - candidate story export rendering and cache
+
+Paragraph styles are built once at import instead of on every export, and
+rendering (pure CPU work in reportlab) runs in a worker thread so the event
+loop keeps serving other requests. Rendered PDFs are kept in a per-process
+LRU bounded by total bytes, keyed by candidate_id plus a content version:
+a hash of every field the PDF shows (name, role, status, skills, experience,
+education and `ai_story`) and the footer date. Any change to those fields
+produces a new version, so repeat downloads are served from the cache and
+stale PDFs are never returned.
+
+Shortlist exports render many stories at once: uncached PDFs are rendered
+across a process pool, and the ZIP archive is streamed entry by entry as
+renders complete. At most a few renders are in flight and each finished
+entry is flushed to the client immediately, so memory stays bounded by
+the window size rather than the archive size.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from typing import AsyncIterator, List, Optional
+
+from cachetools import LRUCache
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+EXPORT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+EXPORT_MAX_CANDIDATES = 50
+
+# Candidate fields shown in the PDF; also the projection used to load them
+STORY_FIELDS = ("candidate_id", "name", "current_role", "status", "skills", "experience", "education", "ai_story")
+
+_styles = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_styles['Heading1'],
+    fontSize=28,
+    textColor=colors.HexColor('#2C3E50'),
+    spaceAfter=8,
+    alignment=TA_CENTER,
+    fontName='Times-Bold'
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'CustomSubtitle',
+    parent=_styles['Normal'],
+    fontSize=16,
+    textColor=colors.HexColor('#7F8C8D'),
+    spaceAfter=20,
+    alignment=TA_CENTER,
+    fontName='Helvetica'
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_styles['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#D4AF37'),
+    spaceAfter=12,
+    spaceBefore=16,
+    fontName='Times-Bold',
+    borderWidth=1,
+    borderColor=colors.HexColor('#D4AF37'),
+    borderPadding=8
+)
+
+BODY_STYLE = ParagraphStyle(
+    'CustomBody',
+    parent=_styles['Normal'],
+    fontSize=11,
+    textColor=colors.HexColor('#2C3E50'),
+    spaceAfter=8,
+    fontName='Helvetica',
+    leading=16
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_styles['Normal'],
+    fontSize=9,
+    textColor=colors.HexColor('#95A5A6'),
+    alignment=TA_CENTER,
+    fontName='Helvetica-Oblique'
+)
+
+_pdf_cache = LRUCache(maxsize=CACHE_MAX_BYTES, getsizeof=len)
+
+
+def content_version(candidate: dict, generated_on: str) -> str:
+    """Hash of everything the rendered PDF depends on"""
+    content = {field: candidate.get(field) for field in STORY_FIELDS}
+    content["generated_on"] = generated_on
+    payload = json.dumps(content, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def render_story_pdf(candidate: dict, generated_on: str) -> bytes:
+    """Render the candidate story PDF (blocking; run it off the event loop)"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=25, bottomMargin=25, leftMargin=25, rightMargin=25)
+    story_elements = []
+
+    # Hero section
+    story_elements.append(Paragraph(candidate["name"], TITLE_STYLE))
+    if candidate.get("current_role"):
+        story_elements.append(Paragraph(candidate["current_role"], SUBTITLE_STYLE))
+
+    # Status and fit score
+    ai_story = candidate.get("ai_story", {})
+    fit_score = ai_story.get("fit_score", 0) if ai_story else 0
+    status_text = f"Status: {candidate['status']} | Fit Score: {fit_score}%"
+    story_elements.append(Paragraph(status_text, BODY_STYLE))
+    story_elements.append(Spacer(1, 0.3*inch))
+
+    # Professional Summary
+    if ai_story and ai_story.get("summary"):
+        story_elements.append(Paragraph("Professional Summary", HEADING_STYLE))
+        story_elements.append(Paragraph(ai_story["summary"], BODY_STYLE))
+        story_elements.append(Spacer(1, 0.2*inch))
+
+    # Skills
+    if candidate.get("skills"):
+        story_elements.append(Paragraph("Core Skills", HEADING_STYLE))
+        skills_text = " • ".join(candidate["skills"][:10])
+        story_elements.append(Paragraph(skills_text, BODY_STYLE))
+        story_elements.append(Spacer(1, 0.2*inch))
+
+    # Experience
+    if candidate.get("experience"):
+        story_elements.append(Paragraph("Career Timeline", HEADING_STYLE))
+        for exp in candidate["experience"][:5]:
+            role_title = exp.get("role", "Position")
+            company = exp.get("company", "")
+            duration = exp.get("duration", "")
+            exp_text = f"<b>{role_title}</b>"
+            if company:
+                exp_text += f" at {company}"
+            if duration:
+                exp_text += f" ({duration})"
+            story_elements.append(Paragraph(exp_text, BODY_STYLE))
+
+            if exp.get("achievements") and isinstance(exp["achievements"], list):
+                for achievement in exp["achievements"][:3]:
+                    story_elements.append(Paragraph(f"  • {achievement}", BODY_STYLE))
+            story_elements.append(Spacer(1, 0.1*inch))
+
+    # Highlights
+    if ai_story and ai_story.get("highlights"):
+        story_elements.append(Paragraph("Key Achievements", HEADING_STYLE))
+        for highlight in ai_story["highlights"][:5]:
+            story_elements.append(Paragraph(f"✓ {highlight}", BODY_STYLE))
+        story_elements.append(Spacer(1, 0.2*inch))
+
+    # Education
+    if candidate.get("education"):
+        story_elements.append(Paragraph("Education", HEADING_STYLE))
+        for edu in candidate["education"][:3]:
+            degree = edu.get("degree", "")
+            institution = edu.get("institution", "")
+            year = edu.get("year", "")
+            edu_text = f"{degree}"
+            if institution:
+                edu_text += f" - {institution}"
+            if year:
+                edu_text += f" ({year})"
+            story_elements.append(Paragraph(edu_text, BODY_STYLE))
+        story_elements.append(Spacer(1, 0.3*inch))
+
+    # Footer
+    footer_text = (
+        f"Generated by Arbeit Talent Platform – {generated_on} – Candidate ID: {candidate['candidate_id']}"
+    )
+    story_elements.append(Spacer(1, 0.5*inch))
+    story_elements.append(Paragraph(footer_text, FOOTER_STYLE))
+
+    doc.build(story_elements)
+    return buffer.getvalue()
+
+
+def footer_date() -> str:
+    return datetime.now().strftime('%B %d, %Y')
+
+
+def _cache_key(candidate: dict, generated_on: str) -> tuple:
+    return candidate["candidate_id"], content_version(candidate, generated_on)
+
+
+def _remember(key: tuple, pdf: bytes):
+    if len(pdf) <= CACHE_MAX_BYTES:
+        _pdf_cache[key] = pdf
+
+
+async def get_story_pdf(candidate: dict, generated_on: Optional[str] = None) -> bytes:
+    """Cached PDF for a candidate (needs STORY_FIELDS); renders in a worker thread on a miss"""
+    generated_on = generated_on or footer_date()
+    key = _cache_key(candidate, generated_on)
+    pdf = _pdf_cache.get(key)
+    if pdf is None:
+        pdf = await asyncio.to_thread(render_story_pdf, candidate, generated_on)
+        _remember(key, pdf)
+    return pdf
+
+
+# ============ SHORTLIST EXPORT ============
+
+_pool = {"executor": None}
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """Shared render pool, started on first use ("spawn" so workers don't inherit the event loop)"""
+    if _pool["executor"] is None:
+        _pool["executor"] = ProcessPoolExecutor(
+            max_workers=EXPORT_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool["executor"]
+
+
+def shutdown_pool():
+    executor = _pool["executor"]
+    _pool["executor"] = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def archive_name(rank: int, candidate: dict) -> str:
+    """ZIP entry name; the rank prefix keeps the shortlist order when listed"""
+    name = re.sub(r"[^A-Za-z0-9]+", "_", candidate.get("name") or "").strip("_") or "candidate"
+    return f"{rank:02d}_{name}_{candidate['candidate_id']}.pdf"
+
+
+class _ZipChunks:
+    """Write-only sink for zipfile; written bytes are handed out by drain()"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_story_zip(candidates: List[dict], generated_on: Optional[str] = None,
+                           executor=None, max_in_flight: Optional[int] = None) -> AsyncIterator[bytes]:
+    """ZIP archive of story PDFs, yielded chunk by chunk as entries complete
+
+    Cached PDFs are written first; the rest are rendered on `executor` (the
+    shared process pool by default) with at most `max_in_flight` renders
+    outstanding.
+    """
+    generated_on = generated_on or footer_date()
+    executor = executor or process_pool()
+    max_in_flight = max_in_flight or EXPORT_MAX_WORKERS * 2
+    loop = asyncio.get_running_loop()
+
+    sink = _ZipChunks()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    now = datetime.now().timetuple()[:6]
+
+    def add_entry(rank: int, candidate: dict, pdf: bytes) -> bytes:
+        archive.writestr(zipfile.ZipInfo(archive_name(rank, candidate), date_time=now), pdf,
+                         compress_type=zipfile.ZIP_DEFLATED)
+        return sink.drain()
+
+    pending = []
+    for rank, candidate in enumerate(candidates, start=1):
+        key = _cache_key(candidate, generated_on)
+        pdf = _pdf_cache.get(key)
+        if pdf is None:
+            pending.append((rank, candidate, key))
+        else:
+            yield add_entry(rank, candidate, pdf)
+
+    queue = iter(pending)
+    in_flight = {}
+    try:
+        while True:
+            for rank, candidate, key in queue:
+                future = loop.run_in_executor(executor, render_story_pdf, candidate, generated_on)
+                in_flight[future] = (rank, candidate, key)
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                break
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                rank, candidate, key = in_flight.pop(future)
+                pdf = future.result()
+                _remember(key, pdf)
+                yield add_entry(rank, candidate, pdf)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+    archive.close()
+    yield sink.drain()
@@ -5,6 +5,7 @@ Tests for interview creation, slot booking, invite sending, and status managemen
 import pytest
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
@@ -282,6 +283,66 @@ class TestInterviewSlotBooking:
         assert "Slot not found" in book_response.json()["detail"]
 
 
+class TestConcurrentSlotBooking:
+    """Simultaneous bookings of one interview - exactly one may succeed"""
+    
+    def create_interview(self, client, days):
+        now = datetime.utcnow()
+        create_payload = {
+            "job_id": EXISTING_JOB_ID,
+            "candidate_id": EXISTING_CANDIDATE_ID,
+            "interview_mode": "Video",
+            "interview_duration": 30,
+            "proposed_slots": [
+                {
+                    "start_time": (now + timedelta(days=days, hours=h)).isoformat() + "Z",
+                    "end_time": (now + timedelta(days=days, hours=h, minutes=30)).isoformat() + "Z"
+                }
+                for h in (9, 11)
+            ]
+        }
+        response = client.post(f"{BASE_URL}/api/interviews", json=create_payload)
+        assert response.status_code == 200
+        return response.json()
+    
+    def fire(self, client, interview_id, slot_ids):
+        headers = dict(client.headers)
+        
+        def book(slot_id):
+            return requests.post(
+                f"{BASE_URL}/api/interviews/{interview_id}/book-slot",
+                json={"slot_id": slot_id, "confirmed": True},
+                headers=headers
+            ).status_code
+        
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            return list(pool.map(book, slot_ids))
+    
+    def test_same_slot_booked_concurrently(self, authenticated_admin_client):
+        """200 simultaneous bookings of one slot"""
+        interview = self.create_interview(authenticated_admin_client, days=6)
+        slot_id = interview["proposed_slots"][0]["slot_id"]
+        
+        codes = self.fire(authenticated_admin_client, interview["interview_id"], [slot_id] * 200)
+        assert codes.count(200) == 1, codes
+        assert set(codes) <= {200, 400}
+        
+        booked = authenticated_admin_client.get(f"{BASE_URL}/api/interviews/{interview['interview_id']}").json()
+        assert booked["interview_status"] == "Confirmed"
+        assert booked["selected_slot_id"] == slot_id
+    
+    def test_different_slots_booked_concurrently(self, authenticated_admin_client):
+        """Bookings racing for different slots confirm only one slot"""
+        interview = self.create_interview(authenticated_admin_client, days=7)
+        slot_ids = [slot["slot_id"] for slot in interview["proposed_slots"]]
+        
+        codes = self.fire(authenticated_admin_client, interview["interview_id"], slot_ids * 100)
+        assert codes.count(200) == 1, codes
+        
+        booked = authenticated_admin_client.get(f"{BASE_URL}/api/interviews/{interview['interview_id']}").json()
+        unavailable = [s["slot_id"] for s in booked["proposed_slots"] if not s.get("is_available", True)]
+        assert unavailable == [booked["selected_slot_id"]]
+
 class TestInterviewInvite:
     """POST /api/interviews/{interview_id}/send-invite - Send invite tests"""
     
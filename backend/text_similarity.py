@@ -0,0 +1,291 @@
+"""
+Text Similarity - TF-IDF cosine similarity between CVs and job descriptions
+
+Works fully offline with NumPy. Terms are hashed into a fixed number of
+buckets (stable across processes), so no vocabulary has to be stored. A
+fitted model is just the IDF of every bucket seen in the corpus (job
+descriptions plus candidates' redacted CV text); it lives in the
+`similarity_models` collection and is cached per process, with its version
+re-checked at most every MODEL_VERSION_TTL_SECONDS.
+
+Each job and candidate stores its L2-normalized sparse TF-IDF vector as
+`text_vector` ({model_version, indices, values}). Vectors are recomputed
+incrementally when a CV is replaced or a job description changes, and a
+refit re-vectorizes everything. Cosine similarity for a job's applicant
+pool is a single gather + bincount over the concatenated sparse vectors.
+"""
+import hashlib
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain
+from typing import List, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from redaction import CV_TEXT_FIELDS, redacted_cv_text
+
+logger = logging.getLogger(__name__)
+
+MODEL_ID = "tfidf"
+TASK_TYPE = "similarity_model_refit"
+
+N_FEATURES = 2 ** 18
+FIT_BATCH_SIZE = 500
+
+# Seconds the cached model is trusted before its version is checked again
+MODEL_VERSION_TTL_SECONDS = float(os.environ.get("SIMILARITY_MODEL_VERSION_TTL_SECONDS", "30"))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOP_WORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+during each etc few for from had has have having he her here him his how i if in into is it its
+me more most my no nor not of on once only or other our out over own per same she should so some
+such than that the their them then there these they this those through to too under until up us
+very was we were what when where which while who whom why will with within would you your
+redacted email phone
+""".split())
+
+
+# ============ VECTORIZING ============
+
+@lru_cache(maxsize=200000)
+def term_bucket(term: str) -> int:
+    digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % N_FEATURES
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def term_counts(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted bucket indices of a text and how often each occurs"""
+    buckets = np.fromiter((term_bucket(t) for t in tokenize(text)), dtype=np.int64)
+    return np.unique(buckets, return_counts=True)
+
+
+class TfidfModel:
+    """Per-bucket IDF weights; version 0 is the unfitted model (plain TF)"""
+
+    def __init__(self, version: int, n_documents: int, idf: np.ndarray):
+        self.version = version
+        self.n_documents = n_documents
+        self.idf = idf
+
+    @classmethod
+    def unfitted(cls) -> "TfidfModel":
+        return cls(0, 0, np.ones(N_FEATURES, dtype=np.float32))
+
+    @classmethod
+    def fit(cls, version: int, n_documents: int, document_frequency: np.ndarray) -> "TfidfModel":
+        # Smoothed IDF, as in scikit-learn's TfidfVectorizer(smooth_idf=True)
+        idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+        return cls(version, n_documents, idf.astype(np.float32))
+
+    def transform(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """L2-normalized sparse TF-IDF vector (sublinear TF) as (indices, values)"""
+        indices, counts = term_counts(text)
+        values = (1 + np.log(counts)) * self.idf[indices]
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values = values / norm
+        return indices, values.astype(np.float32)
+
+    def to_document(self) -> dict:
+        default_idf = float(np.log(1 + self.n_documents) + 1)
+        fitted = np.flatnonzero(~np.isclose(self.idf, default_idf))
+        return {
+            "model_id": MODEL_ID,
+            "version": self.version,
+            "n_documents": self.n_documents,
+            "n_features": N_FEATURES,
+            "default_idf": default_idf,
+            "idf_indices": fitted.tolist(),
+            "idf_values": self.idf[fitted].tolist(),
+            "fitted_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "TfidfModel":
+        idf = np.full(N_FEATURES, doc["default_idf"], dtype=np.float32)
+        idf[np.array(doc["idf_indices"], dtype=np.int64)] = np.array(doc["idf_values"], dtype=np.float32)
+        return cls(doc["version"], doc["n_documents"], idf)
+
+
+def job_text(job: dict) -> str:
+    skills = " ".join(s for s in job.get("required_skills") or [] if isinstance(s, str))
+    return f"{job.get('title') or ''}\n{skills}\n{job.get('description') or ''}"
+
+
+def candidate_text(candidate: dict) -> str:
+    text = redacted_cv_text(candidate)
+    if text:
+        return text
+    # Manually created candidates have no CV text
+    skills = " ".join(s for s in candidate.get("skills") or [] if isinstance(s, str))
+    return f"{candidate.get('current_role') or ''}\n{skills}\n{candidate.get('summary') or ''}"
+
+
+def vector_document(model: TfidfModel, text: str) -> dict:
+    """Stored form of a document's vector"""
+    indices, values = model.transform(text)
+    return {
+        "model_version": model.version,
+        "indices": indices.tolist(),
+        "values": [round(float(v), 6) for v in values]
+    }
+
+
+def document_vector(model: TfidfModel, doc: dict, text_of) -> Tuple[list, list]:
+    """Stored vector if it was built with this model, otherwise computed from text_of(doc)"""
+    stored = doc.get("text_vector")
+    if stored and stored.get("model_version") == model.version:
+        return stored["indices"], stored["values"]
+    return model.transform(text_of(doc))
+
+
+def cosine_similarities(query: Tuple[np.ndarray, np.ndarray], vectors: List[Tuple[list, list]]) -> np.ndarray:
+    """Cosine similarity of one normalized sparse vector against many"""
+    if not vectors:
+        return np.zeros(0, dtype=np.float32)
+    dense_query = np.zeros(N_FEATURES, dtype=np.float32)
+    dense_query[np.asarray(query[0], dtype=np.int64)] = query[1]
+
+    # Flatten all vectors into one gather instead of converting them one by one
+    lengths = np.fromiter((len(indices) for indices, _ in vectors), dtype=np.int64, count=len(vectors))
+    size = int(lengths.sum())
+    if size == 0:
+        return np.zeros(len(vectors), dtype=np.float32)
+    indices = np.fromiter(chain.from_iterable(indices for indices, _ in vectors), dtype=np.int64, count=size)
+    values = np.fromiter(chain.from_iterable(values for _, values in vectors), dtype=np.float32, count=size)
+    owners = np.repeat(np.arange(len(vectors)), lengths)
+    return np.bincount(owners, weights=values * dense_query[indices], minlength=len(vectors)).astype(np.float32)
+
+
+def score_similarities(model: TfidfModel, job: dict, candidates: List[dict]) -> np.ndarray:
+    """Similarity of every candidate's CV to the job, in input order"""
+    job_vector = document_vector(model, job, job_text)
+    candidate_vectors = [document_vector(model, c, candidate_text) for c in candidates]
+    return cosine_similarities(job_vector, candidate_vectors)
+
+
+# ============ PERSISTENCE ============
+
+# Projections that include everything needed to vectorize a document
+JOB_TEXT_FIELDS = {"job_id": 1, "title": 1, "required_skills": 1, "description": 1, "text_vector": 1}
+CANDIDATE_TEXT_FIELDS = {
+    "candidate_id": 1, **CV_TEXT_FIELDS, "current_role": 1, "skills": 1, "summary": 1, "text_vector": 1
+}
+
+_model_cache = {"model": None, "checked_at": None}
+
+
+@lru_cache(maxsize=1)
+def unfitted_model() -> TfidfModel:
+    return TfidfModel.unfitted()
+
+
+async def ensure_similarity_indexes(db):
+    await db.similarity_models.create_index("model_id", unique=True)
+
+
+def _cache_model(model: TfidfModel):
+    _model_cache["model"] = model
+    _model_cache["checked_at"] = time.monotonic()
+
+
+async def get_model(db) -> TfidfModel:
+    """Current fitted model (version checked at most every MODEL_VERSION_TTL_SECONDS)"""
+    cached = _model_cache["model"]
+    checked_at = _model_cache["checked_at"]
+    if checked_at is not None and (time.monotonic() - checked_at) < MODEL_VERSION_TTL_SECONDS:
+        return cached
+
+    current = await db.similarity_models.find_one({"model_id": MODEL_ID}, {"_id": 0, "version": 1})
+    if not current:
+        cached = unfitted_model()
+    elif cached is None or cached.version != current["version"]:
+        doc = await db.similarity_models.find_one({"model_id": MODEL_ID}, {"_id": 0})
+        cached = TfidfModel.from_document(doc)
+    _cache_model(cached)
+    return cached
+
+
+async def job_vector_document(db, job: dict) -> dict:
+    return vector_document(await get_model(db), job_text(job))
+
+
+async def candidate_vector_document(db, candidate: dict) -> dict:
+    return vector_document(await get_model(db), candidate_text(candidate))
+
+
+async def job_similarities(db, job: dict, candidates: List[dict]) -> np.ndarray:
+    """Batch similarity for a job's applicant pool (candidates need CANDIDATE_TEXT_FIELDS)"""
+    return score_similarities(await get_model(db), job, candidates)
+
+
+async def _document_frequencies(db, progress=None, total: int = 0) -> Tuple[int, np.ndarray]:
+    df = np.zeros(N_FEATURES, dtype=np.int64)
+    n_documents = 0
+    sources = (
+        (db.jobs, JOB_TEXT_FIELDS, job_text),
+        (db.candidates, CANDIDATE_TEXT_FIELDS, candidate_text),
+    )
+    for collection, fields, text_of in sources:
+        async for doc in collection.find({}, {"_id": 0, **fields}).batch_size(FIT_BATCH_SIZE):
+            buckets, _ = term_counts(text_of(doc))
+            df[buckets] += 1
+            n_documents += 1
+            if progress and n_documents % FIT_BATCH_SIZE == 0:
+                await progress(n_documents, total, stage="fit")
+    return n_documents, df
+
+
+async def _revectorize(db, model: TfidfModel, collection, id_field: str, fields: dict, text_of,
+                       progress=None, offset: int = 0, total: int = 0) -> int:
+    processed = 0
+    operations = []
+    async for doc in collection.find({}, {"_id": 0, **fields}).batch_size(FIT_BATCH_SIZE):
+        operations.append(UpdateOne(
+            {id_field: doc[id_field]},
+            {"$set": {"text_vector": vector_document(model, text_of(doc))}}
+        ))
+        processed += 1
+        if len(operations) >= FIT_BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            operations = []
+            if progress:
+                await progress(offset + processed, total, stage="vectorize")
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    return processed
+
+
+async def refit_model(db, progress=None) -> dict:
+    """Fit IDF over all job descriptions and CVs, then re-vectorize every document"""
+    total = await db.jobs.count_documents({}) + await db.candidates.count_documents({})
+    if progress:
+        await progress(0, total, stage="fit")
+
+    n_documents, df = await _document_frequencies(db, progress, total)
+    previous = await db.similarity_models.find_one({"model_id": MODEL_ID}, {"_id": 0, "version": 1})
+    model = TfidfModel.fit((previous or {}).get("version", 0) + 1, n_documents, df)
+
+    await db.similarity_models.replace_one({"model_id": MODEL_ID}, model.to_document(), upsert=True)
+    _cache_model(model)
+
+    jobs = await _revectorize(db, model, db.jobs, "job_id", JOB_TEXT_FIELDS, job_text, progress, 0, total)
+    candidates = await _revectorize(
+        db, model, db.candidates, "candidate_id", CANDIDATE_TEXT_FIELDS, candidate_text, progress, jobs, total
+    )
+    if progress:
+        await progress(jobs + candidates, total, stage="done")
+
+    logger.info(f"Fitted TF-IDF model v{model.version} on {n_documents} documents")
+    return {"version": model.version, "documents": n_documents, "jobs": jobs, "candidates": candidates}
@@ -80,6 +80,12 @@ export const AddCandidateModal = ({ open, onClose, onSuccess, jobId, job }) => {
       setParsedData(response.data);
       setStep(2);
       toast.success('CV parsed successfully!');
+
+      const duplicates = response.data.possible_duplicates || [];
+      if (duplicates.length > 0) {
+        const names = duplicates.map(d => `${d.name} (${Math.round(d.similarity * 100)}%)`).join(', ');
+        toast.warning(`Possible duplicate of: ${names}`);
+      }
     } catch (error) {
       console.error('Upload failed:', error);
       toast.error(error.response?.data?.detail || 'Failed to upload CV');
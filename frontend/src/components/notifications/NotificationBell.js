@@ -30,12 +30,51 @@ export const NotificationBell = () => {
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
-    if (token) {
+    if (!token) return;
+
+    // Live updates over Server-Sent Events; fall back to polling if unsupported or broken
+    let pollInterval = null;
+    const startPolling = () => {
+      if (pollInterval) return;
       fetchUnreadCount();
-      // Poll for new notifications every 30 seconds
-      const interval = setInterval(fetchUnreadCount, 30000);
-      return () => clearInterval(interval);
+      pollInterval = setInterval(fetchUnreadCount, 30000);
+    };
+
+    if (typeof window.EventSource === 'undefined') {
+      startPolling();
+      return () => clearInterval(pollInterval);
     }
+
+    const source = new EventSource(`${API}/notifications/stream?token=${encodeURIComponent(token)}`);
+
+    source.addEventListener('unread_count', (event) => {
+      setUnreadCount(JSON.parse(event.data).unread_count);
+    });
+
+    source.addEventListener('notification', (event) => {
+      const notification = JSON.parse(event.data);
+      setUnreadCount(prev => prev + notification.unread_delta);
+      setNotifications(prev => [notification, ...prev.filter(n => n.notification_id !== notification.notification_id)].slice(0, 10));
+    });
+
+    source.addEventListener('read', (event) => {
+      // Read in another tab/session: resync the badge with one indexed count
+      const { notification_id } = JSON.parse(event.data);
+      setNotifications(prev => prev.map(n => n.notification_id === notification_id ? { ...n, is_read: true } : n));
+      fetchUnreadCount();
+    });
+
+    source.onerror = () => {
+      // EventSource retries on its own while CONNECTING; a CLOSED stream won't come back
+      if (source.readyState === EventSource.CLOSED) {
+        startPolling();
+      }
+    };
+
+    return () => {
+      source.close();
+      if (pollInterval) clearInterval(pollInterval);
+    };
   }, [token]);
 
   const fetchUnreadCount = async () => {
@@ -0,0 +1,122 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from background_leader import acquire_lease, run_as_leader
+
+
+class FakeLeases:
+    """Upsert semantics of a single `_id`-keyed document"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            self.docs[query["_id"]] = dict(update["$set"])
+            return
+        holder_clause, expiry_clause = query["$or"]
+        if doc["holder"] == holder_clause["holder"] or doc["expires_at"] < expiry_clause["expires_at"]["$lt"]:
+            doc.update(update["$set"])
+        else:
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+
+class FakeDb:
+    def __init__(self):
+        self.background_leases = FakeLeases()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestLease:
+    """One holder at a time; an expired lease can be taken over"""
+
+    def test_holder_renews_and_others_wait(self):
+        db = FakeDb()
+        assert run(acquire_lease(db, "worker_a", 60))
+        assert run(acquire_lease(db, "worker_a", 60))
+        assert not run(acquire_lease(db, "worker_b", 60))
+        assert db.background_leases.docs["background_loops"]["holder"] == "worker_a"
+
+    def test_expired_lease_is_taken_over(self):
+        db = FakeDb()
+        run(acquire_lease(db, "worker_a", 60))
+        db.background_leases.docs["background_loops"]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+        assert run(acquire_lease(db, "worker_b", 60))
+        assert not run(acquire_lease(db, "worker_a", 60))
+
+
+class TestRunAsLeader:
+    """Loops run only on the worker holding the lease"""
+
+    def test_only_the_leader_runs_loops(self):
+        db = FakeDb()
+        runs = []
+
+        async def loop(db):
+            runs.append("tick")
+            await asyncio.Event().wait()
+
+        async def scenario():
+            workers = [asyncio.create_task(run_as_leader(db, [loop], holder=f"worker_{i}", seconds=3))
+                       for i in range(3)]
+            await asyncio.sleep(0.05)
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        run(scenario())
+        assert runs == ["tick"]
+
+    def test_loops_stop_when_the_lease_is_lost(self):
+        db = FakeDb()
+        cancelled = []
+
+        async def loop(db):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def scenario():
+            leader = asyncio.create_task(run_as_leader(db, [loop], holder="worker_a", seconds=0.03))
+            await asyncio.sleep(0.005)
+            # Another worker took over while this one was stalled
+            db.background_leases.docs["background_loops"].update(
+                holder="worker_b", expires_at=datetime.now(timezone.utc) + timedelta(minutes=5)
+            )
+            await asyncio.sleep(0.1)
+            assert cancelled == [True]
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+
+        run(scenario())
+
+
+class TestIndexes:
+    """A failing index build does not skip the others"""
+
+    def test_each_builder_runs(self, monkeypatch):
+        import server
+        built = []
+
+        async def failing(db):
+            raise RuntimeError("index options conflict")
+
+        async def working(db):
+            built.append("ok")
+        monkeypatch.setattr(server, "INDEX_BUILDERS", [("first", failing), ("second", working)])
+        run(server.ensure_indexes())
+        assert built == ["ok"]
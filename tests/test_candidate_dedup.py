@@ -0,0 +1,59 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from candidate_dedup import (
+    BANDS, NUM_PERM, band_keys, dedup_fields, estimated_similarity, minhash_signature
+)
+
+
+def make_cv(seed, length=600):
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choices(words, k=length))
+
+
+class TestMinHash:
+    """Signatures estimate Jaccard similarity of word shingles"""
+
+    def test_signature_shape_and_stability(self):
+        cv = make_cv(1)
+        signature = minhash_signature(cv)
+        assert signature.shape == (NUM_PERM,)
+        assert minhash_signature(cv).tolist() == signature.tolist()
+
+    def test_short_text_has_no_signature(self):
+        assert minhash_signature("Jane Doe, Python developer") is None
+        assert dedup_fields("Jane Doe") == {"minhash_signature": None, "minhash_bands": []}
+
+    def test_case_and_punctuation_do_not_matter(self):
+        cv = make_cv(2)
+        assert estimated_similarity(minhash_signature(cv), minhash_signature(cv.upper().replace(" ", ", "))) == 1.0
+
+    def test_near_duplicate_is_similar_and_shares_bands(self):
+        cv = make_cv(3)
+        edited = " ".join(cv.split()[:570]) + " " + make_cv(4, 30)
+        a, b = minhash_signature(cv), minhash_signature(edited)
+        assert estimated_similarity(a, b) > 0.8
+        assert set(band_keys(a)) & set(band_keys(b))
+
+    def test_different_cvs_are_not_similar(self):
+        a, b = minhash_signature(make_cv(5)), minhash_signature(make_cv(6))
+        assert estimated_similarity(a, b) < 0.1
+        assert not set(band_keys(a)) & set(band_keys(b))
+
+
+class TestBandKeys:
+    """LSH band keys are indexable int64 values"""
+
+    def test_one_key_per_band(self):
+        keys = band_keys(minhash_signature(make_cv(7)))
+        assert len(keys) == BANDS == len(set(keys))
+        assert all(0 <= key < 2 ** 63 for key in keys)
+
+    def test_stored_fields_round_trip(self):
+        fields = dedup_fields(make_cv(8))
+        assert len(fields["minhash_signature"]) == NUM_PERM
+        assert fields["minhash_bands"] == band_keys(minhash_signature(make_cv(8)))
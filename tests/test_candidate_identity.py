@@ -0,0 +1,287 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+import candidate_identity
+from candidate_identity import (
+    candidate_records_query, contact_key_updates, email_key, ensure_unique_portal_email, find_portal_user,
+    identity_keys, merge_portal_users, migrate_identity_keys, phone_key
+)
+
+
+@pytest.fixture
+def keys_complete(monkeypatch):
+    monkeypatch.setattr(candidate_identity, "_keys_complete", True)
+
+
+@pytest.fixture
+def keys_pending(monkeypatch):
+    monkeypatch.setattr(candidate_identity, "_keys_complete", False)
+
+
+def _matches(doc, query):
+    if "$or" in query:
+        return any(_matches(doc, clause) for clause in query["$or"])
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$exists" in condition and (field in doc) != condition["$exists"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$nin" in condition and value in condition["$nin"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, n):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def sort(self, field, direction):
+        return self
+
+    async def to_list(self, length):
+        return self.docs
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class FakeCollection:
+    def __init__(self, docs=None, id_field=None):
+        self.docs = list(docs or [])
+        self.id_field = id_field
+        self.indexes = {}
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def count_documents(self, query):
+        return len([d for d in self.docs if _matches(d, query)])
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            for doc in self.docs:
+                if _matches(doc, op._filter):
+                    doc.update(op._doc["$set"])
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if _matches(d, query)), None)
+        if doc is None and upsert:
+            doc = dict(query)
+            self.docs.append(doc)
+        if doc is not None:
+            doc.update(update["$set"])
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+
+    def aggregate(self, pipeline):
+        groups = {}
+        for doc in sorted(self.docs, key=lambda d: d["created_at"]):
+            if isinstance(doc.get("email_key"), str):
+                groups.setdefault(doc["email_key"], []).append(doc[self.id_field])
+        return Cursor([{"_id": k, "ids": ids, "count": len(ids)} for k, ids in groups.items() if len(ids) > 1])
+
+    async def index_information(self):
+        return self.indexes
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+    async def create_index(self, key, name=None, unique=False, **kwargs):
+        keys = [d.get(key) for d in self.docs if isinstance(d.get(key), str)]
+        if unique and len(keys) != len(set(keys)):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.indexes[name] = {"key": [(key, 1)], "unique": unique}
+
+
+class FakeDb:
+    def __init__(self, candidates, portal_users):
+        self.candidates = FakeCollection(candidates, "candidate_id")
+        self.candidate_portal_users = FakeCollection(portal_users, "candidate_portal_id")
+        self.migrations = FakeCollection()
+        self.portal_email_conflicts = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestContactKeys:
+    """Email and phone normalization"""
+
+    def test_email_key_ignores_case_and_whitespace(self):
+        assert email_key("  Jane.Doe@Example.COM ") == "jane.doe@example.com"
+        assert email_key("") is None
+        assert email_key(None) is None
+
+    def test_phone_key_uses_last_ten_digits(self):
+        assert phone_key("+91 98765-43210") == "9876543210"
+        assert phone_key("(987) 654-3210") == "9876543210"
+        assert phone_key("098765 43210") == "9876543210"
+
+    def test_short_or_missing_phone_has_no_key(self):
+        assert phone_key("12345") is None
+        assert phone_key(None) is None
+
+    def test_identity_keys(self):
+        assert identity_keys("A@B.com", "+1 (555) 123-4567") == {"email_key": "a@b.com", "phone_key": "5551234567"}
+
+    def test_contact_key_updates_only_for_changed_fields(self):
+        assert contact_key_updates({"name": "Jane"}) == {}
+        assert contact_key_updates({"email": "X@Y.io"}) == {"email_key": "x@y.io"}
+        assert contact_key_updates({"phone": None}) == {"phone_key": None}
+
+
+@pytest.mark.usefixtures("keys_complete")
+class TestCandidateRecordsQuery:
+    """Identity resolution builds indexed point lookups"""
+
+    def test_portal_user_matches_portal_id_or_email_key(self):
+        portal_user = {"candidate_portal_id": "cp_1", "email": "Jane@Example.com"}
+        assert candidate_records_query(portal_user) == {"$or": [
+            {"candidate_portal_id": "cp_1"},
+            {"email_key": "jane@example.com"},
+        ]}
+
+    def test_single_clause_is_not_wrapped(self):
+        assert candidate_records_query(email="JANE@example.com") == {"email_key": "jane@example.com"}
+
+    def test_phone_lookup(self):
+        assert candidate_records_query(phone="+91 98765 43210") == {"phone_key": "9876543210"}
+
+    def test_nothing_to_match(self):
+        assert candidate_records_query() is None
+
+
+@pytest.mark.usefixtures("keys_pending")
+class TestBeforeMigration:
+    """Raw emails still match until every document carries its keys"""
+
+    def test_query_includes_raw_email(self):
+        assert candidate_records_query(email="Jane@Example.com") == {"$or": [
+            {"email_key": "jane@example.com"},
+            {"email": "Jane@Example.com"},
+        ]}
+
+    def test_portal_user_without_key_is_found(self):
+        db = FakeDb([], [{"candidate_portal_id": "cp_1", "email": "jane@example.com", "created_at": "1"}])
+        assert run(find_portal_user(db, "jane@example.com"))["candidate_portal_id"] == "cp_1"
+
+
+@pytest.mark.usefixtures("keys_pending")
+class TestMigration:
+    """Keys are backfilled once; conflicting portal accounts are reported, not merged"""
+
+    def make_db(self):
+        return FakeDb(
+            [{"candidate_id": "cand_1", "email": "Jane@Example.com", "candidate_portal_id": "cp_2"},
+             {"candidate_id": "cand_2", "email": "raj@example.com", "phone": "+91 98765 43210"}],
+            [{"candidate_portal_id": "cp_1", "email": "jane@example.com", "created_at": "2026-01-01"},
+             {"candidate_portal_id": "cp_2", "email": "JANE@example.com", "created_at": "2026-03-01"},
+             {"candidate_portal_id": "cp_3", "email": "raj@example.com", "created_at": "2026-02-01"}],
+        )
+
+    def test_conflicts_are_recorded_without_touching_accounts(self):
+        db = self.make_db()
+        db.candidate_portal_users.indexes["email_key_1"] = {"key": [("email_key", 1)]}
+        counts = run(migrate_identity_keys(db))
+        assert counts == {"candidates": 2, "portal_users": 3, "unique_portal_email": False,
+                          "portal_email_conflicts": 1}
+        assert db.candidates.docs[1]["phone_key"] == "9876543210"
+        assert db.candidates.docs[0]["candidate_portal_id"] == "cp_2"
+        assert all("merged_into" not in u and "is_active" not in u for u in db.candidate_portal_users.docs)
+        assert db.portal_email_conflicts.docs[0]["candidate_portal_ids"] == ["cp_1", "cp_2"]
+        assert not db.candidate_portal_users.indexes["email_key_1"].get("unique")
+        assert run(db.migrations.find_one({"_id": "identity_keys"})) is not None
+        assert candidate_identity.keys_complete()
+
+        # Both accounts can still log in with the email they registered with
+        assert run(find_portal_user(db, "JANE@example.com"))["candidate_portal_id"] == "cp_2"
+        assert run(find_portal_user(db, "jane@example.com"))["candidate_portal_id"] == "cp_1"
+
+    def test_admin_merge_makes_email_unique(self):
+        db = self.make_db()
+        run(migrate_identity_keys(db))
+        with pytest.raises(ValueError):
+            run(merge_portal_users(db, "jane@example.com", keep_id="cp_3"))
+
+        result = run(merge_portal_users(db, "Jane@Example.com", merged_by="admin@arbeit.com"))
+        assert result == {"kept": "cp_1", "merged": ["cp_2"], "unique_index": True}
+        assert db.candidates.docs[0]["candidate_portal_id"] == "cp_1"
+        merged = db.candidate_portal_users.docs[1]
+        assert "email_key" not in merged and merged["merged_into"] == "cp_1" and merged["is_active"] is False
+        assert db.portal_email_conflicts.docs == []
+        assert db.candidate_portal_users.indexes["email_key_1"]["unique"]
+        assert run(find_portal_user(db, "JANE@example.com"))["candidate_portal_id"] == "cp_1"
+
+    def test_registration_racing_the_index_build(self):
+        db = FakeDb([], [{"candidate_portal_id": "cp_1", "email_key": "jane@example.com", "created_at": "1"}])
+        build = db.candidate_portal_users.create_index
+
+        async def racing_build(key, **kwargs):
+            db.candidate_portal_users.create_index = build
+            db.candidate_portal_users.docs.append(
+                {"candidate_portal_id": "cp_2", "email_key": "jane@example.com", "created_at": "2"}
+            )
+            return await build(key, **kwargs)
+        db.candidate_portal_users.create_index = racing_build
+
+        assert run(ensure_unique_portal_email(db)) is False
+        assert [c["email_key"] for c in db.portal_email_conflicts.docs] == ["jane@example.com"]
+        assert not db.candidate_portal_users.indexes["email_key_1"]["unique"]
+
+    def test_transient_duplicate_is_retried(self):
+        db = FakeDb([], [{"candidate_portal_id": "cp_1", "email_key": "jane@example.com", "created_at": "1"}])
+        build = db.candidate_portal_users.create_index
+
+        async def flaky_build(key, **kwargs):
+            db.candidate_portal_users.create_index = build
+            raise DuplicateKeyError("E11000 duplicate key error")
+        db.candidate_portal_users.create_index = flaky_build
+
+        assert run(ensure_unique_portal_email(db)) is True
+        assert db.candidate_portal_users.indexes["email_key_1"]["unique"]
+
+    def test_later_runs_skip_the_scan(self):
+        db = self.make_db()
+        run(migrate_identity_keys(db))
+        finds = db.candidates.finds
+        candidate_identity._keys_complete = False  # A fresh process
+        assert run(migrate_identity_keys(db)) == {"already_done": True}
+        assert db.candidates.finds == finds
+        assert candidate_identity.keys_complete()
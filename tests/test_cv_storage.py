@@ -0,0 +1,54 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from cv_storage import LocalCVStorage, parse_cloudinary_url
+
+
+async def collect(items):
+    return [item async for item in items]
+
+
+class TestParseCloudinaryUrl:
+    """Public ids are recovered from delivery URLs"""
+
+    def test_image_asset_drops_extension(self):
+        url = "https://res.cloudinary.com/arbeit/image/upload/v1728000000/resumes/cand_1/cv_2.pdf"
+        assert parse_cloudinary_url(url) == ("image", "resumes/cand_1/cv_2")
+
+    def test_raw_asset_keeps_extension(self):
+        url = "https://res.cloudinary.com/arbeit/raw/upload/v1728000000/resumes/cand_1/cv_1.docx"
+        assert parse_cloudinary_url(url) == ("raw", "resumes/cand_1/cv_1.docx")
+
+    def test_transformations_are_skipped(self):
+        url = "https://res.cloudinary.com/arbeit/image/upload/fl_attachment/v17/resumes/cand_1/my%20cv.pdf"
+        assert parse_cloudinary_url(url) == ("image", "resumes/cand_1/my cv")
+
+    def test_other_urls(self):
+        assert parse_cloudinary_url(None) is None
+        assert parse_cloudinary_url("https://example.com/image/upload/v1/cv.pdf") is None
+        assert parse_cloudinary_url("https://res.cloudinary.com/arbeit/image/fetch/cv.pdf") is None
+
+
+class TestLocalCVStorage:
+    """The filesystem backend used in tests"""
+
+    def test_round_trip(self, tmp_path):
+        storage = LocalCVStorage(tmp_path, "https://files.test/cv")
+        url = storage.save_file("resumes/cand_1", b"%PDF")
+        assert url == "https://files.test/cv/resumes/cand_1"
+        assert storage.key_for_url(url) == "resumes/cand_1"
+        assert storage.key_for_url("https://res.cloudinary.com/arbeit/raw/upload/v1/resumes/cand_1") is None
+
+        listed = asyncio.run(collect(storage.list_files()))
+        assert [key for key, _ in listed] == ["resumes/cand_1"]
+        assert asyncio.run(storage.delete_files([url, url])) == 1
+        assert asyncio.run(storage.delete_files([url])) == 0  # Already gone
+
+    def test_keys_outside_root_are_ignored(self, tmp_path):
+        (tmp_path / "secret").write_bytes(b"x")
+        storage = LocalCVStorage(tmp_path / "cv", "https://files.test/cv")
+        assert asyncio.run(storage.delete_keys(["../secret"])) == 0
+        assert (tmp_path / "secret").exists()
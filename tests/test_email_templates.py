@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from email_renderer import TEMPLATE_DIR, get_template, precompile_templates
+from notification_service import (
+    get_new_job_email_template,
+    get_candidate_status_change_email_template,
+    get_interview_invitation_email_template,
+    get_interview_reminder_email_template,
+    get_client_user_welcome_email_template
+)
+
+JOB = {
+    "job_id": "job_1",
+    "title": "Backend Engineer",
+    "location": "Pune",
+    "work_model": "Hybrid",
+    "experience_range": {"min_years": 3, "max_years": 6},
+    "required_skills": ["Python", "MongoDB"]
+}
+CLIENT = {"company_name": "Acme Corp"}
+CANDIDATE = {"name": "Asha Rao"}
+
+
+class TestTemplateCompilation:
+    """Templates are compiled once and reused"""
+
+    def test_all_templates_precompile(self):
+        precompile_templates()
+        names = [p.name for p in TEMPLATE_DIR.glob("*.html")]
+        assert len(names) == 8
+        for name in names:
+            assert get_template(name) is get_template(name)
+
+
+class TestEmailTemplateRendering:
+    """Rendered bodies contain the event data"""
+
+    def test_new_job_email(self):
+        subject, body = get_new_job_email_template(JOB, CLIENT, "client@acme.test")
+        assert "Backend Engineer" in subject
+        assert "Acme Corp" in body
+        assert "3 - 6 years" in body
+        assert "Python, MongoDB" in body
+        assert "client@acme.test" in body
+
+    def test_new_job_without_skills(self):
+        _, body = get_new_job_email_template({**JOB, "required_skills": []}, CLIENT, "x@y.com")
+        assert "Not specified" in body
+
+    def test_status_change_color(self):
+        _, body = get_candidate_status_change_email_template(CANDIDATE, JOB, CLIENT, "REJECTED", "r@x.com")
+        assert "background: #ef4444;" in body
+        assert "Asha Rao" in body
+
+    def test_invitation_meeting_link_optional(self):
+        interview = {"scheduled_at": "2026-10-20T10:00:00Z", "duration_minutes": 45, "meeting_link": "https://meet.test/abc"}
+        _, body = get_interview_invitation_email_template(CANDIDATE, JOB, CLIENT, interview)
+        assert 'href="https://meet.test/abc"' in body
+        assert "10:45 AM" in body
+
+        _, body = get_interview_invitation_email_template(CANDIDATE, JOB, CLIENT, {**interview, "meeting_link": ""})
+        assert "Meeting details will be shared before the interview." in body
+
+    def test_interview_reminder(self):
+        interview = {"interview_mode": "Video", "interview_duration": 45, "meeting_link": "https://meet.test/abc"}
+        subject, body = get_interview_reminder_email_template(
+            interview, CANDIDATE, JOB, CLIENT, "Monday, November 02, 2026 at 03:30 PM", "Asia/Kolkata", "in 1 hour"
+        )
+        assert subject == "Reminder: Backend Engineer interview in 1 hour"
+        assert "Hi Asha" in body
+        assert "03:30 PM" in body
+        assert 'href="https://meet.test/abc"' in body
+
+        _, body = get_interview_reminder_email_template(
+            {**interview, "meeting_link": None}, CANDIDATE, JOB, CLIENT, "soon", "UTC", "tomorrow"
+        )
+        assert "Meeting Link" not in body
+
+    def test_values_are_html_escaped(self):
+        _, body = get_client_user_welcome_email_template(
+            "<script>alert(1)</script>", "R&D Labs", "a@b.com", "pw", "https://portal.test"
+        )
+        assert "<script>alert(1)</script>" not in body
+        assert "&lt;script&gt;" in body
+        assert "R&amp;D Labs" in body
+
+
+class TestNotificationDigest:
+    """Queued notification emails are coalesced into one digest"""
+
+    def test_digest_groups_by_category(self):
+        from datetime import datetime, timezone, timedelta
+        from notification_digest import build_digest
+
+        now = datetime.now(timezone.utc)
+        entries = [
+            {"category": "new_job", "summary": "New Job: R&D Lead", "created_at": now},
+            {"category": "candidate_status_change", "summary": "Asha Rao - SHORTLISTED", "created_at": now - timedelta(minutes=5)},
+            {"category": "candidate_status_change", "summary": "Ravi K - REJECTED", "created_at": now - timedelta(minutes=2)},
+        ]
+        subject, body = build_digest(entries)
+
+        assert subject == "Arbeit digest: 3 updates"
+        assert "New Jobs (1)" in body
+        assert "Candidate Status Changes (2)" in body
+        assert "R&amp;D Lead" in body
+        assert body.index("Asha Rao") < body.index("Ravi K")
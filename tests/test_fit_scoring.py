@@ -0,0 +1,131 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from fit_scoring import calculate_fit_score, score_candidates, rank_candidates
+from skill_taxonomy import skill_ids
+
+JOB = {
+    "title": "Senior Python Developer",
+    "required_skills": ["Python", "Django", "AWS", "React"],
+    "experience_range": {"min_years": 4, "max_years": 8}
+}
+
+SKILLS = ['python', 'java', 'javascript', 'java script', 'react', 'react native', 'node', 'node.js',
+          'sql', 'mysql', 'aws', 'docker', 'go', 'c', 'c++', '', 'ml', 'machine learning', 'kubernetes']
+ROLES = ['Senior Software Engineer', 'Backend Developer', 'Product Manager', 'Data Analyst',
+         'UX Designer', 'Team Lead', 'Consultant', '', 'QA Engineer', 'programmer', None]
+TITLES = ['Software Engineer', 'Backend Developer - Python', 'Engineering Manager',
+          'Business Analyst', 'UI/UX Designer', '']
+DURATIONS = ['2019 - 2022', 'Jan 2020 - Present', '2015-2018', '3 years', '2018 - current',
+             '', '2010 - 2012 - 2014', '2021-']
+
+
+def random_candidate(rng):
+    return {
+        "skills": [
+            rng.choice(SKILLS).upper() if rng.random() < 0.3 else rng.choice(SKILLS) + (' ' if rng.random() < 0.2 else '')
+            for _ in range(rng.randint(0, 8))
+        ],
+        "experience": [{"duration": rng.choice(DURATIONS)} for _ in range(rng.randint(0, 6))],
+        "current_role": rng.choice(ROLES)
+    }
+
+
+class TestCalculateFitScore:
+    """Scalar fit score keeps its documented weighting"""
+
+    def test_perfect_match(self):
+        candidate = {"skills": ["python", "Django", "aws", "react"],
+                     "experience": [{"duration": "2018 - 2024"}], "current_role": "Python Developer"}
+        assert calculate_fit_score(candidate, JOB) == 100
+
+    def test_partial_skill_and_related_role(self):
+        candidate = {"skills": ["React Native", "Java"],
+                     "experience": [{"duration": "2022 - Present"}], "current_role": "Software Engineer"}
+        assert calculate_fit_score(candidate, JOB) == 38
+
+    def test_floor_is_twenty(self):
+        candidate = {"skills": [], "experience": [], "current_role": "Accountant"}
+        assert calculate_fit_score(candidate, JOB) == 20
+
+    def test_direct_match_uses_stored_skill_ids(self):
+        candidate = {"skills": ["python", "Django", "aws", "react"], "experience": [{"duration": "2018 - 2024"}],
+                     "current_role": "Python Developer"}
+        stored = {**candidate, "skill_ids": skill_ids(["python", "django"])}
+        assert calculate_fit_score(stored, JOB) < calculate_fit_score(candidate, JOB) == 100
+
+
+class TestBatchScoring:
+    """Batch scorer matches the scalar scorer exactly"""
+
+    def test_matches_scalar_on_random_inputs(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            job = {
+                "title": rng.choice(TITLES),
+                "required_skills": rng.sample(SKILLS, rng.randint(0, 6)),
+                "experience_range": {"min_years": rng.randint(0, 8), "max_years": rng.randint(8, 15)}
+            }
+            candidates = [random_candidate(rng) for _ in range(40)]
+            expected = [calculate_fit_score(c, job) for c in candidates]
+            assert list(score_candidates(job, candidates)) == expected
+
+    def test_matches_scalar_with_stored_skill_ids(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            job = {
+                "title": rng.choice(TITLES),
+                "required_skills": rng.sample(SKILLS, rng.randint(0, 6)),
+                "experience_range": {"min_years": rng.randint(0, 8), "max_years": rng.randint(8, 15)}
+            }
+            candidates = [random_candidate(rng) for _ in range(40)]
+            for candidate in candidates:
+                # Stored IDs that agree with the names, drifted from them, or are missing
+                roll = rng.random()
+                if roll < 0.4:
+                    candidate["skill_ids"] = skill_ids(candidate["skills"])
+                elif roll < 0.8:
+                    candidate["skill_ids"] = skill_ids(rng.sample(SKILLS, rng.randint(0, 5)))
+            expected = [calculate_fit_score(c, job) for c in candidates]
+            assert list(score_candidates(job, candidates)) == expected
+
+    def test_empty_candidate_list(self):
+        assert len(score_candidates(JOB, [])) == 0
+        assert rank_candidates(JOB, []) == []
+
+    def test_rank_orders_best_first_and_is_stable(self):
+        weak = {"candidate_id": "weak", "skills": [], "experience": [], "current_role": "Accountant"}
+        strong = {"candidate_id": "strong", "skills": ["python", "django", "aws", "react"],
+                  "experience": [{"duration": "2018 - 2024"}], "current_role": "Python Developer"}
+        weak_again = dict(weak, candidate_id="weak_again")
+
+        ranked = rank_candidates(JOB, [weak, strong, weak_again])
+        assert [c["candidate_id"] for c, _ in ranked] == ["strong", "weak", "weak_again"]
+        assert [score for _, score in ranked] == [100, 20, 20]
+
+
+class TestRescoringSignatures:
+    """Rescoring only touches candidates whose scoring inputs changed"""
+
+    def test_job_update_detection(self):
+        from fit_rescoring import scoring_inputs_changed
+
+        assert not scoring_inputs_changed(JOB, {"description": "new text"})
+        assert not scoring_inputs_changed(JOB, {"title": JOB["title"]})
+        assert scoring_inputs_changed(JOB, {"required_skills": ["Python"]})
+        assert scoring_inputs_changed(JOB, {"experience_range": {"min_years": 2, "max_years": 8}})
+
+    def test_signature_tracks_inputs(self):
+        from fit_rescoring import fit_score_signature, job_signature
+
+        candidate = {"candidate_id": "c1", "skills": ["python"], "experience": [], "current_role": "Developer",
+                     "status": "NEW"}
+        sig = fit_score_signature(job_signature(JOB), candidate)
+
+        # Fields outside the scoring inputs don't matter
+        assert fit_score_signature(job_signature({**JOB, "description": "x"}), {**candidate, "status": "REJECT"}) == sig
+        assert fit_score_signature(job_signature(JOB), {**candidate, "skills": ["python", "aws"]}) != sig
+        assert fit_score_signature(job_signature({**JOB, "title": "Data Engineer"}), candidate) != sig
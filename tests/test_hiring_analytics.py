@@ -0,0 +1,267 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from hiring_analytics import events_frame, funnel_metrics, get_hiring_funnel, parse_period, sync_hiring_events
+
+OCT = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def day(n, hours=0):
+    return OCT + timedelta(days=n - 1, hours=hours)
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class BulkResult:
+    def __init__(self, upserted, modified):
+        self.upserted_count = upserted
+        self.modified_count = modified
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if _matches(d, query)), None)
+        if doc is None:
+            doc = dict(query)
+            self.docs.append(doc)
+        doc.update(update.get("$set", {}))
+        for field, n in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + n
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted = modified = 0
+        for op in operations:
+            doc = next((d for d in self.docs if _matches(d, op._filter)), None)
+            if doc is None:
+                self.docs.append({**op._filter, **op._doc["$set"]})
+                upserted += 1
+            elif any(doc.get(k) != v for k, v in op._doc["$set"].items()):
+                doc.update(op._doc["$set"])
+                modified += 1
+        return BulkResult(upserted, modified)
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def audit(log_id, action_type, interview_id, when, user="recruiter@arbeit.com", role="recruiter"):
+    return {"log_id": log_id, "action_type": action_type, "entity_id": interview_id, "client_id": "client_1",
+            "timestamp": when.isoformat(), "user_email": user, "user_role": role}
+
+
+def make_db():
+    return FakeDb(
+        jobs=FakeCollection([{"job_id": "job_1", "client_id": "client_1"}]),
+        candidates=FakeCollection([
+            {"candidate_id": f"cand_{i}", "job_id": "job_1", "created_at": day(i).isoformat(),
+             "created_by": "recruiter@arbeit.com"}
+            for i in (1, 2, 3)
+        ]),
+        reviews=FakeCollection([
+            {"review_id": "rev_1", "candidate_id": "cand_1", "action": "APPROVE", "timestamp": day(2).isoformat(),
+             "user_id": "client@acme.com", "user_role": "client_user"},
+            {"review_id": "rev_2", "candidate_id": "cand_2", "action": "APPROVE", "timestamp": day(4).isoformat(),
+             "user_id": "client@acme.com", "user_role": "client_user"},
+            {"review_id": "rev_3", "candidate_id": "cand_3", "action": "REJECT", "timestamp": day(5).isoformat(),
+             "user_id": "client@acme.com", "user_role": "client_user"},
+            {"review_id": "rev_4", "candidate_id": "cand_3", "action": "COMMENT", "timestamp": day(5).isoformat()},
+        ]),
+        interviews=FakeCollection([
+            {"interview_id": "int_1", "client_id": "client_1", "job_id": "job_1", "candidate_id": "cand_1"},
+            {"interview_id": "int_2", "client_id": "client_1", "job_id": "job_1", "candidate_id": "cand_2"},
+        ]),
+        audit_logs=FakeCollection([
+            audit("log_1", "INTERVIEW_CREATE", "int_1", day(3)),
+            audit("log_2", "INTERVIEW_SLOT_BOOKED", "int_1", day(4), "candidate-booking", "candidate"),
+            audit("log_3", "INTERVIEW_COMPLETED", "int_1", day(6)),
+            audit("log_4", "HIRING_INITIATED", "int_1", day(11)),
+            audit("log_5", "INTERVIEW_CREATE", "int_2", day(5)),
+            audit("log_6", "INTERVIEW_NO_SHOW", "int_2", day(8)),
+            audit("log_7", "ROLE_CREATE", None, day(8)),
+        ]),
+    )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestParsePeriod:
+    """Month, quarter and year periods"""
+
+    def test_periods(self):
+        assert parse_period("2026-10") == (OCT, datetime(2026, 11, 1, tzinfo=timezone.utc))
+        assert parse_period("2026-q4") == (OCT, datetime(2027, 1, 1, tzinfo=timezone.utc))
+        assert parse_period("2026") == (datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2027, 1, 1, tzinfo=timezone.utc))
+
+    @pytest.mark.parametrize("period", ["2026-13", "2026-Q5", "26-10", "last month"])
+    def test_invalid(self, period):
+        with pytest.raises(ValueError):
+            parse_period(period)
+
+
+class TestFunnelMetrics:
+    """Vectorized metrics over an event frame"""
+
+    def events(self):
+        rows = [
+            ("cand_1", "applied", day(1), "rec_a"), ("cand_1", "approved", day(2), "client"),
+            ("cand_1", "interview_requested", day(3), "rec_a"), ("cand_1", "hired", day(11), "rec_b"),
+            ("cand_2", "applied", day(2), "rec_a"), ("cand_2", "rejected", day(3), "client"),
+            ("cand_3", "applied", day(-5), "rec_a"), ("cand_3", "hired", day(2), "rec_b"),  # Applied before October
+        ]
+        return events_frame([
+            {"candidate_id": c, "job_id": "job_1", "stage": s, "at": at, "actor": a, "actor_role": "recruiter"}
+            for c, s, at, a in rows
+        ])
+
+    def test_cohort_funnel_counts_skipped_stages_as_passed(self):
+        metrics = funnel_metrics(self.events(), *parse_period("2026-10"))
+        assert metrics["cohort_size"] == 2
+        funnel = {f["stage"]: f for f in metrics["funnel"]}
+        assert funnel["applied"]["candidates"] == 2
+        assert funnel["approved"]["conversion"] == 0.5
+        assert funnel["interview_confirmed"]["candidates"] == 1  # cand_1 was hired without a recorded booking
+        assert funnel["hired"]["conversion"] == 1.0
+        assert metrics["exits"]["rejected"] == 1
+
+    def test_latencies(self):
+        metrics = funnel_metrics(self.events(), *parse_period("2026-10"))
+        assert metrics["time_to_hire_days"] == {"count": 1, "mean": 10.0, "median": 10.0, "p90": 10.0}
+        assert metrics["stage_latency_days"]["applied->approved"]["median"] == 1.0
+        assert metrics["stage_latency_days"]["interview_confirmed->interview_completed"] is None
+
+    def test_recruiter_throughput_counts_events_in_period(self):
+        metrics = funnel_metrics(self.events(), *parse_period("2026-10"))
+        recruiters = {r["actor"]: r for r in metrics["recruiters"]}
+        assert recruiters["rec_a"]["stages"] == {"applied": 2, "interview_requested": 1}
+        assert recruiters["rec_b"]["stages"] == {"hired": 2}
+        assert metrics["by_job"] == [{"job_id": "job_1", "funnel": {
+            "applied": 2, "approved": 1, "interview_requested": 1, "interview_confirmed": 1,
+            "interview_completed": 1, "interview_passed": 1, "hired": 1,
+        }}]
+
+    def test_empty(self):
+        metrics = funnel_metrics(events_frame([]), *parse_period("2026-10"))
+        assert metrics["cohort_size"] == 0
+        assert metrics["time_to_hire_days"] is None
+        assert metrics["recruiters"] == []
+
+
+class TestSync:
+    """Stage transitions are folded into the event table incrementally"""
+
+    def test_sync_builds_events(self):
+        db = make_db()
+        counts = run(sync_hiring_events(db))
+        assert counts == {"candidates": 3, "reviews": 3, "audit_logs": 6}
+        stages = {e["event_id"]: (e["stage"], e["candidate_id"], e["client_id"]) for e in db.hiring_events.docs}
+        assert stages["applied:cand_1"] == ("applied", "cand_1", "client_1")
+        assert stages["review:rev_3"] == ("rejected", "cand_3", "client_1")
+        assert stages["audit:log_4"] == ("hired", "cand_1", "client_1")
+        assert "review:rev_4" not in stages and "audit:log_7" not in stages
+
+    def test_resync_reads_from_watermark_and_writes_nothing_new(self):
+        db = make_db()
+        run(sync_hiring_events(db))
+        version = run(db.hiring_analytics_state.find_one({"_id": "hiring_events"}))["version"]
+
+        assert run(sync_hiring_events(db)) == {"candidates": 0, "reviews": 0, "audit_logs": 0}
+        assert db.audit_logs.queries[-1]["timestamp"] == {"$gte": (day(11) - timedelta(minutes=5)).isoformat()}
+        assert run(db.hiring_analytics_state.find_one({"_id": "hiring_events"}))["version"] == version
+
+        db.audit_logs.docs.append(audit("log_8", "INTERVIEW_COMPLETED", "int_2", day(12)))
+        assert run(sync_hiring_events(db))["audit_logs"] == 1
+        assert run(db.hiring_analytics_state.find_one({"_id": "hiring_events"}))["version"] == version + 1
+
+
+class TestCachedFunnel:
+    """Results are cached per client, job and period until new events arrive"""
+
+    def test_cache_until_sync_writes_events(self):
+        db = make_db()
+        run(sync_hiring_events(db))
+        first = run(get_hiring_funnel(db, "client_1", "2026-10"))
+        assert first["cohort_size"] == 3
+        assert {f["stage"]: f["candidates"] for f in first["funnel"]}["hired"] == 1
+        reads = len(db.hiring_events.queries)
+
+        assert run(get_hiring_funnel(db, "client_1", "2026-10")) == first
+        assert len(db.hiring_events.queries) == reads
+
+        db.audit_logs.docs.append(audit("log_8", "HIRING_INITIATED", "int_2", day(20)))
+        run(sync_hiring_events(db))
+        updated = run(get_hiring_funnel(db, "client_1", "2026-10"))
+        assert {f["stage"]: f["candidates"] for f in updated["funnel"]}["hired"] == 2
+        assert len(db.hiring_events.queries) == reads + 1
+
+    def test_events_are_read_by_client_and_bounded_range(self):
+        db = make_db()
+        run(sync_hiring_events(db))
+        run(get_hiring_funnel(db, "client_1", "2026-10", job_id="job_1"))
+        query = db.hiring_events.queries[-1]
+        assert query["client_id"] == "client_1" and query["job_id"] == "job_1"
+        assert query["at"]["$gte"] == OCT
+        assert query["at"]["$lt"] == datetime(2026, 11, 1, tzinfo=timezone.utc) + timedelta(days=180)
@@ -0,0 +1,155 @@
+import asyncio
+import random
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from interview_availability import (
+    IntervalIndex, find_slot_conflicts, parse_time, schedule_fields, suggest_free_slots
+)
+
+BASE = datetime(2026, 11, 2, tzinfo=timezone.utc)
+
+
+def at(hours, minutes=0):
+    return BASE + timedelta(hours=hours, minutes=minutes)
+
+
+def index_of(*spans):
+    """Index of (start_hour, end_hour) spans; hours may be fractional"""
+    return IntervalIndex((at(s), at(e), {"id": i}) for i, (s, e) in enumerate(spans))
+
+
+class FakeInterviews:
+    """Returns every stored interview; the interval index does the filtering"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        docs = self.docs
+
+        async def iterate():
+            for doc in docs:
+                yield doc
+        return iterate()
+
+
+def fake_db(docs):
+    return type("FakeDb", (), {"interviews": FakeInterviews(docs)})()
+
+
+class TestParseTime:
+    """Slot times arrive as ISO strings in several shapes"""
+
+    def test_formats(self):
+        expected = datetime(2026, 11, 2, 10, tzinfo=timezone.utc)
+        assert parse_time("2026-11-02T10:00:00Z") == expected
+        assert parse_time("2026-11-02T15:30:00+05:30") == expected
+        assert parse_time("2026-11-02T10:00:00") == expected
+        assert parse_time(datetime(2026, 11, 2, 10)) == expected
+
+    def test_invalid(self):
+        assert parse_time(None) is None
+        assert parse_time("next tuesday") is None
+
+    def test_schedule_fields(self):
+        fields = schedule_fields("2026-11-02T10:00:00Z", "2026-11-02T11:00:00Z")
+        assert fields == {"scheduled_start_at": at(10), "scheduled_end_at": at(11)}
+
+
+class TestIntervalIndex:
+    """Overlap queries over [start, end) intervals"""
+
+    def test_overlapping(self):
+        index = index_of((9, 10), (10, 11), (13, 15))
+        assert [i["id"] for i in index.overlapping(at(9, 30), at(10, 30))] == [0, 1]
+        assert [i["id"] for i in index.overlapping(at(14), at(14, 30))] == [2]
+        assert index.overlapping(at(11), at(13)) == []
+
+    def test_touching_intervals_do_not_overlap(self):
+        index = index_of((9, 10))
+        assert index.overlapping(at(10), at(11)) == []
+        assert index.overlapping(at(8), at(9)) == []
+
+    def test_long_interval_starting_well_before(self):
+        index = index_of((1, 20), (9, 10))
+        assert [i["id"] for i in index.overlapping(at(15), at(16))] == [0]
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        spans = []
+        for _ in range(300):
+            start = rng.randrange(0, 24 * 60 * 7, 15) / 60
+            spans.append((start, start + rng.choice([15, 30, 60, 240]) / 60))
+        index = index_of(*spans)
+        for _ in range(200):
+            start = at(0, rng.randrange(0, 24 * 60 * 7, 5))
+            end = start + timedelta(minutes=rng.choice([30, 60, 90]))
+            expected = [i for i, (s, e) in enumerate(spans) if at(s) < end and at(e) > start]
+            assert sorted(i["id"] for i in index.overlapping(start, end)) == expected
+
+    def test_busy_periods_are_merged(self):
+        index = index_of((9, 10), (9.5, 10.5), (10.5, 11), (14, 15))
+        assert index.busy_periods(at(8), at(18)) == [(at(9), at(11)), (at(14), at(15))]
+        assert index.busy_periods(at(9, 30), at(14, 30)) == [(at(9, 30), at(11)), (at(14), at(14, 30))]
+
+    def test_free_slots_skip_busy_time(self):
+        index = index_of((10, 11), (12, 15))
+        slots = index.free_slots(at(9), at(13), timedelta(hours=1), timedelta(minutes=30), limit=10)
+        assert slots == [(at(9), at(10)), (at(11), at(12))]
+
+    def test_free_slots_snap_to_grid_and_limit(self):
+        index = index_of((9, 9 + 50 / 60))
+        slots = index.free_slots(at(9), at(12), timedelta(minutes=30), timedelta(minutes=30), limit=3)
+        assert slots == [(at(10), at(10, 30)), (at(10, 30), at(11)), (at(11), at(11, 30))]
+
+
+class TestSlotConflicts:
+    """Proposed slots are checked against scheduled interviews"""
+
+    docs = [
+        {"interview_id": "int_cand", "candidate_id": "cand_1", "job_id": "job_2", "client_id": "client_1",
+         "scheduled_start_at": at(10), "scheduled_end_at": at(11)},
+        {"interview_id": "int_job", "candidate_id": "cand_9", "job_id": "job_1", "client_id": "client_1",
+         "scheduled_start_at": datetime(2026, 11, 2, 14), "scheduled_end_at": datetime(2026, 11, 2, 15)},
+    ]
+
+    def test_conflicts_with_scope(self):
+        slots = [
+            {"start_time": "2026-11-02T10:30:00Z", "end_time": "2026-11-02T11:30:00Z"},
+            {"start_time": "2026-11-02T12:00:00Z", "end_time": "2026-11-02T13:00:00Z"},
+            {"start_time": "2026-11-02T19:45:00+05:30", "end_time": "2026-11-02T20:45:00+05:30"},
+        ]
+        conflicts = asyncio.run(find_slot_conflicts(fake_db(self.docs), "client_1", "job_1", "cand_1", slots))
+        assert [(c["slot_index"], c["interview_id"], c["scope"]) for c in conflicts] == [
+            (0, "int_cand", "candidate"), (2, "int_job", "job")
+        ]
+
+    def test_unparseable_slots_are_ignored(self):
+        slots = [{"start_time": "soon", "end_time": "later"}]
+        assert asyncio.run(find_slot_conflicts(fake_db(self.docs), "client_1", "job_1", "cand_1", slots)) == []
+
+
+class TestSuggestFreeSlots:
+    """Free slots within a client's working hours"""
+
+    def test_suggestions_avoid_scheduled_interviews(self):
+        day = date(2099, 11, 2)  # A Monday in the future
+        docs = [{"interview_id": "int_1", "scheduled_start_at": datetime(2099, 11, 2, 4, 30),
+                 "scheduled_end_at": datetime(2099, 11, 2, 6, 30)}]  # 10:00-12:00 in Asia/Kolkata
+        slots = asyncio.run(suggest_free_slots(
+            fake_db(docs), "client_1", day, day, duration_minutes=60, work_start_hour=9, work_end_hour=13, limit=10
+        ))
+        assert [(s["start_time"], s["end_time"]) for s in slots] == [
+            ("2099-11-02T03:30:00+00:00", "2099-11-02T04:30:00+00:00"),
+            ("2099-11-02T06:30:00+00:00", "2099-11-02T07:30:00+00:00"),
+        ]
+
+    def test_weekends_are_skipped_by_default(self):
+        saturday = date(2099, 11, 7)
+        assert asyncio.run(suggest_free_slots(fake_db([]), "client_1", saturday, saturday)) == []
+        assert asyncio.run(suggest_free_slots(fake_db([]), "client_1", saturday, saturday, limit=3,
+                                              include_weekends=True)) != []
@@ -0,0 +1,152 @@
+import asyncio
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from interview_booking import (
+    BOOKABLE_STATUS, BookingError, book_slot, bookable_slot, booking_filter, booking_update
+)
+
+
+def make_interview(**overrides):
+    interview = {
+        "interview_id": "int_1",
+        "interview_status": BOOKABLE_STATUS,
+        "proposed_slots": [
+            {"slot_id": "slot_a", "start_time": "2026-11-02T10:00:00Z", "end_time": "2026-11-02T11:00:00Z",
+             "is_available": True},
+            {"slot_id": "slot_b", "start_time": "2026-11-03T10:00:00Z", "end_time": "2026-11-03T11:00:00Z"},
+        ],
+    }
+    interview.update(overrides)
+    return interview
+
+
+def _matches_elem(slot, conditions):
+    for field, expected in conditions.items():
+        if isinstance(expected, dict):
+            if slot.get(field) == expected["$ne"]:
+                return False
+        elif slot.get(field) != expected:
+            return False
+    return True
+
+
+class AtomicInterviews:
+    """Interviews collection that applies each update_one atomically, like MongoDB"""
+
+    def __init__(self, interview):
+        self.doc = copy.deepcopy(interview)
+
+    def _matches(self, query):
+        doc = self.doc
+        if doc["interview_id"] != query["interview_id"] or doc["interview_status"] != query["interview_status"]:
+            return False
+        conditions = query["proposed_slots"]["$elemMatch"]
+        return any(_matches_elem(slot, conditions) for slot in doc["proposed_slots"])
+
+    async def update_one(self, query, update, array_filters=None):
+        await asyncio.sleep(0)  # Let every concurrent booking reach the database first
+        modified = self._matches(query)
+        if modified:
+            slot_id = array_filters[0]["slot.slot_id"]
+            for field, value in update["$set"].items():
+                if field == "proposed_slots.$[slot].is_available":
+                    for slot in self.doc["proposed_slots"]:
+                        if slot["slot_id"] == slot_id:
+                            slot["is_available"] = value
+                else:
+                    self.doc[field] = value
+        return type("UpdateResult", (), {"modified_count": int(modified)})()
+
+    async def find_one(self, query, projection=None):
+        return copy.deepcopy(self.doc) if query["interview_id"] == self.doc["interview_id"] else None
+
+
+def fake_db(interview):
+    return type("FakeDb", (), {"interviews": AtomicInterviews(interview)})()
+
+
+async def book_concurrently(db, snapshot, slot_ids, confirmed=True):
+    """Every booking starts from the same stale read of the interview"""
+    async def attempt(slot_id):
+        try:
+            await book_slot(db, copy.deepcopy(snapshot), slot_id, confirmed)
+            return "booked"
+        except BookingError as e:
+            return e.status_code
+    return await asyncio.gather(*(attempt(slot_id) for slot_id in slot_ids))
+
+
+class TestBookableSlot:
+    """Pre-checks on the interview as read"""
+
+    def test_available_slot(self):
+        assert bookable_slot(make_interview(), "slot_a")["slot_id"] == "slot_a"
+        # Slots without the flag are available
+        assert bookable_slot(make_interview(), "slot_b")["slot_id"] == "slot_b"
+
+    def test_errors(self):
+        with pytest.raises(BookingError) as e:
+            bookable_slot(make_interview(interview_status="Confirmed"), "slot_a")
+        assert e.value.status_code == 400
+        with pytest.raises(BookingError) as e:
+            bookable_slot(make_interview(), "slot_missing")
+        assert (e.value.status_code, e.value.detail) == (404, "Slot not found")
+        interview = make_interview()
+        interview["proposed_slots"][0]["is_available"] = False
+        with pytest.raises(BookingError) as e:
+            bookable_slot(interview, "slot_a")
+        assert e.value.detail == "Slot is no longer available"
+
+
+class TestConditionalUpdate:
+    """The update only matches a bookable interview and an unchanged free slot"""
+
+    def test_filter(self):
+        slot = make_interview()["proposed_slots"][0]
+        query = booking_filter("int_1", slot)
+        assert query["interview_status"] == BOOKABLE_STATUS
+        assert query["proposed_slots"]["$elemMatch"]["slot_id"] == "slot_a"
+        assert query["proposed_slots"]["$elemMatch"]["is_available"] == {"$ne": False}
+
+    def test_update_touches_only_the_booked_slot(self):
+        slot = make_interview()["proposed_slots"][0]
+        update = booking_update(slot, True, "now")["$set"]
+        assert "proposed_slots" not in update
+        assert update["proposed_slots.$[slot].is_available"] is False
+        assert update["interview_status"] == "Confirmed"
+        assert booking_update(slot, False, "now")["$set"]["interview_status"] == BOOKABLE_STATUS
+
+
+class TestConcurrentBookings:
+    """Simultaneous bookings from stale reads: exactly one wins"""
+
+    def test_same_slot_hundreds_of_times(self):
+        interview = make_interview()
+        db = fake_db(interview)
+        results = asyncio.run(book_concurrently(db, interview, ["slot_a"] * 300))
+        assert results.count("booked") == 1
+        assert results.count(400) == 299
+        assert db.interviews.doc["interview_status"] == "Confirmed"
+        assert db.interviews.doc["selected_slot_id"] == "slot_a"
+        assert db.interviews.doc["proposed_slots"][0]["is_available"] is False
+
+    def test_different_slots_race_for_one_confirmation(self):
+        interview = make_interview()
+        db = fake_db(interview)
+        results = asyncio.run(book_concurrently(db, interview, ["slot_a", "slot_b"] * 150))
+        assert results.count("booked") == 1
+        booked = db.interviews.doc["selected_slot_id"]
+        assert [s["slot_id"] for s in db.interviews.doc["proposed_slots"] if s.get("is_available") is False] == [booked]
+
+    def test_unconfirmed_bookings_each_get_a_distinct_slot(self):
+        interview = make_interview()
+        db = fake_db(interview)
+        results = asyncio.run(book_concurrently(db, interview, ["slot_a", "slot_b"] * 100, confirmed=False))
+        assert results.count("booked") == 2
+        assert all(s["is_available"] is False for s in db.interviews.doc["proposed_slots"])
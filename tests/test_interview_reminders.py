@@ -0,0 +1,212 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from interview_reminders import (
+    describe_lead_time, dispatch_due_reminders, reminder_documents, schedule_reminders
+)
+
+NOW = datetime(2026, 11, 2, 8, 0, tzinfo=timezone.utc)
+START = NOW + timedelta(days=2)
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$lte" and not (value is not None and value <= operand):
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _apply(doc, update):
+    doc.update(update.get("$set", {}))
+    for field in update.get("$unset", {}):
+        doc.pop(field, None)
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+
+class FakeCollection:
+    """Just the query and update operators the reminder scheduler uses"""
+
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply(doc, update)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            matched = [d for d in self.docs if _matches(d, op._filter)]
+            if not matched and op._upsert:
+                doc = dict(op._filter)
+                self.docs.append(doc)
+                matched = [doc]
+            for doc in matched[:1]:
+                _apply(doc, op._doc)
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def make_db(status="Confirmed", start=START, phone="+91 98765 43210"):
+    return FakeDb(
+        interviews=FakeCollection([{
+            "interview_id": "int_1", "job_id": "job_1", "client_id": "client_1", "interview_status": status,
+            "interview_mode": "Video", "interview_duration": 60, "time_zone": "Asia/Kolkata",
+            "scheduled_start_time": START.isoformat(), "scheduled_start_at": start.replace(tzinfo=None),
+        }]),
+        candidates=FakeCollection([{"candidate_id": "cand_1", "name": "Asha Rao", "email": "asha@example.com",
+                                    "phone": phone}]),
+        jobs=FakeCollection([{"job_id": "job_1", "title": "Backend Engineer"}]),
+        clients=FakeCollection([{"client_id": "client_1", "company_name": "Acme Corp"}]),
+        interview_reminders=FakeCollection(),
+    )
+
+
+class RecordingSender:
+    def __init__(self, success=True):
+        self.success = success
+        self.calls = []
+
+    async def __call__(self, to, *content):
+        self.calls.append((to, content))
+        return {"success": True} if self.success else {"success": False, "error": "provider down"}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestScheduling:
+    """Reminder documents per channel and offset"""
+
+    def test_reminder_documents(self):
+        docs = reminder_documents("int_1", "cand_1", START, NOW, offsets=[1440, 60], channels=["email", "sms"])
+        assert [(d["reminder_type"], d["offset_minutes"]) for d in docs] == [
+            ("email", 1440), ("sms", 1440), ("email", 60), ("sms", 60)
+        ]
+        assert docs[0]["scheduled_time"] == START - timedelta(days=1)
+        assert docs[0]["sent"] is False and docs[0]["status"] == "pending"
+
+    def test_past_offsets_are_skipped(self):
+        soon = NOW + timedelta(minutes=90)
+        docs = reminder_documents("int_1", "cand_1", soon, NOW, offsets=[1440, 60], channels=["email"])
+        assert [d["offset_minutes"] for d in docs] == [60]
+
+    def test_scheduling_is_idempotent_and_follows_reschedules(self):
+        db = make_db()
+        assert run(schedule_reminders(db, "int_1", "cand_1", START, NOW, [1440, 60], ["email"])) == 2
+        assert run(schedule_reminders(db, "int_1", "cand_1", START.isoformat(), NOW, [1440, 60], ["email"])) == 0
+
+        later = START + timedelta(hours=3)
+        assert run(schedule_reminders(db, "int_1", "cand_1", later, NOW, [1440, 60], ["email"])) == 2
+        reminders = db.interview_reminders.docs
+        assert len(reminders) == 2
+        assert all(r["interview_start"] == later for r in reminders)
+
+    def test_lead_time_text(self):
+        assert describe_lead_time(timedelta(days=1)) == "tomorrow"
+        assert describe_lead_time(timedelta(days=2, minutes=3)) == "in 2 days"
+        assert describe_lead_time(timedelta(hours=1)) == "in 1 hour"
+        assert describe_lead_time(timedelta(minutes=30)) == "in 30 minutes"
+
+
+class TestDispatch:
+    """Due reminders are claimed in batches, sent and their status persisted"""
+
+    def schedule(self, db, channels=("email", "sms")):
+        run(schedule_reminders(db, "int_1", "cand_1", START, NOW, [1440, 60], list(channels)))
+
+    def test_only_due_reminders_are_sent(self):
+        db = make_db()
+        self.schedule(db)
+        email, sms = RecordingSender(), RecordingSender()
+        counts = run(dispatch_due_reminders(db, NOW + timedelta(days=1), senders={"email": email, "sms": sms}))
+        assert counts == {"sent": 2}
+        assert email.calls[0][0] == "asha@example.com"
+        assert "tomorrow" in email.calls[0][1][0]
+        assert sms.calls[0][0] == "+91 98765 43210"
+
+        by_offset = {(r["reminder_type"], r["offset_minutes"]): r for r in db.interview_reminders.docs}
+        assert by_offset[("email", 1440)]["status"] == "sent"
+        assert by_offset[("email", 1440)]["sent"] is True
+        assert by_offset[("email", 60)]["status"] == "pending"
+        assert "claim_id" not in by_offset[("email", 1440)]
+
+    def test_batches_cover_every_due_reminder(self):
+        db = make_db()
+        self.schedule(db)
+        email, sms = RecordingSender(), RecordingSender()
+        counts = run(dispatch_due_reminders(db, START - timedelta(minutes=30), batch_size=1,
+                                            senders={"email": email, "sms": sms}))
+        assert counts == {"sent": 4}
+        assert len(email.calls) == 2 and len(sms.calls) == 2
+
+    def test_failures_are_retried_then_marked_failed(self):
+        db = make_db()
+        self.schedule(db, channels=["email"])
+        failing = RecordingSender(success=False)
+        tick = START - timedelta(minutes=59)
+        for _ in range(3):
+            run(dispatch_due_reminders(db, tick, senders={"email": failing, "sms": failing}))
+            tick += timedelta(minutes=5)
+        reminder = next(r for r in db.interview_reminders.docs if r["offset_minutes"] == 60)
+        assert reminder["status"] == "failed"
+        assert reminder["attempts"] == 3
+        assert reminder["delivery_status"] == "provider down"
+
+    def test_cancelled_or_moved_interviews_are_not_reminded(self):
+        for db in (make_db(status="Cancelled"), make_db(start=START + timedelta(hours=1))):
+            self.schedule(db, channels=["email"])
+            email = RecordingSender()
+            counts = run(dispatch_due_reminders(db, NOW + timedelta(days=1), senders={"email": email, "sms": email}))
+            assert counts == {"cancelled": 1}
+            assert email.calls == []
+
+    def test_missing_phone_fails_sms_only(self):
+        db = make_db(phone=None)
+        self.schedule(db)
+        sender = RecordingSender()
+        counts = run(dispatch_due_reminders(db, NOW + timedelta(days=1), senders={"email": sender, "sms": sender}))
+        assert counts == {"sent": 1, "failed": 1}
@@ -0,0 +1,252 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from job_deletion import DELETING, count_dependents, delete_job_cascade, is_deleting, resume_interrupted_deletions
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class DeleteResult:
+    def __init__(self, n):
+        self.deleted_count = n
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.calls = 0
+
+    def find(self, query, projection=None):
+        self.calls += 1
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def count_documents(self, query):
+        return len([d for d in self.docs if _matches(d, query)])
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                return
+
+    async def delete_many(self, query):
+        self.calls += 1
+        kept = [d for d in self.docs if not _matches(d, query)]
+        deleted = len(self.docs) - len(kept)
+        self.docs = kept
+        return DeleteResult(deleted)
+
+    async def delete_one(self, query):
+        self.calls += 1
+        for doc in self.docs:
+            if _matches(doc, query):
+                self.docs.remove(doc)
+                return DeleteResult(1)
+        return DeleteResult(0)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            doc = next((d for d in self.docs if d["client_id"] == op._filter["client_id"]), None)
+            if doc is None:
+                doc = {"client_id": op._filter["client_id"]}
+                self.docs.append(doc)
+            for field, n in op._doc["$inc"].items():
+                doc[field] = doc.get(field, 0) + n
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+class FakeStorage:
+    def __init__(self, fail_after=None):
+        self.deleted = []
+        self.fail_after = fail_after
+
+    async def delete_files(self, urls):
+        if self.fail_after is not None and len(self.deleted) >= self.fail_after:
+            raise RuntimeError("storage unavailable")
+        urls = sorted(urls)
+        self.deleted.extend(urls)
+        return len(urls)
+
+
+def cv_url(candidate_id, n=1):
+    return f"https://res.cloudinary.com/arbeit/image/upload/v1/resumes/{candidate_id}/cv_{n}.pdf"
+
+
+def make_db(candidates=1200, interviews=30):
+    candidate_docs = [
+        {"candidate_id": f"cand_{i}", "job_id": "job_1", "cv_file_url": cv_url(f"cand_{i}", 2)}
+        for i in range(candidates)
+    ]
+    candidate_docs.append({"candidate_id": "other", "job_id": "job_2", "cv_file_url": cv_url("other")})
+    return FakeDb(
+        jobs=FakeCollection([
+            {"job_id": "job_1", "client_id": "client_1", "title": "Engineer"},
+            {"job_id": "job_2", "client_id": "client_1", "title": "Designer"},
+        ]),
+        candidates=FakeCollection(candidate_docs),
+        candidate_cv_versions=FakeCollection(
+            [{"candidate_id": f"cand_{i}", "file_url": cv_url(f"cand_{i}", n)} for i in range(candidates) for n in (1, 2)]
+            + [{"candidate_id": "other", "file_url": cv_url("other")}]
+        ),
+        reviews=FakeCollection([{"candidate_id": f"cand_{i}", "action": "APPROVE"} for i in range(candidates)]
+                               + [{"candidate_id": "other", "action": "APPROVE"}]),
+        interviews=FakeCollection([
+            {"interview_id": f"int_{i}", "job_id": "job_1", "client_id": "client_1",
+             "interview_status": "Confirmed" if i % 2 else "Completed"}
+            for i in range(interviews)
+        ]),
+        interview_reminders=FakeCollection([{"interview_id": f"int_{i}"} for i in range(interviews)]),
+        interview_risk=FakeCollection([{"interview_id": f"int_{i}"} for i in range(interviews)]),
+        interview_pipeline_counters=FakeCollection([
+            {"client_id": c, "total_interviews": interviews + 5, "confirmed": interviews // 2 + 5,
+             "completed": interviews // 2}
+            for c in ("client_1", "*")
+        ]),
+        job_skill_index=FakeCollection([{"job_id": "job_1", "skill_id": "python"}]),
+    )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestCascade:
+    """Dependents are deleted in $in batches, not one document at a time"""
+
+    def test_deletes_everything_for_the_job(self):
+        db = make_db()
+        storage = FakeStorage()
+        progress = []
+
+        async def on_progress(processed, total):
+            progress.append((processed, total))
+
+        result = run(delete_job_cascade(db, "job_1", storage, progress=on_progress))
+        assert result == {"job_id": "job_1", "candidates_deleted": 1200, "interviews_deleted": 30,
+                          "files_deleted": 2400}
+        assert [c["candidate_id"] for c in db.candidates.docs] == ["other"]
+        assert [v["candidate_id"] for v in db.candidate_cv_versions.docs] == ["other"]
+        assert [r["candidate_id"] for r in db.reviews.docs] == ["other"]
+        assert db.interviews.docs == [] and db.interview_reminders.docs == [] and db.interview_risk.docs == []
+        assert [j["job_id"] for j in db.jobs.docs] == ["job_2"]
+        assert db.job_skill_index.docs == []
+        assert cv_url("other") not in storage.deleted
+        assert progress[0] == (0, 1230) and progress[-1] == (1230, 1230)
+
+    def test_round_trips_scale_with_batches(self):
+        db = make_db()
+        run(delete_job_cascade(db, "job_1", FakeStorage(), batch_size=500))
+        # Three full or partial batches plus the final empty find
+        assert db.candidates.calls == 4 + 3
+        assert db.reviews.calls == 3
+
+    def test_counters_drop_deleted_interviews(self):
+        db = make_db()
+        run(delete_job_cascade(db, "job_1", FakeStorage()))
+        for counters in db.interview_pipeline_counters.docs:
+            assert counters["total_interviews"] == 5
+            assert counters["confirmed"] == 5
+            assert counters["completed"] == 0
+
+
+class TestResume:
+    """An interrupted deletion is finished by re-running it"""
+
+    def test_resume_after_failure(self):
+        db = make_db()
+        try:
+            run(delete_job_cascade(db, "job_1", FakeStorage(fail_after=1000), batch_size=500))
+        except RuntimeError:
+            pass
+        # One candidate batch completed; the failed batch kept its documents and the job is still flagged
+        assert run(count_dependents(db, "job_1")) == {"candidates": 700, "interviews": 0}
+        assert db.jobs.docs[0]["deletion_status"] == DELETING
+        assert is_deleting(db.jobs.docs[0]) and not is_deleting(db.jobs.docs[1]) and not is_deleting(None)
+
+        storage = FakeStorage()
+        assert run(resume_interrupted_deletions(db, storage)) == 1
+        assert run(count_dependents(db, "job_1")) == {"candidates": 0, "interviews": 0}
+        assert [j["job_id"] for j in db.jobs.docs] == ["job_2"]
+        assert len(storage.deleted) == 1400
+        assert run(resume_interrupted_deletions(db, storage)) == 0
+
+    def test_rerun_on_deleted_job_is_a_no_op(self):
+        db = make_db(candidates=3, interviews=2)
+        run(delete_job_cascade(db, "job_1", FakeStorage()))
+        assert run(delete_job_cascade(db, "job_1", FakeStorage()))["candidates_deleted"] == 0
+        assert len(db.candidates.docs) == 1
+
+
+class TestWritesDuringDeletion:
+    """Endpoints that would add to or re-index a job refuse while it is being deleted"""
+
+    ADMIN = {"email": "admin@arbeit.com", "role": "admin"}
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        import server
+        db = make_db(candidates=2, interviews=0)
+        db.jobs.docs[0]["deletion_status"] = DELETING
+        monkeypatch.setattr(server, "db", db)
+        return server
+
+    def assert_conflict(self, server, coro):
+        with pytest.raises(server.HTTPException) as excinfo:
+            run(coro)
+        assert excinfo.value.status_code == 409
+
+    def test_update_job(self, server):
+        self.assert_conflict(server, server.update_job(
+            "job_1", server.JobUpdate(required_skills=["Go"]), server.BackgroundTasks(), self.ADMIN
+        ))
+        assert server.db.job_skill_index.docs == [{"job_id": "job_1", "skill_id": "python"}]
+
+    def test_create_interview(self, server):
+        interview = server.InterviewCreate(
+            job_id="job_1", candidate_id="cand_0", interview_mode="Video", interview_duration=30,
+            proposed_slots=[{"start_time": "2026-11-02T10:00:00+00:00", "end_time": "2026-11-02T10:30:00+00:00"}]
+        )
+        self.assert_conflict(server, server.create_interview(interview, "warn", self.ADMIN))
+        assert server.db.interviews.docs == []
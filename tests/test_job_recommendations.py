@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from job_recommendations import index_fields_changed, job_postings, rank_jobs
+from skill_taxonomy import skill_id, skill_ids
+
+
+def make_job(job_id, skills, status="Active", title="Backend Engineer"):
+    return {
+        "job_id": job_id,
+        "client_id": "client_1",
+        "title": title,
+        "status": status,
+        "required_skills": skills,
+        "required_skill_ids": skill_ids(skills),
+        "experience_range": {"min_years": 2, "max_years": 6},
+    }
+
+
+class TestJobPostings:
+    """Only open jobs are indexed, one posting per canonical skill"""
+
+    def test_active_job_has_one_posting_per_skill(self):
+        postings = job_postings(make_job("job_1", ["Python", "AWS", "amazon web services"]))
+        assert [p["skill_id"] for p in postings] == [skill_id("python"), skill_id("aws")]
+        assert all(p["job_id"] == "job_1" and p["client_id"] == "client_1" for p in postings)
+
+    def test_closed_and_draft_jobs_have_no_postings(self):
+        assert job_postings(make_job("job_1", ["Python"], status="Closed")) == []
+        assert job_postings(make_job("job_1", ["Python"], status="Draft")) == []
+
+    def test_skill_ids_computed_for_jobs_without_them(self):
+        job = make_job("job_1", ["ReactJS"])
+        del job["required_skill_ids"]
+        assert [p["skill_id"] for p in job_postings(job)] == [skill_id("react")]
+
+    def test_index_fields_changed(self):
+        job = make_job("job_1", ["Python"])
+        assert index_fields_changed(job, {"status": "Closed"})
+        assert index_fields_changed(job, {"required_skills": ["Go"]})
+        assert not index_fields_changed(job, {"required_skills": ["Python"], "location": "Berlin"})
+
+
+class TestRankJobs:
+    """Jobs are ordered by fit score, then by shared skills"""
+
+    def test_best_fit_first_and_limited(self):
+        candidate = {
+            "skills": ["Python", "FastAPI", "MongoDB"],
+            "current_role": "Backend Engineer",
+            "experience": [{"duration": "2019 - 2023"}],
+        }
+        jobs = [
+            make_job("job_a", ["Python", "Java", "Kotlin", "Spring"], title="Java Developer"),
+            make_job("job_b", ["Python", "FastAPI", "MongoDB"]),
+            make_job("job_c", ["Python", "FastAPI"], title="Data Analyst"),
+        ]
+        shared = {"job_a": 1, "job_b": 3, "job_c": 2}
+
+        ranked = rank_jobs(candidate, jobs, shared, limit=2)
+
+        assert [r["job"]["job_id"] for r in ranked] == ["job_b", "job_c"]
+        assert ranked[0]["shared_skills"] == 3
+        assert ranked[0]["fit_score"] >= ranked[1]["fit_score"]
@@ -0,0 +1,255 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from no_show_risk import (
+    HistoryFold, count_at_risk, discard_interview_risk, list_at_risk, refresh_no_show_risk, risk_score
+)
+
+NOW = datetime(2026, 11, 2, 8, 0, tzinfo=timezone.utc)
+
+
+def iso(value):
+    return value.isoformat()
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, n):
+        return self
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class FakeCollection:
+    """Just the query and update operators the risk job uses"""
+
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def count_documents(self, query):
+        return sum(1 for d in self.docs if _matches(d, query))
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            matched = [d for d in self.docs if _matches(d, op._filter)]
+            if not matched and op._upsert:
+                matched = [dict(op._filter)]
+                self.docs.append(matched[0])
+            matched[0].update(op._doc["$set"])
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not _matches(d, query)]
+
+    async def delete_one(self, query):
+        for doc in self.docs:
+            if _matches(doc, query):
+                self.docs.remove(doc)
+                return
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def interview(interview_id, candidate_id, status, start=None, created=None, confirmed=None, client_id="client_1"):
+    return {
+        "interview_id": interview_id, "candidate_id": candidate_id, "job_id": "job_1", "client_id": client_id,
+        "interview_status": status, "no_show_flag": status == "No Show",
+        "created_at": iso(created or NOW - timedelta(days=30)), "updated_at": iso(NOW - timedelta(days=20)),
+        "candidate_confirmation_timestamp": iso(confirmed) if confirmed else None,
+        "scheduled_start_at": start.replace(tzinfo=None) if start else None,
+    }
+
+
+def make_db():
+    soon = NOW + timedelta(days=2)
+    return FakeDb(
+        interviews=FakeCollection([
+            # cand_1 missed two interviews and took three days to confirm the next one
+            interview("int_old_1", "cand_1", "No Show"),
+            interview("int_old_2", "cand_1", "No Show"),
+            interview("int_risky", "cand_1", "Confirmed", start=soon, created=NOW - timedelta(days=4),
+                      confirmed=NOW - timedelta(days=1)),
+            # cand_2 always turns up, confirmed quickly and answered the reminder
+            interview("int_old_3", "cand_2", "Completed"),
+            interview("int_safe", "cand_2", "Confirmed", start=soon, created=NOW - timedelta(days=2),
+                      confirmed=NOW - timedelta(days=2, hours=-1), client_id="client_2"),
+            # Too far out, and already over
+            interview("int_later", "cand_2", "Confirmed", start=NOW + timedelta(days=60)),
+            interview("int_past", "cand_1", "Confirmed", start=NOW - timedelta(hours=1)),
+        ]),
+        interview_reminders=FakeCollection([
+            {"interview_id": "int_risky", "status": "sent", "sent_at": NOW - timedelta(hours=3)},
+            {"interview_id": "int_safe", "status": "sent", "sent_at": NOW - timedelta(hours=2)},
+            {"interview_id": "int_safe", "status": "pending", "sent_at": None},
+        ]),
+        reminder_responses=FakeCollection([
+            {"interview_id": "int_safe", "candidate_id": "cand_2", "response_type": "confirmed",
+             "response_timestamp": NOW - timedelta(hours=1)},
+        ]),
+        candidates=FakeCollection([
+            {"candidate_id": "cand_1", "name": "Ravi Kumar"}, {"candidate_id": "cand_2", "name": "Asha Rao"},
+        ]),
+        jobs=FakeCollection([{"job_id": "job_1", "title": "Backend Engineer"}]),
+    )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestHistory:
+    """Per-candidate no-show summaries"""
+
+    def test_summary(self):
+        fold = HistoryFold()
+        fold.add(interview("a", "cand_1", "No Show"))
+        fold.add(interview("b", "cand_1", "Completed"))
+        fold.add(interview("c", "cand_1", "Passed", created=NOW, confirmed=NOW + timedelta(hours=6)))
+        summary = fold.summary("cand_1")
+        assert summary["total_no_shows"] == 1
+        assert summary["interviews_completed"] == 2
+        assert summary["completion_rate"] == 0.667
+        assert summary["flagged"] is False
+        assert summary["last_no_show_date"] == NOW - timedelta(days=20)
+        assert summary["mean_confirmation_hours"] == 6.0
+
+    def test_no_history(self):
+        summary = HistoryFold().summary("cand_1")
+        assert summary["completion_rate"] == 1.0
+        assert summary["mean_confirmation_hours"] is None
+
+
+class TestRiskScore:
+    """Risk factors and their bounds"""
+
+    clean = {"total_no_shows": 0, "completion_rate": 1.0}
+
+    def test_reliable_candidate_scores_lowest(self):
+        confirmed = interview("i", "c", "Confirmed", created=NOW, confirmed=NOW + timedelta(hours=1))
+        assert risk_score(self.clean, confirmed, response="confirmed") == (1, [])
+
+    def test_no_reply_is_not_penalized(self):
+        slow = interview("i", "c", "Confirmed", created=NOW, confirmed=NOW + timedelta(hours=30))
+        score, factors = risk_score(self.clean, slow, response=None)
+        assert score == 2
+        assert factors == ["slow to confirm"]
+
+    def test_one_no_show_and_slow_confirmation_is_not_at_risk(self):
+        history = {"total_no_shows": 1, "completion_rate": 0.5}
+        slow = interview("i", "c", "Confirmed", created=NOW, confirmed=NOW + timedelta(hours=60))
+        assert risk_score(history, slow, response=None)[0] == 5
+
+    def test_score_is_capped(self):
+        history = {"total_no_shows": 5, "completion_rate": 0.0}
+        pending = interview("i", "c", "Awaiting Candidate Confirmation")
+        assert risk_score(history, pending, response="cannot_attend")[0] == 10
+
+
+class TestRefresh:
+    """The batch job materializes summaries and scores"""
+
+    def test_refresh_materializes_scores(self):
+        db = make_db()
+        counts = run(refresh_no_show_risk(db, now=NOW))
+        assert counts == {"candidates": 2, "upcoming_interviews": 2, "at_risk": 1}
+
+        risk = {r["interview_id"]: r for r in db.interview_risk.docs}
+        assert set(risk) == {"int_risky", "int_safe"}
+        assert risk["int_risky"]["risk_score"] == 8  # No-show history and no confirmation; an unanswered reminder adds nothing
+        assert risk["int_risky"]["at_risk"] is True
+        assert risk["int_risky"]["candidate_name"] == "Ravi Kumar"
+        assert risk["int_risky"]["reminder_response"] is False
+        assert risk["int_risky"]["last_reminder_sent"] == NOW - timedelta(hours=3)
+        assert risk["int_safe"]["risk_score"] == 1
+        assert risk["int_safe"]["reminder_response"] is True
+
+        summaries = {s["candidate_id"]: s for s in db.candidate_no_show_summaries.docs}
+        assert summaries["cand_1"]["flagged"] is True
+        assert summaries["cand_2"]["total_no_shows"] == 0
+
+    def test_refresh_drops_scores_that_are_no_longer_upcoming(self):
+        db = make_db()
+        run(refresh_no_show_risk(db, now=NOW))
+        db.interviews.docs = [i for i in db.interviews.docs if i["interview_id"] != "int_risky"]
+        run(refresh_no_show_risk(db, now=NOW + timedelta(minutes=5)))
+        assert [r["interview_id"] for r in db.interview_risk.docs] == ["int_safe"]
+
+    def test_progress_is_reported(self):
+        calls = []
+
+        async def progress(done, total):
+            calls.append((done, total))
+        run(refresh_no_show_risk(make_db(), progress=progress, now=NOW, batch_size=2))
+        assert calls[0] == (0, 7) and calls[-1] == (7, 7)
+
+
+class TestAtRiskReads:
+    """The dashboard reads only the materialized collection"""
+
+    def test_list_and_count(self):
+        db = make_db()
+        run(refresh_no_show_risk(db, now=NOW))
+        finds = db.interviews.finds
+
+        at_risk = run(list_at_risk(db, now=NOW))
+        assert [r["interview_id"] for r in at_risk] == ["int_risky"]
+        assert run(count_at_risk(db, now=NOW, client_id="client_1")) == 1
+        assert run(count_at_risk(db, now=NOW, client_id="client_2")) == 0
+        assert db.interviews.finds == finds
+
+    def test_discarded_interviews_leave_the_list(self):
+        db = make_db()
+        run(refresh_no_show_risk(db, now=NOW))
+        run(discard_interview_risk(db, "int_risky"))
+        assert run(list_at_risk(db, now=NOW)) == []
@@ -0,0 +1,103 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+import notification_digest
+from notification_digest import STATUS_PENDING, STATUS_SENT, deliver_email, flush_due_digests
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$lt" in condition and not (value is not None and value < condition["$lt"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+
+class FakeQueue:
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    def find(self, query, projection=None):
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+
+    def aggregate(self, pipeline):
+        cutoff = pipeline[2]["$match"]["oldest"]["$lte"]
+        oldest = {}
+        for doc in self.docs:
+            if doc["status"] == STATUS_PENDING:
+                oldest[doc["recipient"]] = min(oldest.get(doc["recipient"], doc["created_at"]), doc["created_at"])
+        return Cursor([{"_id": r, "oldest": at} for r, at in oldest.items() if at <= cutoff])
+
+
+class FakeDb:
+    def __init__(self):
+        self.notification_email_queue = FakeQueue()
+
+
+def queue(db, subject):
+    return asyncio.run(deliver_email(db, "rec@arbeit.com", subject, f"<p>{subject}</p>", "new_job", window_minutes=30))
+
+
+class TestFlush:
+    """Queued emails are sent as one digest and keep no body once sent"""
+
+    def make_db(self):
+        db = FakeDb()
+        queue(db, "Job A")
+        queue(db, "Job B")
+        for entry in db.notification_email_queue.docs:
+            entry["created_at"] -= timedelta(hours=1)
+        return db
+
+    def test_sent_entries_drop_their_body(self, monkeypatch):
+        sent = []
+
+        async def send_email(to, subject, body):
+            sent.append((to, subject))
+            return {"success": True}
+        monkeypatch.setattr(notification_digest, "send_email", send_email)
+        monkeypatch.setattr(notification_digest, "render_template", lambda name, **context: "digest")
+
+        db = self.make_db()
+        assert asyncio.run(flush_due_digests(db, window_minutes=30)) == 1
+        assert sent == [("rec@arbeit.com", "Arbeit digest: 2 updates")]
+        for entry in db.notification_email_queue.docs:
+            assert entry["status"] == STATUS_SENT and "body" not in entry
+            assert entry["sent_at"] <= datetime.now(timezone.utc)
+
+    def test_failed_send_keeps_entries_pending(self, monkeypatch):
+        async def send_email(to, subject, body):
+            return {"success": False, "error": "smtp down"}
+        monkeypatch.setattr(notification_digest, "send_email", send_email)
+        monkeypatch.setattr(notification_digest, "render_template", lambda name, **context: "digest")
+
+        db = self.make_db()
+        assert asyncio.run(flush_due_digests(db, window_minutes=30)) == 0
+        for entry in db.notification_email_queue.docs:
+            assert entry["status"] == STATUS_PENDING and entry["body"].startswith("<p>")
+            assert "claim_id" not in entry
@@ -0,0 +1,202 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from notification_inbox import (
+    backfill_inbox, build_inbox_entry, count_unread, fan_out, list_inbox, mark_all_read, mark_read,
+    publish_notification, resolve_recipients
+)
+from recipient_directory import RecipientDirectory
+
+USERS = [
+    {"email": "admin@arbeit.com", "role": "admin"},
+    {"email": "rec@arbeit.com", "role": "recruiter"},
+    {"email": "hr@acme.com", "role": "client_user", "client_id": "client_1"},
+]
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$exists" in condition and (field in doc) != condition["$exists"]:
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self.docs]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class Result:
+    def __init__(self, n):
+        self.matched_count = self.modified_count = n
+
+
+class FakeCollection:
+    def __init__(self, docs=None, unique=None):
+        self.docs = list(docs or [])
+        self.unique = unique
+
+    def find(self, query, projection=None):
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def count_documents(self, query):
+        return len([d for d in self.docs if _matches(d, query)])
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                return Result(1)
+        return Result(0)
+
+    async def update_many(self, query, update):
+        matched = [d for d in self.docs if _matches(d, query)]
+        for doc in matched:
+            doc.update(update["$set"])
+        return Result(len(matched))
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            if not any(_matches(d, op._filter) for d in self.docs):
+                self.docs.append(dict(op._doc["$setOnInsert"]))
+
+
+class FakeDb:
+    def __init__(self, notifications=()):
+        self.users = FakeCollection(USERS)
+        self.notifications = FakeCollection(notifications)
+        self.notification_inbox = FakeCollection()
+
+
+def notification(notification_id, created_at, **fields):
+    return {"notification_id": notification_id, "type": "candidate_added", "title": "New candidate",
+            "message": "Asha was added", "created_at": created_at, **fields}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestRecipients:
+    """Roles, explicit users and client users"""
+
+    def test_resolve_recipients(self):
+        directory = RecipientDirectory(FakeDb())
+        recipients = run(resolve_recipients(directory, notification(
+            "n1", "1", for_roles=["admin"], for_users=["cand@example.com"], client_id="client_1"
+        )))
+        assert recipients == {"admin@arbeit.com", "cand@example.com", "hr@acme.com"}
+
+    def test_entry_is_denormalized(self):
+        entry = build_inbox_entry(notification("n1", "1", client_id="client_1"), "rec@arbeit.com")
+        assert entry["is_read"] is False and entry["read_at"] is None
+        assert entry["title"] == "New candidate" and entry["client_id"] == "client_1"
+        assert entry["created_by"] == "system"
+
+
+class TestInbox:
+    """Fan-out, listing and read state"""
+
+    def test_publish_and_read(self):
+        db = FakeDb()
+        directory = RecipientDirectory(db)
+        entries = run(publish_notification(db, directory, notification("n1", "1", for_roles=["admin", "recruiter"])))
+        run(publish_notification(db, directory, notification("n2", "2", for_roles=["recruiter"])))
+        assert [e["user_email"] for e in entries] == ["admin@arbeit.com", "rec@arbeit.com"]
+        assert len(db.notifications.docs) == 2
+
+        assert [e["notification_id"] for e in run(list_inbox(db, "rec@arbeit.com"))] == ["n2", "n1"]
+        assert run(count_unread(db, "rec@arbeit.com")) == 2
+        assert run(mark_read(db, "rec@arbeit.com", "n1")) is True
+        assert run(mark_read(db, "rec@arbeit.com", "n9")) is None
+        assert [e["notification_id"] for e in run(list_inbox(db, "rec@arbeit.com", unread_only=True))] == ["n2"]
+        assert run(mark_all_read(db, "rec@arbeit.com")) == 1
+        assert run(count_unread(db, "rec@arbeit.com")) == 0
+        assert run(count_unread(db, "admin@arbeit.com")) == 1
+
+    def test_fan_out_does_not_reset_existing_entries(self):
+        db = FakeDb()
+        n1 = notification("n1", "1")
+        run(fan_out(db, n1, ["rec@arbeit.com"]))
+        run(mark_read(db, "rec@arbeit.com", "n1"))
+        run(fan_out(db, n1, ["rec@arbeit.com", "admin@arbeit.com"]))
+        assert {e["user_email"]: e["is_read"] for e in db.notification_inbox.docs} == {
+            "rec@arbeit.com": True, "admin@arbeit.com": False
+        }
+
+    def test_concurrent_duplicate_fan_out_is_ignored(self):
+        db = FakeDb()
+
+        async def duplicate(operations, ordered=True):
+            raise BulkWriteError({"writeErrors": [{"code": 11000}]})
+        db.notification_inbox.bulk_write = duplicate
+        assert len(run(fan_out(db, notification("n1", "1"), ["rec@arbeit.com"]))) == 1
+
+        async def failing(operations, ordered=True):
+            raise BulkWriteError({"writeErrors": [{"code": 121}]})
+        db.notification_inbox.bulk_write = failing
+        with pytest.raises(BulkWriteError):
+            run(fan_out(db, notification("n1", "1"), ["rec@arbeit.com"]))
+
+
+class TestBackfill:
+    """Notifications from before the inbox are fanned out with their read state"""
+
+    def test_backfill_carries_read_by_and_is_rerunnable(self):
+        db = FakeDb([
+            notification("n1", "1", for_roles=["recruiter"], read_by=["rec@arbeit.com"]),
+            notification("n2", "2", for_users=["admin@arbeit.com"]),
+            notification("n3", "3"),  # Neither field: not addressed to anyone
+        ])
+        directory = RecipientDirectory(db)
+        progress = []
+
+        async def on_progress(processed, total):
+            progress.append((processed, total))
+
+        assert run(backfill_inbox(db, directory, on_progress)) == {"notifications_processed": 2, "inbox_entries": 2}
+        assert progress[-1] == (2, 2)
+        assert {(e["notification_id"], e["user_email"], e["is_read"]) for e in db.notification_inbox.docs} == {
+            ("n1", "rec@arbeit.com", True), ("n2", "admin@arbeit.com", False)
+        }
+
+        run(backfill_inbox(db, directory))
+        assert len(db.notification_inbox.docs) == 2
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+import notification_stream
+from notification_stream import NotificationBroker, format_sse, notification_event, read_event, unread_count_event
+
+ENTRY = {"notification_id": "n1", "user_email": "rec@arbeit.com", "type": "candidate_added", "title": "New candidate",
+         "message": "Asha was added", "created_at": "2026-10-19T10:00:00+00:00", "is_read": False}
+
+
+def _matches(doc, query):
+    return all(doc.get(field) == value for field, value in query.items())
+
+
+class UpdateResult:
+    def __init__(self, n):
+        self.matched_count = self.modified_count = n
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if _matches(d, query)), None)
+
+    async def count_documents(self, query):
+        return len([d for d in self.docs if _matches(d, query)])
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                changed = any(doc.get(k) != v for k, v in update["$set"].items())
+                doc.update(update["$set"])
+                return UpdateResult(int(changed))
+        return UpdateResult(0)
+
+
+class FakeDb:
+    def __init__(self):
+        self.users = FakeCollection([{"email": "rec@arbeit.com", "role": "recruiter"}])
+        self.notification_inbox = FakeCollection([
+            dict(ENTRY), {**ENTRY, "notification_id": "n2"}, {**ENTRY, "notification_id": "n3", "is_read": True},
+        ])
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def parse_frame(frame):
+    lines = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+class TestEvents:
+    """Event payloads and SSE framing"""
+
+    def test_notification_event_carries_delta(self):
+        event = notification_event(ENTRY)
+        assert event["event"] == "notification"
+        assert event["data"]["unread_delta"] == 1
+        assert "user_email" not in event["data"]
+
+    def test_format_sse(self):
+        assert parse_frame(format_sse(read_event("n1"))) == ("read", {"notification_id": "n1", "unread_delta": -1})
+        assert format_sse(unread_count_event(3)).endswith("\n\n")
+
+
+class TestBroker:
+    """In-process delivery per user"""
+
+    def test_delivers_only_to_the_user(self):
+        broker = NotificationBroker(use_change_stream=False)
+        mine, other = broker.subscribe("rec@arbeit.com"), broker.subscribe("admin@arbeit.com")
+        broker.publish_entries([ENTRY])
+        assert mine.get_nowait()["data"]["notification_id"] == "n1"
+        assert other.empty()
+
+    def test_full_queue_drops_oldest(self, monkeypatch):
+        monkeypatch.setattr(notification_stream, "SUBSCRIBER_QUEUE_SIZE", 2)
+        broker = NotificationBroker(use_change_stream=False)
+        queue = broker.subscribe("rec@arbeit.com")
+        for count in range(3):
+            broker.publish("rec@arbeit.com", unread_count_event(count))
+        assert [queue.get_nowait()["data"]["unread_count"] for _ in range(2)] == [1, 2]
+
+    def test_unsubscribe_forgets_user(self):
+        broker = NotificationBroker(use_change_stream=False)
+        queue = broker.subscribe("rec@arbeit.com")
+        assert broker.connection_count() == 1
+        broker.unsubscribe("rec@arbeit.com", queue)
+        broker.unsubscribe("rec@arbeit.com", queue)
+        assert broker.connection_count() == 0
+
+    def test_change_stream_mode_delivers_from_changes_only(self):
+        broker = NotificationBroker(use_change_stream=True)
+        queue = broker.subscribe("rec@arbeit.com")
+        broker.publish("rec@arbeit.com", unread_count_event(1))
+        assert queue.empty()
+
+        broker._handle_change({"operationType": "insert", "fullDocument": ENTRY})
+        broker._handle_change({"operationType": "update", "fullDocument": {**ENTRY, "is_read": True},
+                               "updateDescription": {"updatedFields": {"is_read": True}}})
+        broker._handle_change({"operationType": "update", "fullDocument": ENTRY,
+                               "updateDescription": {"updatedFields": {"title": "Renamed"}}})
+        assert [queue.get_nowait()["event"] for _ in range(queue.qsize())] == ["notification", "read"]
+
+    def test_stream_sends_initial_events_then_published_ones(self, monkeypatch):
+        monkeypatch.setattr(notification_stream, "KEEPALIVE_SECONDS", 0.01)
+        broker = NotificationBroker(use_change_stream=False)
+        request = FakeRequest()
+
+        async def consume():
+            frames = []
+            async for frame in broker.stream("rec@arbeit.com", [unread_count_event(2)], request.is_disconnected):
+                frames.append(frame)
+                if len(frames) == 2:
+                    broker.publish("rec@arbeit.com", read_event("n1"))
+                if frame.startswith(": keepalive"):
+                    request.disconnected = True
+            return frames
+
+        frames = run(consume())
+        assert frames[0] == "retry: 5000\n\n"
+        assert parse_frame(frames[1]) == ("unread_count", {"unread_count": 2})
+        assert parse_frame(frames[2])[0] == "read"
+        assert frames[3] == ": keepalive\n\n"
+        assert broker.connection_count() == 0
+
+
+class TestEndpoints:
+    """Stream and mark-read endpoints against a fake database"""
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        import server
+        monkeypatch.setattr(server, "db", FakeDb())
+        monkeypatch.setattr(server, "notification_broker", NotificationBroker(use_change_stream=False))
+        return server
+
+    def test_stream_starts_with_unread_count(self, server):
+        token = server.create_access_token({"email": "rec@arbeit.com", "role": "recruiter"})
+
+        async def first_frames():
+            response = await server.stream_notifications(FakeRequest(), token)
+            assert response.media_type == "text/event-stream"
+            frames = []
+            async for frame in response.body_iterator:
+                frames.append(frame)
+                if len(frames) == 2:
+                    break
+            await response.body_iterator.aclose()
+            return frames
+
+        frames = run(first_frames())
+        assert parse_frame(frames[1]) == ("unread_count", {"unread_count": 2})
+
+    def test_mark_read_publishes_only_on_change(self, server):
+        user = {"email": "rec@arbeit.com", "role": "recruiter"}
+        queue = server.notification_broker.subscribe("rec@arbeit.com")
+
+        run(server.mark_notification_read("n1", user))
+        run(server.mark_notification_read("n1", user))  # Second click or another tab
+        run(server.mark_notification_read("n3", user))  # Read before
+        assert [queue.get_nowait()["data"]["notification_id"] for _ in range(queue.qsize())] == ["n1"]
+
+        with pytest.raises(server.HTTPException) as excinfo:
+            run(server.mark_notification_read("missing", user))
+        assert excinfo.value.status_code == 404
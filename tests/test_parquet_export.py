@@ -0,0 +1,190 @@
+import asyncio
+import io
+import sys
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from parquet_export import (
+    arrow_schema, export_query, export_to_directory, iter_row_batches, partition_value, stream_parquet, to_row
+)
+
+START = datetime(2026, 9, 28, tzinfo=timezone.utc)
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if op == "$lt" and not (value is not None and value < operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda d: d.get(field) or "", reverse=direction < 0)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length):
+        return self.docs
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return Cursor([d for d in self.docs if _matches(d, query)])
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.__dict__.update(collections)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def make_db(days=10, per_day=3):
+    interviews = []
+    for d in range(days):
+        for i in range(per_day):
+            created = START + timedelta(days=d, hours=i)
+            interviews.append({
+                "interview_id": f"int_{d}_{i}", "client_id": "client_1" if i else "client_2", "job_id": "job_1",
+                "candidate_id": f"cand_{d}", "interview_status": "Confirmed", "interview_mode": "Video",
+                "interview_duration": 60, "interview_round": 1, "no_show_flag": False,
+                "scheduled_start_at": (created + timedelta(days=3)).replace(tzinfo=None),
+                "created_at": created.isoformat(), "updated_at": created.isoformat(),
+            })
+    return FakeDb(
+        interviews=FakeCollection(interviews),
+        candidates=FakeCollection([
+            {"candidate_id": "cand_1", "job_id": "job_1", "skills": ["Python", "SQL"], "status": "NEW",
+             "ai_story": {"fit_score": 82}, "created_at": START.isoformat(), "email": "asha@example.com"},
+        ]),
+        jobs=FakeCollection([{"job_id": "job_1", "client_id": "client_1"}, {"job_id": "job_2", "client_id": "client_2"}]),
+    )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class TestRows:
+    """Documents are shaped to a fixed column list"""
+
+    def test_to_row_coerces_and_fills_missing(self):
+        row = to_row("candidates", {"candidate_id": "cand_1", "skills": ["Python", 3], "ai_story": {"fit_score": 82},
+                                    "no_show_count": "2", "created_at": "2026-10-01T10:00:00+00:00",
+                                    "email": "asha@example.com"})
+        assert row["skills"] == ["Python", "3"]
+        assert row["fit_score"] == 82.0
+        assert row["no_show_count"] == 2
+        assert row["created_at"] == datetime(2026, 10, 1, 10, tzinfo=timezone.utc)
+        assert row["status"] is None
+        assert "email" not in row
+
+    def test_json_columns(self):
+        row = to_row("audit_logs", {"log_id": "log_1", "new_value": {"slot_id": "s1"}, "metadata": {}})
+        assert row["new_value"] == '{"slot_id": "s1"}'
+        assert row["previous_value"] is None
+
+    def test_partition_values(self):
+        at = datetime(2026, 10, 19, 15, tzinfo=timezone.utc)
+        assert partition_value(at, "month") == "2026-10"
+        assert partition_value(at, "day") == "2026-10-19"
+        assert partition_value(None, "month") == "unknown"
+        assert partition_value(at, "none") is None
+
+
+class TestQuery:
+    """Date range and client scope"""
+
+    def test_range_and_client(self):
+        query = run(export_query(make_db(), "interviews", date(2026, 10, 1), date(2026, 11, 1), "client_1"))
+        assert query == {
+            "created_at": {"$gte": "2026-10-01T00:00:00+00:00", "$lt": "2026-11-01T00:00:00+00:00"},
+            "client_id": "client_1",
+        }
+
+    def test_candidates_are_scoped_through_jobs(self):
+        query = run(export_query(make_db(), "candidates", client_id="client_2"))
+        assert query == {"job_id": {"$in": ["job_2"]}}
+
+    def test_batches_do_not_span_partitions(self):
+        async def batches():
+            return [(v, len(rows)) async for v, rows in
+                    iter_row_batches(make_db(), "interviews", partition="month", batch_rows=4)]
+        # 3 days (9 rows) in September, 7 days (21 rows) in October
+        assert run(batches()) == [("2026-09", 4), ("2026-09", 4), ("2026-09", 1)] + [("2026-10", 4)] * 5 + [("2026-10", 1)]
+
+
+class TestParquet:
+    """Parquet output read back with pyarrow"""
+
+    def test_single_file_streamed_in_row_groups(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        pa = pytest.importorskip("pyarrow")
+        chunks = run(collect(stream_parquet(make_db(), "interviews", date(2026, 10, 1), batch_rows=5)))
+        assert len(chunks) > 2  # Bytes leave after every row group, not only at the end
+        data = b"".join(chunks)
+        parquet_file = pq.ParquetFile(pa.BufferReader(data))
+        assert parquet_file.metadata.num_row_groups == 5
+        table = parquet_file.read()
+        assert table.schema == arrow_schema("interviews")
+        assert table.num_rows == 21
+        assert table.column("created_at")[0].as_py() == datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+    def test_partitioned_zip(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        data = b"".join(run(collect(stream_parquet(make_db(), "interviews", partition="month", client_id="client_1"))))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            names = archive.namelist()
+            assert names == ["interviews/month=2026-09/interviews.parquet", "interviews/month=2026-10/interviews.parquet"]
+            rows = [pq.read_table(io.BytesIO(archive.read(name))).num_rows for name in names]
+        assert rows == [6, 14]
+
+    def test_empty_export_has_schema(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        data = b"".join(run(collect(stream_parquet(make_db(), "candidates", date(2030, 1, 1)))))
+        table = pq.read_table(io.BytesIO(data))
+        assert table.num_rows == 0
+        assert table.schema == arrow_schema("candidates")
+
+    def test_export_to_directory(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        files = run(export_to_directory(make_db(), "interviews", tmp_path, partition="day", batch_rows=2))
+        assert len(files) == 10
+        assert files[0] == tmp_path / "interviews" / "day=2026-09-28" / "interviews.parquet"
+        assert pq.read_table(files[0]).num_rows == 3
@@ -0,0 +1,168 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from pipeline_counters import (
+    ALL_CLIENTS, get_counts, has_counters, rebuild_counters, record_created, record_transition,
+    update_interview_fields, update_interview_status
+)
+
+STATUSES = [
+    "Awaiting Candidate Confirmation", "Confirmed", "Scheduled", "Completed", "No Show", "Cancelled",
+    "Passed", "Failed",
+]
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeInterviews:
+    """Interviews with an atomic find_one_and_update and a status $group"""
+
+    def __init__(self, docs=None):
+        self.docs = {d["interview_id"]: d for d in docs or []}
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        await asyncio.sleep(0)  # Let concurrent transitions interleave around the atomic update
+        doc = self.docs.get(query["interview_id"])
+        if not doc:
+            return None
+        before = dict(doc)
+        doc.update(update["$set"])
+        return before
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["interview_id"])
+        if doc:
+            doc.update(update["$set"])
+
+    def aggregate(self, pipeline):
+        groups = {}
+        for doc in self.docs.values():
+            key = (doc.get("client_id"), doc.get("interview_status"))
+            groups[key] = groups.get(key, 0) + 1
+        return FakeCursor([
+            {"_id": {"client_id": client_id, "status": status}, "count": n} for (client_id, status), n in groups.items()
+        ])
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            doc = self.docs.setdefault(op._filter["client_id"], {"client_id": op._filter["client_id"]})
+            for field, n in op._doc.get("$inc", {}).items():
+                doc[field] = doc.get(field, 0) + n
+            doc.update(op._doc.get("$set", {}))
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["client_id"])
+
+    async def delete_many(self, query):
+        for client_id in [c for c in self.docs if c not in query["client_id"]["$nin"]]:
+            del self.docs[client_id]
+
+
+class FakeDb:
+    def __init__(self, interviews=None):
+        self.interviews = FakeInterviews(interviews)
+        self.interview_pipeline_counters = FakeCounters()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def counts_of(db, client_id):
+    return run(get_counts(db, client_id))
+
+
+class TestIncrementalCounters:
+    """Counters follow creates and status transitions"""
+
+    def test_create_and_transitions(self):
+        db = FakeDb([{"interview_id": "int_1", "client_id": "client_1", "interview_status": "Confirmed"}])
+        run(record_created(db, "client_1", "Awaiting Candidate Confirmation"))
+        run(record_transition(db, "client_1", "Awaiting Candidate Confirmation", "Confirmed"))
+        run(update_interview_status(db, "int_1", {"$set": {"interview_status": "Scheduled"}}))
+        run(update_interview_status(db, "int_1", {"$set": {"interview_status": "Passed"}}))
+
+        counts = counts_of(db, "client_1")
+        assert counts["total_interviews"] == 1
+        assert counts["awaiting_confirmation"] == counts["confirmed"] == counts["scheduled"] == 0
+        assert counts_of(db, None) == counts
+
+    def test_generic_update_counts_status_changes(self):
+        db = FakeDb([{"interview_id": "int_1", "client_id": "client_1", "interview_status": "Confirmed"}])
+        run(record_created(db, "client_1", "Confirmed"))
+        run(update_interview_fields(db, "int_1", {"interview_notes": "Bring portfolio"}))
+        assert counts_of(db, "client_1")["confirmed"] == 1
+
+        run(update_interview_fields(db, "int_1", {"interview_status": "Cancelled", "interview_notes": "Withdrew"}))
+        counts = counts_of(db, "client_1")
+        assert counts["confirmed"] == 0 and counts["cancelled"] == 1
+        assert db.interviews.docs["int_1"]["interview_notes"] == "Withdrew"
+
+    def test_missing_interview_changes_nothing(self):
+        db = FakeDb()
+        assert run(update_interview_status(db, "int_x", {"$set": {"interview_status": "Cancelled"}})) is None
+        assert db.interview_pipeline_counters.docs == {}
+
+    def test_no_counters_read_as_zero(self):
+        db = FakeDb()
+        assert counts_of(db, "client_1")["total_interviews"] == 0
+        assert run(has_counters(db)) is False
+
+    def test_concurrent_transitions_match_rebuild(self):
+        rng = random.Random(11)
+        docs = [
+            {"interview_id": f"int_{i}", "client_id": f"client_{i % 3}",
+             "interview_status": "Awaiting Candidate Confirmation"}
+            for i in range(60)
+        ]
+        db = FakeDb(docs)
+        for doc in docs:
+            run(record_created(db, doc["client_id"], doc["interview_status"]))
+
+        async def churn():
+            await asyncio.gather(*(
+                update_interview_status(db, f"int_{rng.randrange(60)}",
+                                        {"$set": {"interview_status": rng.choice(STATUSES)}})
+                for _ in range(500)
+            ))
+        run(churn())
+
+        incremental = {c: counts_of(db, c) for c in ["client_0", "client_1", "client_2", None]}
+        rebuilt = FakeDb(list(db.interviews.docs.values()))
+        run(rebuild_counters(rebuilt))
+        assert {c: counts_of(rebuilt, c) for c in incremental} == incremental
+
+
+class TestRebuild:
+    """Reconciliation from the interviews collection"""
+
+    def test_rebuild_overwrites_drift(self):
+        db = FakeDb([
+            {"interview_id": "int_1", "client_id": "client_1", "interview_status": "No Show"},
+            {"interview_id": "int_2", "client_id": "client_1", "interview_status": "Failed"},
+            {"interview_id": "int_3", "client_id": "client_2", "interview_status": "Cancelled"},
+        ])
+        db.interview_pipeline_counters.docs["client_1"] = {"client_id": "client_1", "no_shows": 9}
+        db.interview_pipeline_counters.docs["client_gone"] = {"client_id": "client_gone", "total_interviews": 4}
+
+        assert run(rebuild_counters(db)) == {"clients": 2, "interviews": 3}
+        assert counts_of(db, "client_1")["no_shows"] == 1
+        assert counts_of(db, "client_1")["total_interviews"] == 2
+        assert counts_of(db, None)["cancelled"] == 1
+        assert set(db.interview_pipeline_counters.docs) == {"client_1", "client_2", ALL_CLIENTS}
+        assert run(has_counters(db)) is True
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+import recipient_directory
+from recipient_directory import RecipientDirectory, RecipientSnapshot
+
+USERS = [
+    {"email": "admin@arbeit.com", "role": "admin"},
+    {"email": "rec@arbeit.com", "role": "recruiter"},
+    {"email": "hr@acme.com", "role": "client_user", "client_id": "client_1"},
+    {"email": "ops@acme.com", "role": "recruiter", "client_id": "client_1"},
+    {"email": "hr@globex.com", "role": "client_user", "client_id": "client_2"},
+    {"role": "client_user", "client_id": "client_1"},  # No email, never a recipient
+]
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        await asyncio.sleep(0)
+        return [dict(d) for d in self.docs]
+
+
+class FakeUsers:
+    def __init__(self, docs):
+        self.docs = docs
+        self.loads = 0
+
+    def find(self, query, projection=None):
+        self.loads += 1
+        return Cursor(self.docs)
+
+
+class FakeDb:
+    def __init__(self, users):
+        self.users = FakeUsers(users)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestSnapshot:
+    """Recipient lists by role and by client"""
+
+    def test_roles_and_clients(self):
+        snapshot = RecipientSnapshot(USERS)
+        assert [u["email"] for u in snapshot.users_with_roles(["admin", "recruiter"])] == [
+            "admin@arbeit.com", "rec@arbeit.com", "ops@acme.com"
+        ]
+        assert [u["email"] for u in snapshot.client_users("client_1")] == ["hr@acme.com"]
+        assert snapshot.client_users(None) == []
+        assert snapshot.client_users("client_9") == []
+
+
+class TestDirectory:
+    """TTL cache with invalidation"""
+
+    def test_snapshot_is_cached_until_invalidated(self):
+        db = FakeDb(list(USERS))
+        directory = RecipientDirectory(db, ttl_seconds=60)
+
+        async def scenario():
+            assert len(await directory.internal_recipients()) == 3
+            await directory.client_recipients("client_1")
+            assert db.users.loads == 1
+
+            db.users.docs.append({"email": "new@arbeit.com", "role": "admin"})
+            directory.invalidate()
+            assert "new@arbeit.com" in [u["email"] for u in await directory.internal_recipients()]
+            assert db.users.loads == 2
+        run(scenario())
+
+    def test_expired_snapshot_is_reloaded(self, monkeypatch):
+        db = FakeDb(USERS)
+        directory = RecipientDirectory(db, ttl_seconds=60)
+        clock = [1000.0]
+        monkeypatch.setattr(recipient_directory.time, "monotonic", lambda: clock[0])
+
+        run(directory.snapshot())
+        clock[0] += 59
+        run(directory.snapshot())
+        assert db.users.loads == 1
+        clock[0] += 2
+        run(directory.snapshot())
+        assert db.users.loads == 2
+
+    def test_concurrent_lookups_load_once(self):
+        db = FakeDb(USERS)
+        directory = RecipientDirectory(db)
+
+        async def scenario():
+            await asyncio.gather(*(directory.snapshot() for _ in range(20)))
+        run(scenario())
+        assert db.users.loads == 1
+
+    def test_invalidation_during_load_is_not_cached(self):
+        db = FakeDb(USERS)
+        directory = RecipientDirectory(db)
+
+        async def scenario():
+            load = asyncio.create_task(directory.snapshot())
+            await asyncio.sleep(0)  # The load is now waiting on the query
+            directory.invalidate()
+            await load
+            await directory.snapshot()
+        run(scenario())
+        assert db.users.loads == 2
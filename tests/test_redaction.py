@@ -0,0 +1,149 @@
+import asyncio
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from redaction import (
+    EMAIL, LINKEDIN, PHONE, URL, apply_spans, cv_text_fields, find_spans, get_redacted_cv, redact,
+    redact_text, redacted_cv_text
+)
+
+
+def five_pass_redact(text: str) -> str:
+    """The previous redact_text implementation, kept as the reference"""
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL REDACTED]', text)
+    text = re.sub(r'\b(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3,4}[-.\s]?\d{4}\b', '[PHONE REDACTED]', text)
+    text = re.sub(r'\b\d{3}-\d{4}\b', '[PHONE REDACTED]', text)
+    text = re.sub(r'https?://(www\.)?linkedin\.com/[^\s]+', '[LINKEDIN REDACTED]', text)
+    text = re.sub(r'https?://[^\s]+', '[URL REDACTED]', text)
+    return text
+
+
+SAMPLES = [
+    "Jane Doe\nEmail: jane.doe@example.com | Phone: +91 98765 43210",
+    "Contact (555) 123-4567 or 555-1234, office 555.123.4567",
+    "LinkedIn: https://www.linkedin.com/in/jane-doe Portfolio: http://janedoe.dev/projects",
+    "linkedin http://linkedin.com/company/acme and https://linkedin.com/ alone",
+    "Worked 2015 - 2019 at Acme, 2019-2023 at Initech; GPA 3.8; 120 people",
+    "Reach me at j.smith+cv@mail.co.uk or JSMITH@EXAMPLE.ORG.",
+    "+1-800-555-0199 ext 12, 9876543210, 022 2345 6789",
+    "no personal data here at all",
+    "",
+]
+
+WORDS = ["experienced", "engineer", "2019", "2021 - Present", "team", "led", "\n", "Python,", "(remote)"]
+CONTACTS = [
+    "jane.doe@example.com", "+91 98765 43210", "(555) 123-4567", "555-1234", "555.123.4567",
+    "https://www.linkedin.com/in/jane", "https://github.com/jane", "http://x.io/a?b=1", "a+b@c.de",
+]
+
+
+def random_cv(seed: int, words: int = 400) -> str:
+    """CV-like text; contact details are separated by at least one ordinary word"""
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(WORDS))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(CONTACTS))
+    return " ".join(parts)
+
+
+class TestMatchesPreviousBehaviour:
+    """Single-pass output equals the old five-pass output"""
+
+    def test_samples(self):
+        for sample in SAMPLES:
+            assert redact_text(sample) == five_pass_redact(sample), sample
+
+    def test_randomized_cvs(self):
+        for seed in range(200):
+            cv = random_cv(seed)
+            assert redact_text(cv) == five_pass_redact(cv), seed
+
+    def test_pii_inside_urls_is_redacted_with_the_url(self):
+        # The old passes left "[URL REDACTED] REDACTED]" behind here
+        text = "see https://example.com/contact/jane@example.com today"
+        assert redact_text(text) == "see [URL REDACTED] today"
+        assert redact_text("http://x.io/a?b=1 (555) 123-4567") == "[URL REDACTED] ([PHONE REDACTED]"
+
+    def test_adjacent_short_phones_are_both_redacted(self):
+        # The old passes matched "1234 555-1234" as one number and left "555-" visible
+        assert five_pass_redact("555-1234 555-1234") == "555-[PHONE REDACTED]"
+        assert redact_text("555-1234 555-1234") == "[PHONE REDACTED] [PHONE REDACTED]"
+
+
+class TestSpans:
+    """Spans describe the redactions in original-text coordinates"""
+
+    def test_span_kinds_and_offsets(self):
+        text = "Mail jane@example.com, call 555-1234, https://linkedin.com/in/j https://j.dev"
+        redacted, spans = redact(text)
+        assert [kind for _, _, kind in spans] == [EMAIL, PHONE, LINKEDIN, URL]
+        assert text[spans[0][0]:spans[0][1]] == "jane@example.com"
+        assert text[spans[1][0]:spans[1][1]] == "555-1234"
+        assert redacted == "Mail [EMAIL REDACTED], call [PHONE REDACTED], [LINKEDIN REDACTED] [URL REDACTED]"
+
+    def test_apply_spans_rebuilds_redacted_text(self):
+        for seed in range(50):
+            cv = random_cv(seed)
+            redacted, spans = redact(cv)
+            assert apply_spans(cv, spans) == redacted
+            assert find_spans(cv) == spans
+
+    def test_no_matches(self):
+        assert redact("plain text") == ("plain text", [])
+        assert redact("") == ("", [])
+        assert apply_spans("plain text", []) == "plain text"
+
+
+class CountingCandidates:
+    """Just enough of a motor collection for get_redacted_cv"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.docs.get(query["candidate_id"])
+
+
+class TestStoredCvText:
+    """Candidates store the original text plus spans; the redacted view is derived"""
+
+    def test_cv_text_fields(self):
+        text = "Call 555-1234"
+        fields = cv_text_fields(text)
+        assert fields["cv_text_original"] == text
+        assert fields["cv_redaction_spans"] == [[5, 13, PHONE]]
+        assert fields["cv_text_id"] != cv_text_fields(text)["cv_text_id"]
+        assert "cv_text_redacted" not in fields
+
+    def test_redacted_view_from_spans(self):
+        candidate = cv_text_fields("Mail jane@example.com")
+        assert redacted_cv_text(candidate) == "Mail [EMAIL REDACTED]"
+
+    def test_legacy_and_unconverted_documents(self):
+        assert redacted_cv_text({"cv_text_original": "x", "cv_text_redacted": "stored"}) == "stored"
+        assert redacted_cv_text({"cv_text_original": "Call 555-1234"}) == "Call [PHONE REDACTED]"
+        assert redacted_cv_text({"name": "Manual candidate"}) is None
+
+    def test_views_are_cached_per_cv_text_id(self):
+        doc = {"candidate_id": "cand_lru", **cv_text_fields("Mail jane@example.com")}
+        candidates = CountingCandidates({"cand_lru": doc})
+        db = type("FakeDb", (), {"candidates": candidates})()
+        meta = {"candidate_id": "cand_lru", "cv_text_id": doc["cv_text_id"]}
+
+        assert asyncio.run(get_redacted_cv(db, meta)) == "Mail [EMAIL REDACTED]"
+        assert asyncio.run(get_redacted_cv(db, meta)) == "Mail [EMAIL REDACTED]"
+        assert candidates.reads == 1
+
+        # A replaced CV gets a new cv_text_id, so the old view is not served
+        doc.update(cv_text_fields("Call 555-1234"))
+        meta["cv_text_id"] = doc["cv_text_id"]
+        assert asyncio.run(get_redacted_cv(db, meta)) == "Call [PHONE REDACTED]"
+        assert candidates.reads == 2
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from skill_taxonomy import canonical_skill, dedupe_skills, lookup_skill, skill_id, skill_ids
+from fit_scoring import calculate_fit_score, score_candidates
+
+
+class TestCanonicalization:
+    """Aliases map to one canonical skill and ID"""
+
+    def test_aliases_share_canonical_name(self):
+        assert canonical_skill("ReactJS") == "react"
+        assert canonical_skill("  React.js ") == "react"
+        assert canonical_skill("K8s") == "kubernetes"
+        assert canonical_skill("Golang") == "go"
+
+    def test_unknown_skill_is_its_own_canonical(self):
+        assert canonical_skill("  Apache   Airflow ") == "apache airflow"
+
+    def test_ids_are_stable_48_bit_integers(self):
+        assert skill_id("AWS") == skill_id("amazon web services")
+        assert skill_id("AWS") != skill_id("azure")
+        assert 0 <= skill_id("python") < 2 ** 48
+        # Derived from the name, not from Python's per-process hash()
+        assert skill_id("python") == 216857772921385
+
+    def test_skill_ids_dedupes_in_order(self):
+        assert skill_ids(["Node", "nodejs", "MongoDB", "", None, "mongo"]) == [skill_id("node.js"), skill_id("mongodb")]
+
+    def test_dedupe_keeps_first_spelling(self):
+        assert dedupe_skills(["ReactJS", "react", " Python ", "python3", "  "]) == ["ReactJS", "Python"]
+
+    def test_lookup(self):
+        result = lookup_skill("k8s")
+        assert result["canonical"] == "kubernetes"
+        assert result["known"] is True
+        assert "k8s" in result["aliases"]
+        assert lookup_skill("  ") is None
+
+
+class TestAliasAwareScoring:
+    """Fit scoring matches skills through their aliases"""
+
+    def test_aliases_count_as_direct_matches(self):
+        job = {"title": "DevOps Engineer", "required_skills": ["Kubernetes", "AWS"],
+               "experience_range": {"min_years": 0, "max_years": 10}}
+        candidate = {"skills": ["k8s", "Amazon Web Services"], "experience": [], "current_role": "DevOps Engineer"}
+
+        assert calculate_fit_score(candidate, job) == 100
+        assert list(score_candidates(job, [candidate])) == [100]
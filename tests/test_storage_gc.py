@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from cv_storage import LocalCVStorage
+from storage_gc import collect_garbage
+
+NOW = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+BASE_URL = "https://files.test/cv"
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = list(docs or [])
+
+    def find(self, query, projection=None):
+        (field, condition), = query.items()
+        return Cursor([d for d in self.docs if d.get(field) not in condition["$nin"]])
+
+
+class FakeDb:
+    def __init__(self, candidates=(), versions=()):
+        self.candidates = FakeCollection(candidates)
+        self.candidate_cv_versions = FakeCollection(versions)
+
+
+class CountingStorage(LocalCVStorage):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.delete_calls = []
+
+    async def delete_keys(self, keys):
+        self.delete_calls.append(list(keys))
+        return await super().delete_keys(keys)
+
+
+def store(storage, key, age_hours=48):
+    url = storage.save_file(key, b"%PDF")
+    mtime = (NOW - timedelta(hours=age_hours)).timestamp()
+    os.utime(storage.root / key, (mtime, mtime))
+    return url
+
+
+def make(tmp_path, orphans=5):
+    storage = CountingStorage(tmp_path, BASE_URL)
+    current = store(storage, "resumes/cand_1")
+    old_version = store(storage, "resumes/cand_1_v1")
+    candidates = [{"candidate_id": "cand_1", "cv_file_url": current}, {"candidate_id": "cand_2", "cv_file_url": None},
+                  {"candidate_id": "cand_3", "cv_file_url": "https://res.cloudinary.com/arbeit/raw/upload/v1/x"}]
+    versions = [{"candidate_id": "cand_1", "file_url": current}, {"candidate_id": "cand_1", "file_url": old_version}]
+    for i in range(orphans):
+        store(storage, f"resumes/deleted_{i}")
+    store(storage, "resumes/just_uploaded", age_hours=1)
+    return FakeDb(candidates, versions), storage
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def stored_keys(storage):
+    return sorted(p.relative_to(storage.root).as_posix() for p in storage.root.rglob("*") if p.is_file())
+
+
+class TestCollectGarbage:
+    """Orphaned files are found by diffing storage against Mongo references"""
+
+    def test_dry_run_deletes_nothing(self, tmp_path):
+        db, storage = make(tmp_path)
+        result = run(collect_garbage(db, storage, dry_run=True, now=NOW))
+        assert result["orphaned"] == 5 and result["deleted"] == 0
+        assert result["orphans"] == [f"resumes/deleted_{i}" for i in range(5)]
+        assert result["scanned"] == 8 and result["too_new"] == 1 and result["referenced"] == 2
+        assert storage.delete_calls == []
+        assert len(stored_keys(storage)) == 8
+
+    def test_deletes_orphans_in_throttled_batches(self, tmp_path):
+        db, storage = make(tmp_path, orphans=7)
+        progress = []
+
+        async def on_progress(processed, total=None):
+            progress.append(processed)
+
+        result = run(collect_garbage(db, storage, dry_run=False, now=NOW, batch_size=3, pause_seconds=0,
+                                     progress=on_progress))
+        assert result["deleted"] == 7
+        assert [len(call) for call in storage.delete_calls] == [3, 3, 1]
+        assert stored_keys(storage) == ["resumes/cand_1", "resumes/cand_1_v1", "resumes/just_uploaded"]
+        assert progress[-1] == 10
+
+        again = run(collect_garbage(db, storage, dry_run=False, now=NOW, pause_seconds=0))
+        assert again["orphaned"] == 0 and again["deleted"] == 0
+
+    def test_refuses_to_delete_without_references(self, tmp_path):
+        _, storage = make(tmp_path)
+        with pytest.raises(RuntimeError):
+            run(collect_garbage(FakeDb(), storage, dry_run=False, now=NOW))
+        assert run(collect_garbage(FakeDb(), storage, dry_run=True, now=NOW))["orphaned"] == 7
@@ -0,0 +1,117 @@
+import asyncio
+import io
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+from story_pdf import (
+    archive_name, content_version, get_story_pdf, process_pool, render_story_pdf, shutdown_pool, stream_story_zip
+)
+
+DATE = "October 19, 2026"
+
+
+def make_candidate(**overrides):
+    candidate = {
+        "candidate_id": "cand_pdf1",
+        "name": "Jane Doe",
+        "current_role": "Backend Engineer",
+        "status": "NEW",
+        "skills": ["Python", "MongoDB"],
+        "experience": [{"role": "Engineer", "company": "Acme", "duration": "2020-2024",
+                        "achievements": ["Cut p99 latency in half"]}],
+        "education": [{"degree": "BSc", "institution": "MIT", "year": "2019"}],
+        "ai_story": {"fit_score": 82, "summary": "Strong backend profile", "highlights": ["Led migration"]},
+    }
+    candidate.update(overrides)
+    return candidate
+
+
+class TestContentVersion:
+    """The cache key changes exactly when the PDF content would"""
+
+    def test_stable_for_same_content(self):
+        assert content_version(make_candidate(), DATE) == content_version(make_candidate(), DATE)
+
+    def test_changes_with_story_experience_and_education(self):
+        base = content_version(make_candidate(), DATE)
+        assert content_version(make_candidate(ai_story={"fit_score": 50}), DATE) != base
+        assert content_version(make_candidate(experience=[]), DATE) != base
+        assert content_version(make_candidate(education=[]), DATE) != base
+        assert content_version(make_candidate(status="HIRED"), DATE) != base
+
+    def test_changes_with_footer_date(self):
+        assert content_version(make_candidate(), DATE) != content_version(make_candidate(), "October 20, 2026")
+
+    def test_ignores_fields_not_in_the_pdf(self):
+        base = content_version(make_candidate(), DATE)
+        assert content_version(make_candidate(cv_text_original="...", email="x@y.io"), DATE) == base
+
+
+class TestRendering:
+    """Rendering and the PDF cache"""
+
+    def test_renders_pdf(self):
+        pdf = render_story_pdf(make_candidate(), DATE)
+        assert pdf.startswith(b"%PDF")
+
+    def test_renders_minimal_candidate(self):
+        pdf = render_story_pdf({"candidate_id": "cand_min", "name": "A", "status": "NEW"}, DATE)
+        assert pdf.startswith(b"%PDF")
+
+    def test_repeat_downloads_come_from_cache(self):
+        candidate = make_candidate(candidate_id="cand_cache")
+        first = asyncio.run(get_story_pdf(candidate, DATE))
+        assert asyncio.run(get_story_pdf(make_candidate(candidate_id="cand_cache"), DATE)) is first
+
+        changed = asyncio.run(get_story_pdf(make_candidate(candidate_id="cand_cache", status="HIRED"), DATE))
+        assert changed is not first
+        assert changed.startswith(b"%PDF")
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class TestShortlistZip:
+    """Streaming ZIP export of several story PDFs"""
+
+    def shortlist(self, prefix, count):
+        return [make_candidate(candidate_id=f"{prefix}{i}", name=f"Candidate {i}") for i in range(count)]
+
+    def test_archive_name(self):
+        assert archive_name(3, {"candidate_id": "cand_1", "name": "Jane  O'Doe"}) == "03_Jane_O_Doe_cand_1.pdf"
+        assert archive_name(1, {"candidate_id": "cand_2", "name": None}) == "01_candidate_cand_2.pdf"
+
+    def test_streams_one_chunk_per_entry(self):
+        candidates = self.shortlist("cand_zip", 5)
+        with ThreadPoolExecutor(2) as executor:
+            chunks = asyncio.run(collect(stream_story_zip(candidates, DATE, executor, max_in_flight=2)))
+        # One chunk per entry plus the central directory
+        assert len(chunks) == 6
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == [archive_name(i + 1, c) for i, c in enumerate(candidates)]
+        for info in archive.infolist():
+            assert archive.read(info).startswith(b"%PDF")
+
+    def test_cached_pdfs_are_not_rendered_again(self):
+        candidates = self.shortlist("cand_zipcache", 2)
+        cached = asyncio.run(get_story_pdf(candidates[0], DATE))
+        with ThreadPoolExecutor(1) as executor:
+            chunks = asyncio.run(collect(stream_story_zip(candidates, DATE, executor)))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.read(archive_name(1, candidates[0])) == cached
+
+    def test_process_pool(self):
+        candidates = self.shortlist("cand_zippool", 2)
+        try:
+            chunks = asyncio.run(collect(stream_story_zip(candidates, DATE, process_pool())))
+        finally:
+            shutdown_pool()
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert len(archive.namelist()) == 2
@@ -0,0 +1,130 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'backend'))
+
+import text_similarity
+from text_similarity import (
+    N_FEATURES, TfidfModel, cosine_similarities, get_model, score_similarities, term_counts, tokenize,
+    vector_document
+)
+from fit_scoring import score_candidates
+
+
+JOB = {
+    "job_id": "job_1",
+    "title": "Backend Engineer",
+    "required_skills": ["Python", "FastAPI"],
+    "description": "Build REST APIs with Python, FastAPI and MongoDB on AWS.",
+}
+
+CANDIDATES = [
+    {"candidate_id": "c1", "cv_text_redacted": "Python engineer building FastAPI REST APIs on MongoDB and AWS."},
+    {"candidate_id": "c2", "cv_text_redacted": "Graphic designer: Photoshop, Illustrator, branding."},
+    {"candidate_id": "c3", "cv_text_redacted": "", "current_role": "Python Developer", "skills": ["Python"]},
+]
+
+
+def fitted_model(texts):
+    df = np.zeros(N_FEATURES, dtype=np.int64)
+    for text in texts:
+        buckets, _ = term_counts(text)
+        df[buckets] += 1
+    return TfidfModel.fit(1, len(texts), df)
+
+
+class FakeModels:
+    def __init__(self):
+        self.doc = None
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return dict(self.doc) if self.doc else None
+
+
+class FakeDb:
+    def __init__(self):
+        self.similarity_models = FakeModels()
+
+
+class TestVectorizing:
+    """Tokenizing and TF-IDF vectors"""
+
+    def test_tokenize_keeps_tech_terms_and_drops_stop_words(self):
+        tokens = tokenize("Worked with C++, C# and Node.js on the [EMAIL REDACTED] team")
+        assert "c++" in tokens and "c#" in tokens and "node.js" in tokens
+        assert "the" not in tokens and "redacted" not in tokens
+
+    def test_vectors_are_normalized(self):
+        _, values = TfidfModel.unfitted().transform(CANDIDATES[0]["cv_text_redacted"])
+        assert abs(np.linalg.norm(values) - 1) < 1e-5
+
+    def test_empty_text_has_empty_vector(self):
+        indices, values = TfidfModel.unfitted().transform("")
+        assert len(indices) == 0 and len(values) == 0
+
+    def test_model_document_round_trip(self):
+        model = fitted_model([c["cv_text_redacted"] for c in CANDIDATES])
+        restored = TfidfModel.from_document(model.to_document())
+        assert restored.version == 1
+        assert np.allclose(restored.idf, model.idf)
+
+
+class TestModelCache:
+    """The model version is re-checked only after the TTL"""
+
+    def test_version_check_is_cached(self, monkeypatch):
+        monkeypatch.setattr(text_similarity, "_model_cache", {"model": None, "checked_at": None})
+        clock = [1000.0]
+        monkeypatch.setattr(text_similarity.time, "monotonic", lambda: clock[0])
+        db = FakeDb()
+
+        assert asyncio.run(get_model(db)).version == 0
+        db.similarity_models.doc = fitted_model(["python"]).to_document()
+        assert asyncio.run(get_model(db)).version == 0
+        assert db.similarity_models.reads == 1
+
+        clock[0] += text_similarity.MODEL_VERSION_TTL_SECONDS
+        assert asyncio.run(get_model(db)).version == 1
+        assert asyncio.run(get_model(db)).version == 1
+        assert db.similarity_models.reads == 3  # Version check plus the one full load
+
+
+class TestSimilarity:
+    """Batch cosine similarity for a job's applicant pool"""
+
+    def test_relevant_cv_scores_highest(self):
+        model = fitted_model([c["cv_text_redacted"] for c in CANDIDATES])
+        scores = score_similarities(model, JOB, CANDIDATES)
+        assert scores[0] > scores[2] > scores[1] == 0
+
+    def test_stored_vectors_match_computed_ones(self):
+        model = fitted_model([c["cv_text_redacted"] for c in CANDIDATES])
+        stored = [dict(c, text_vector=vector_document(model, c["cv_text_redacted"])) for c in CANDIDATES[:2]]
+        assert np.allclose(score_similarities(model, JOB, stored), score_similarities(model, JOB, CANDIDATES[:2]),
+                           atol=1e-5)
+
+    def test_stale_vectors_are_recomputed(self):
+        model = fitted_model([c["cv_text_redacted"] for c in CANDIDATES])
+        stale = dict(CANDIDATES[0], text_vector={"model_version": 0, "indices": [], "values": []})
+        assert score_similarities(model, JOB, [stale])[0] > 0
+
+    def test_empty_pool(self):
+        assert cosine_similarities(TfidfModel.unfitted().transform("python"), []).shape == (0,)
+
+
+class TestSimilarityFitComponent:
+    """Similarity is an optional part of the fit score"""
+
+    def test_scores_unchanged_without_similarity(self):
+        candidates = [{"skills": ["Python"], "current_role": "Backend Engineer", "experience": []}]
+        assert score_candidates(JOB, candidates).tolist() == score_candidates(JOB, candidates, None).tolist()
+
+    def test_similarity_raises_score(self):
+        candidates = [{"skills": ["Python"], "current_role": "Backend Engineer", "experience": []}] * 2
+        scores = score_candidates(JOB, candidates, np.array([0.0, 1.0]))
+        assert scores[1] > scores[0]